@@ -0,0 +1,49 @@
+"""
+    命令行批量导出图纸，不打开窗口:
+    python -m pyHydraulic.hydraulicSketcher.hydraulicExport -f png -o out/ -j 4 a.json b.pyhb ...
+"""
+import os
+import sys
+import argparse
+from pyHydraulic.node_scene_export import EXPORT_FORMATS, EXPORT_SCALE, EXPORT_MARGIN, EXPORT_TILE_SIZE, \
+    ExportOptions, exportFiles
+
+
+def parseArguments(argv):
+    parser = argparse.ArgumentParser(description="Render saved diagrams to PNG, SVG or PDF without opening a window.")
+    parser.add_argument("files", nargs="+", help="diagram files (.json or .pyhb)")
+    parser.add_argument("-f", "--format", choices=EXPORT_FORMATS, default="png", help="output format (default: png)")
+    parser.add_argument("-o", "--out-dir", default=None, help="output directory (default: next to each diagram)")
+    parser.add_argument("-s", "--scale", type=float, default=EXPORT_SCALE,
+                        help="pixels (points for svg/pdf) per scene unit (default: %(default)s)")
+    parser.add_argument("--margin", type=float, default=EXPORT_MARGIN, help="scene units around the diagram (default: %(default)s)")
+    parser.add_argument("--tile-size", type=int, default=EXPORT_TILE_SIZE, help="png tile size in pixels (default: %(default)s)")
+    parser.add_argument("--no-grid", action="store_true", help="do not draw the background grid")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of rendering processes (default: 1)")
+    return parser.parse_args(argv)
+
+
+def run(argv=None):
+    args = parseArguments(sys.argv[1:] if argv is None else argv)
+    # 不需要显示器，必须在创建QApplication之前设置
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    if args.out_dir is not None: os.makedirs(args.out_dir, exist_ok=True)
+    options = ExportOptions(scale=args.scale, margin=args.margin, tile_size=args.tile_size, grid=not args.no_grid)
+
+    failed = []
+    def progress(source, result):
+        if isinstance(result, Exception):
+            failed.append(source)
+            print("!W: %s: %s" % (source, result), file=sys.stderr)
+        else:
+            print("%s -> %s" % (source, ", ".join(result)))
+
+    exportFiles(args.files, args.out_dir, args.format, options, args.jobs, progress)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(run())
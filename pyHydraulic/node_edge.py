@@ -1,4 +1,6 @@
-from pyHydraulic.node_graphics_edge import *
+from collections import OrderedDict
+from PyQt5.QtCore import QRectF
+from pyHydraulic.node_serializable import Serializable
 
 
 EDGE_TYPE_DIRECT = 1
@@ -22,15 +24,21 @@ class Edge(Serializable):
         self.edge_type = edge_type
 
         self.scene.addEdge(self)
+        self.scene.history.objectAdded(self)
+        if self.scene.isVirtualized(): self.scene.virtualizer.objectAdded(self)
 
     def __str__(self):
         return "<Edge %s..%s>" % (hex(id(self))[2:5], hex(id(self))[-3:])
 
+    def onIdChanged(self, old_id):
+        self.scene.reindexObject(self, old_id)
+
     @property
     def start_socket(self): return self._start_socket
 
     @start_socket.setter
     def start_socket(self, value):
+        self.scene.history.objectChanging(self)
         # if we were assigned to some socket before, delete us from the socket
         if self._start_socket is not None:
             self._start_socket.removeEdge(self)
@@ -41,7 +49,7 @@ class Edge(Serializable):
         if self.start_socket is not None:
             self.start_socket.addEdge(self)
             # 隐藏start_socket的显示
-            self.start_socket.grSocket.linkFlag = True
+            if self.start_socket.grSocket is not None: self.start_socket.grSocket.linkFlag = True
 
 
     @property
@@ -49,6 +57,7 @@ class Edge(Serializable):
 
     @end_socket.setter
     def end_socket(self, value):
+        self.scene.history.objectChanging(self)
         # if we were assigned to some socket before, delete us from the socket
         if self._end_socket is not None:
             self._end_socket.removeEdge(self)
@@ -59,17 +68,32 @@ class Edge(Serializable):
         if self.end_socket is not None:
             self.end_socket.addEdge(self)
             # 隐藏end_socket的显示
-            self.end_socket.grSocket.linkFlag = True
+            if self.end_socket.grSocket is not None: self.end_socket.grSocket.linkFlag = True
 
     @property
     def edge_type(self): return self._edge_type
 
     @edge_type.setter
     def edge_type(self, value):
-        if hasattr(self, 'grEdge') and self.grEdge is not None:
-            self.scene.grScene.removeItem(self.grEdge)
+        self.scene.history.objectChanging(self)
+        had_graphics = getattr(self, 'grEdge', None) is not None
+        if had_graphics:
+            self.scene.removeGraphicsItem(self.grEdge)
+        self.grEdge = None
 
         self._edge_type = value
+        # 无界面的scene中没有图元；虚拟化的scene中两端都连好的edge由SceneVirtualizer在进入视图附近时创建图元，
+        # 正在拖拽的edge总是有图元
+        if not self.scene.hasGraphics():
+            pass
+        elif had_graphics or not self.scene.isVirtualized() or \
+                (self.start_socket is not None and self.end_socket is None):
+            self.createGraphics()
+        elif self.scene.hasObject(self):
+            self.scene.virtualizer.objectMoved(self)
+
+    def createGraphics(self):
+        from pyHydraulic.node_graphics_edge import QDMGraphicsEdgeDirect, QDMGraphicsEdgeBezier, QDMGraphicsEdgePolygonal
         if self.edge_type == EDGE_TYPE_DIRECT:
             self.grEdge = QDMGraphicsEdgeDirect(self)
         elif self.edge_type == EDGE_TYPE_BEZIER:
@@ -79,11 +103,21 @@ class Edge(Serializable):
         else:
             self.grEdge = QDMGraphicsEdgePolygonal(self)
 
-        self.scene.grScene.addItem(self.grEdge)
+        self.scene.addGraphicsItem(self.grEdge)
 
         if self.start_socket is not None:
             self.updatePositions()
 
+    def releaseGraphics(self):
+        if self.grEdge is None: return
+        self.scene.removeGraphicsItem(self.grEdge)
+        self.grEdge = None
+
+    # edge两端socket在scene中的外接矩形，还没有连好的edge返回None
+    def sceneBoundingRect(self):
+        if self.start_socket is None or self.end_socket is None: return None
+        return QRectF(self.start_socket.scenePos(), self.end_socket.scenePos()).normalized()
+
 
     def updatePositions(self):
         # 获取socket的坐标
@@ -94,14 +128,24 @@ class Edge(Serializable):
         # source_pos[1] += self.start_socket.node.grNode.pos().y()
 
         # 获取socket在scene的坐标
-        source_pos = [self.start_socket.grSocket.scenePos().x(),self.start_socket.grSocket.scenePos().y()]
+        # 批量构建时推迟到结束时再更新
+        if self.scene.inBatch():
+            self.scene.markEdgeDirty(self)
+            return
+        # 没有图元的edge只需要更新它在虚拟化索引中的位置
+        if self.grEdge is None:
+            if self.scene.isVirtualized(): self.scene.virtualizer.objectMoved(self)
+            return
+        source_pos = self.start_socket.scenePos()
+        source_pos = [source_pos.x(), source_pos.y()]
         self.grEdge.setSource(*source_pos)
         if self.end_socket is not None:
             # 如法炮制出end_socket的在scene的坐标
             # end_pos = self.end_socket.getSocketPosition()
             # end_pos[0] += self.end_socket.node.grNode.pos().x()
             # end_pos[1] += self.end_socket.node.grNode.pos().y()
-            end_pos = [self.end_socket.grSocket.scenePos().x(), self.end_socket.grSocket.scenePos().y()]
+            end_pos = self.end_socket.scenePos()
+            end_pos = [end_pos.x(), end_pos.y()]
 
             self.grEdge.setDestination(*end_pos)
         else:
@@ -115,13 +159,16 @@ class Edge(Serializable):
 
 
     def remove(self):
+        # 已经被删除过了(比如node和它的edge同时被选中删除)
+        if not self.scene.hasObject(self): return
         if DEBUG: print("# Removing Edge", self)
+        self.scene.history.objectChanging(self)
         if DEBUG: print(" - remove edge from all sockets")
         self.remove_from_sockets()
         if DEBUG: print(" - remove grEdge")
         # 从scence真实移除edge对象
-        self.scene.grScene.removeItem(self.grEdge)
-        self.grEdge = None
+        self.releaseGraphics()
+        if self.scene.isVirtualized(): self.scene.virtualizer.objectRemoved(self)
         if DEBUG: print(" - remove edge from scene")
         # 删除从scene统计的edge
         try:
@@ -139,6 +186,21 @@ class Edge(Serializable):
             ('end', self.end_socket.id),
         ])
 
+    # 按data就地更新edge，只在两端socket或者类型变化时重新连接（撤销/重做用）
+    def reconcile(self, data, hashmap={}):
+        start_socket, end_socket = hashmap[data['start']], hashmap[data['end']]
+        changed = False
+        if self.start_socket is not start_socket:
+            self.start_socket = start_socket
+            changed = True
+        if self.end_socket is not end_socket:
+            self.end_socket = end_socket
+            changed = True
+        if self.edge_type != data['edge_type']:
+            self.edge_type = data['edge_type']  # 重新创建grEdge的同时会更新位置
+        elif changed:
+            self.updatePositions()
+
     # 下面只是赋值操作
     def deserialize(self, data, hashmap={}, restore_id=True):
         if restore_id: self.id = data['id']
@@ -10,10 +10,14 @@ from pyHydraulic.node_graphics_view import QDMGraphicsView
 
 
 class NodeEditorWidget(QWidget):
+    loadProgress = pyqtSignal(int, int)
+    loadFinished = pyqtSignal(bool)
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self.filename = None
+        self.loader = None  # 正在进行的渐进式加载
 
         self.initUI()
 
@@ -47,10 +51,13 @@ class NodeEditorWidget(QWidget):
         return name + ("*" if self.isModified() else "")
 
     def fileNew(self):
+        self.cancelLoad()
         self.scene.clear()
         self.filename = None
 
-    def fileLoad(self, filename):
+    def fileLoad(self, filename, progressive=False):
+        self.cancelLoad()
+        if progressive: return self.fileLoadProgressive(filename)
         QApplication.setOverrideCursor(Qt.WaitCursor)
         try:
             self.scene.loadFromFile(filename)
@@ -66,6 +73,37 @@ class NodeEditorWidget(QWidget):
             QApplication.restoreOverrideCursor()
 
 
+    # 不阻塞界面的加载，加载结果通过loadProgress和loadFinished信号通知
+    def fileLoadProgressive(self, filename):
+        self.loader = self.scene.loadFromFileProgressive(filename)
+        self.loader.progress.connect(self.loadProgress)
+        self.loader.finished.connect(lambda: self.onLoadFinished(filename))
+        self.loader.failed.connect(lambda message: self.onLoadFailed(filename, message))
+        self.loader.canceled.connect(self.onLoadCanceled)
+        return True
+
+    def isLoading(self):
+        return self.loader is not None and self.loader.isRunning()
+
+    def cancelLoad(self):
+        if self.isLoading(): self.loader.cancel()
+
+    def onLoadFinished(self, filename):
+        self.loader = None
+        self.filename = filename
+        self.loadFinished.emit(True)
+
+    def onLoadFailed(self, filename, message):
+        self.loader = None
+        print(message)
+        QMessageBox.warning(self, "Error loading %s" % os.path.basename(filename), message)
+        self.loadFinished.emit(False)
+
+    def onLoadCanceled(self):
+        self.loader = None
+        self.filename = None
+        self.loadFinished.emit(False)
+
     def fileSave(self, filename=None):
         # when called with empty parameter, we won't store the filename
         if filename is not None: self.filename = filename
@@ -78,23 +116,24 @@ class NodeEditorWidget(QWidget):
         return Node(self.scene, node_name)
 
     def addNodes(self):
-        node1 = Node(self.scene, "pressure sensor")
-        node2 = Node(self.scene, "tank")
-        node3 = Node(self.scene, "flow meter")
-        node4 = Node(self.scene, "gauge")
-        node5 = Node(self.scene, "servo valve")
-        node6 = Node(self.scene,  "piston dual")
-        node7 = Node(self.scene, "simple tank")
-
-        node1.rotate(90)
-
-        node1.setPos(-350, -250)
-        node2.setPos(-75, 0)
-        node3.setPos(200, -150)
-        node4.setPos(-200, -150)
-        node6.setPos(-300, -250)
-        print(type(node1.sockets[0]))
-        edge1 = Edge(self.scene, node3.sockets[0], node2.sockets[0], edge_type= EDGE_TYPE_POLYGONAL)
+        with self.scene.batch():
+            node1 = Node(self.scene, "pressure sensor")
+            node2 = Node(self.scene, "tank")
+            node3 = Node(self.scene, "flow meter")
+            node4 = Node(self.scene, "gauge")
+            node5 = Node(self.scene, "servo valve")
+            node6 = Node(self.scene,  "piston dual")
+            node7 = Node(self.scene, "simple tank")
+
+            node1.rotate(90)
+
+            node1.setPos(-350, -250)
+            node2.setPos(-75, 0)
+            node3.setPos(200, -150)
+            node4.setPos(-200, -150)
+            node6.setPos(-300, -250)
+            print(type(node1.sockets[0]))
+            edge1 = Edge(self.scene, node3.sockets[0], node2.sockets[0], edge_type= EDGE_TYPE_POLYGONAL)
         # edge2 = Edge(self.scene, node2.outputs[0], node3.inputs[0], edge_type=EDGE_TYPE_BEZIER)
 
 
@@ -130,8 +169,7 @@ class NodeEditorWidget(QWidget):
         line.setFlag(QGraphicsItem.ItemIsSelectable)
 
     def getObjectByID(self, id):
-        for node in self.scene.nodes + self.scene.edges:
-            if node.id == id:
-                return node
-        return None
+        node = self.scene.getNodeByID(id)
+        if node is not None: return node
+        return self.scene.getEdgeByID(id)
 
@@ -4,9 +4,14 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import QIcon
 from pyHydraulic.node_editor_widget import NodeEditorWidget
-from pyHydraulic.node_graphics_node import NODE_TYPES
+from pyHydraulic.node_types import nodeTypeNames
+from pyHydraulic.node_scene_binary import isBinaryFilename, BINARY_FILE_EXTENSION
+from pyHydraulic.node_graphics_view import RENDER_PROFILE_QUALITY, RENDER_PROFILE_BALANCED, RENDER_PROFILE_PERFORMANCE
 DEBUG = False
 
+# 打开和保存对话框的文件过滤，扩展名为.pyhb的保存为二进制格式
+GRAPH_FILE_FILTER = "Graph (*.json);;Binary graph (*.pyhb);;All files (*)"
+
 class NodeEditorWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -48,12 +53,16 @@ class NodeEditorWindow(QMainWindow):
 
         self.nodeeditor.view.scenePosChanged.connect(self.onScenePosChanged)
         self.nodeeditor.view.sceneItemSelected.connect(self.onItemSelected)
+        self.nodeeditor.loadProgress.connect(self.onLoadProgress)
+        self.nodeeditor.loadFinished.connect(self.onLoadFinished)
 
     def createActions(self):
         self.actNew = QAction('&New', self, shortcut='Ctrl+N', statusTip="Create new graph", triggered=self.onFileNew)
         self.actOpen = QAction('&Open', self, shortcut='Ctrl+O', statusTip="Open file", triggered=self.onFileOpen)
         self.actSave = QAction('&Save', self, shortcut='Ctrl+S', statusTip="Save file", triggered=self.onFileSave)
         self.actSaveAs = QAction('Save &As...', self, shortcut='Ctrl+Shift+S', statusTip="Save file as...", triggered=self.onFileSaveAs)
+        # 只在加载时可用，否则Esc会被整个窗口截走
+        self.actCancelLoad = QAction('Cancel &Loading', self, shortcut='Esc', enabled=False, statusTip="Cancel loading file", triggered=self.onFileCancelLoad)
         self.actExit = QAction('E&xit', self, shortcut='Ctrl+Q', statusTip="Exit application", triggered=self.close)
 
         self.actUndo = QAction('&Undo', self, shortcut='Ctrl+Z', statusTip="Undo last operation", triggered=self.onEditUndo)
@@ -67,6 +76,15 @@ class NodeEditorWindow(QMainWindow):
         self.actScaleMinus = QAction('&Scale-', self, shortcut='Ctrl+M', statusTip="scale selected dockWIdget-", triggered=self.onEditScaleMinus)
 
 
+        # 绘制质量，性能差的电脑上选择balanced或performance
+        self.actRenderGroup = QActionGroup(self)
+        self.actRenderQuality = QAction('&Quality', self, checkable=True, checked=True, statusTip="Render with full quality", triggered=lambda: self.onViewRenderProfile(RENDER_PROFILE_QUALITY))
+        self.actRenderBalanced = QAction('&Balanced', self, checkable=True, statusTip="Render faster while panning, zooming and dragging", triggered=lambda: self.onViewRenderProfile(RENDER_PROFILE_BALANCED))
+        self.actRenderPerformance = QAction('&Performance', self, checkable=True, statusTip="Render as fast as possible", triggered=lambda: self.onViewRenderProfile(RENDER_PROFILE_PERFORMANCE))
+        for action in (self.actRenderQuality, self.actRenderBalanced, self.actRenderPerformance):
+            self.actRenderGroup.addAction(action)
+        self.actRenderTileCache = QAction('&Tile cache', self, checkable=True, statusTip="Draw unchanged items from tiles rendered in background threads", triggered=self.onViewTileCache)
+
         self.actAbout = QAction('&About', self, shortcut='Ctrl+A', statusTip="about this program", triggered=self.onAbout)
 
     def onAbout(self):
@@ -81,6 +99,7 @@ class NodeEditorWindow(QMainWindow):
         self.fileMenu.addAction(self.actOpen)
         self.fileMenu.addAction(self.actSave)
         self.fileMenu.addAction(self.actSaveAs)
+        self.fileMenu.addAction(self.actCancelLoad)
         self.fileMenu.addSeparator()
         self.fileMenu.addAction(self.actExit)
 
@@ -97,6 +116,14 @@ class NodeEditorWindow(QMainWindow):
         self.editMenu.addAction(self.actScalePlus)
         self.editMenu.addAction(self.actScaleMinus)
 
+        self.viewMenu = menubar.addMenu('&View')
+        self.renderMenu = self.viewMenu.addMenu('&Rendering')
+        self.renderMenu.addAction(self.actRenderQuality)
+        self.renderMenu.addAction(self.actRenderBalanced)
+        self.renderMenu.addAction(self.actRenderPerformance)
+        self.renderMenu.addSeparator()
+        self.renderMenu.addAction(self.actRenderTileCache)
+
         self.helpMenu = menubar.addMenu('&Help')
         self.helpMenu.addAction(self.actAbout)
 
@@ -151,11 +178,24 @@ class NodeEditorWindow(QMainWindow):
 
     def onFileOpen(self):
         if self.maybeSave():
-            fname, filter = QFileDialog.getOpenFileName(self, 'Open graph from file')
+            fname, filter = QFileDialog.getOpenFileName(self, 'Open graph from file', '', GRAPH_FILE_FILTER)
             if fname != '' and os.path.isfile(fname):
-                self.getCurrentNodeEditorWidget().fileLoad(fname)
+                self.getCurrentNodeEditorWidget().fileLoad(fname, progressive=True)
+                self.actCancelLoad.setEnabled(self.getCurrentNodeEditorWidget().isLoading())
                 self.setTitle()
 
+    def onFileCancelLoad(self):
+        self.getCurrentNodeEditorWidget().cancelLoad()
+
+    def onLoadProgress(self, done, total):
+        self.statusBar().showMessage("Loading... %d / %d" % (done, total))
+
+    def onLoadFinished(self, ok):
+        self.actCancelLoad.setEnabled(False)
+        if ok: self.statusBar().showMessage("Successfully loaded %s" % self.getCurrentNodeEditorWidget().filename)
+        else: self.statusBar().showMessage("")
+        self.setTitle()
+
     def onFileSave(self):
         if self.getCurrentNodeEditorWidget().filename is None: return self.onFileSaveAs()
         self.getCurrentNodeEditorWidget().fileSave()
@@ -164,14 +204,23 @@ class NodeEditorWindow(QMainWindow):
         return True
 
     def onFileSaveAs(self):
-        fname, filter = QFileDialog.getSaveFileName(self, 'Save graph to file')
+        fname, filter = QFileDialog.getSaveFileName(self, 'Save graph to file', '', GRAPH_FILE_FILTER)
         if fname == '':
             return False
+        # 选择了二进制格式但没有写扩展名
+        if filter.startswith("Binary") and not isBinaryFilename(fname):
+            fname += BINARY_FILE_EXTENSION
         self.getCurrentNodeEditorWidget().fileSave(fname)
         self.statusBar().showMessage("Successfully saved as %s" % self.getCurrentNodeEditorWidget().filename)
         self.setTitle()
         return True
 
+    def onViewRenderProfile(self, name):
+        self.getCurrentNodeEditorWidget().view.setRenderProfile(name)
+
+    def onViewTileCache(self, checked):
+        self.getCurrentNodeEditorWidget().view.setTileCacheEnabled(checked)
+
     def onEditUndo(self):
         self.getCurrentNodeEditorWidget().scene.history.undo()
 
@@ -241,7 +290,7 @@ class NodeEditorWindow(QMainWindow):
         # 设置图标可不可以移动，默认是可移动的，但可以改成静态的
         self.listWidget.setMovement(QListView.Static)
 
-        for node_name in NODE_TYPES:
+        for node_name in nodeTypeNames():
             addItem = QListWidgetItem(node_name)
             # addItem.setIcon(QIcon("./images/flow meter.png"))
             addItem.setIcon(QIcon("./images/"+node_name+".png"))
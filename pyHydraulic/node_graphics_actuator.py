@@ -0,0 +1,123 @@
+"""
+    执行元件: 液压缸
+    控件类型在node_types.py中登记，第一次用到时才导入本模块
+"""
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+import math
+from pyHydraulic.node_graphics_node import QAbstractGraphicsNode, QNodePartItem
+
+# 6.piston：会伸缩的液压缸
+class GraphicsNode_pistion(QAbstractGraphicsNode):
+    # Piston_type_dual = 0  # 对称缸
+    # Piston_type_right = 1  # 右出杆缸
+    # Piston_type_left = 2  # 左出杆缸
+
+    # 缸体轮廓不随数值变化，使用符号缓存；腔室、活塞(连同出杆)和数值文本是单独的子图元
+    staticSymbol = True
+    textInParts = True
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.unit = "cm"
+        self._OffsetPix = 0  # 阀芯偏移的像素点
+
+
+        # 计算加速度方向的属性，即连续三个缸的位置采样点
+        self.x1 = 0
+        self.x2 = 0
+        self.x3 = 0
+        self.acceleration = 0  # 加速度方向默认为0
+
+        # 腔室画在缸体里面，数值变化时重画缸体内部；活塞和出杆按活塞居中时的坐标画，数值变化时只平移
+        margin = self._pen_selected.width()
+        self._chambers = QNodePartItem(self, self.paintChambers, QRectF(self.width * -1 / 4, -self.height / 2, self.width / 2, self.height))
+        self._rod = QNodePartItem(self, self.paintRod, QRectF(self.width * (-1 / 4 - 1 / 80), -self.height / 2, self.width * (1 / 2 + 2 / 80),
+                                                              self.height).adjusted(-margin, -margin, margin, margin))
+        self._text_part = QNodePartItem(self, self.paintText)
+        self._value_font = QFont(self.textFont, int(self.width / 20), QFont.Medium)  # 第二个参数是字体大小
+
+        # 与偏转相关的物理量
+        self.maxValue = 100
+        self.minValue = -100
+        self.value = 0  # _value为内部变量，此句话意思要调用一下value函数，更新初始状态
+
+
+    # 做的玩，判断缸加速度方向，加速度向右，返回正，否则返回负
+    def jugde_acceleration(self, position):
+        self.x1 = self.x2
+        self.x2 = self.x3
+        self.x3 = position
+        acceleration = self.x3 - 2 * self.x2 + self.x1
+        return acceleration  # 加速度大于零，即方向向右
+
+    # 重写父类value赋值属性，赋值的时候才更新加速度状态
+    @QAbstractGraphicsNode.value.setter
+    def value(self, value):
+        self.acceleration = self.jugde_acceleration(value)
+        super(GraphicsNode_pistion, GraphicsNode_pistion).value.__set__(self, value)
+
+    # 计算偏移的像素点，平移活塞，重画腔室和文字
+    def valueChanged(self):
+        self._OffsetPix = (self._percent - 0.5) * self.width * (1 / 2 - 1 / 20)
+        self._rod.setPos(self._OffsetPix, 0)
+        self._chambers.update()
+        self._text_part.setRect(self.textRect(self._value_font, QPointF(-self.width / 3.8 + self._OffsetPix, -self.width / 100), self.valueText()))
+        self._text_part.update()
+
+    def valueText(self):
+        return str(round(self.value, 1)) + self.unit
+
+    # 重写node绘制函数，只画缸体的轮廓
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        # 1.画出整个缸体的轮廓(起始x,起始y,宽，高),缸整体宽度为1/2控件宽度
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)# 把笔给画家
+        painter.drawRect(QRectF(self.width *-1/4, -self.height/2, self.width/2, self.height))
+
+    # 2.画出各个腔室
+    def paintChambers(self, painter):
+        painter.setPen(Qt.NoPen)
+        painter.setOpacity(0.6)
+
+        if self.acceleration > 0:  # 表示缸偏右
+            left, right = Qt.red, QColor("#40E0D0")
+        elif self.acceleration < 0:  # 表示缸偏左边
+            left, right = QColor("#40E0D0"), Qt.red
+        else:
+            left, right = QColor("#40E0D0"), QColor("#40E0D0")
+        # 左腔室轮廓
+        painter.setBrush(left)  # 填充颜色
+        painter.drawRect(QRectF(self.width * -1 / 4, -self.height / 2, self.width / 4 + self._OffsetPix, self.height))
+        # 右腔室轮廓
+        painter.setBrush(right)  # 填充颜色
+        painter.drawRect(QRectF(0 + self._OffsetPix, -self.height / 2, self.width / 4 - self._OffsetPix, self.height))
+
+    # 3.画缸中间的隔离柱和出杆，按活塞居中时的坐标画
+    def paintRod(self, painter):
+        # 隔离柱厚度取1/20的控件宽度
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)# 把笔给画家
+        painter.setBrush(QColor("#B8860B"))  # 填充颜色
+        painter.drawRect(QRectF(self.width * - 1 / 80, - self.height/2, self.width * 2 / 80, self.height))
+        # 根据缸的类型，画缸左右出杆，中位出杆伸出缸外面长度为1/40控件宽度，杆的上下高度为1/10控件高度
+        left_rod = QRectF(self.width * (-1 / 4 - 1 / 80), self.height * - 1 / 20, self.width * 1 / 4, self.height * 1 / 10)
+        right_rod = QRectF(self.width * (1 / 80), self.height * (- 1 / 20), self.width * 1 / 4, self.height * 1 / 10)
+        if self.node._node_type == "piston dual":  # 对称缸
+            painter.drawRect(left_rod)
+            painter.drawRect(right_rod)
+        elif self.node._node_type == "piston right":  # 右出杆
+            painter.drawRect(right_rod)
+        elif self.node._node_type == "piston left":  # 左出杆
+            painter.drawRect(left_rod)
+
+    # 5.显示文本
+    def paintText(self, painter):
+        if not self.textEnable: return
+        self._text = self.valueText()
+        # 文字太小看不清时不画
+        if self.isTextLegible(self.width / 20):
+            painter.setPen(self._pen_default)
+            painter.setFont(self._value_font)
+            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+            painter.drawText(QPointF(-self.width/3.8 + self._OffsetPix, -self.width/100), self._text)
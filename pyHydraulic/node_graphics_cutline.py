@@ -1,14 +1,50 @@
 from PyQt5.QtWidgets import *
 from PyQt5.QtGui import *
 from PyQt5.QtCore import *
+import math
+
+
+# 鼠标移动时新的点离上一个点小于这个距离(屏幕像素)时只替换最后一个点，不增加点
+CUTLINE_MIN_SEGMENT = 4
+# 剪断时用Douglas-Peucker算法简化折线，偏离原来折线不超过这个距离(屏幕像素)
+CUTLINE_SIMPLIFY_TOLERANCE = 1.5
+
+
+# 点p到线段(a, b)的距离
+def distanceToSegment(p, a, b):
+    dx, dy = b.x() - a.x(), b.y() - a.y()
+    length2 = dx * dx + dy * dy
+    if length2 == 0: return math.hypot(p.x() - a.x(), p.y() - a.y())
+    t = max(0.0, min(1.0, ((p.x() - a.x()) * dx + (p.y() - a.y()) * dy) / length2))
+    return math.hypot(p.x() - a.x() - t * dx, p.y() - a.y() - t * dy)
+
+
+# Douglas-Peucker折线简化，保留首尾点，用栈代替递归，很长的折线也不会超过递归深度
+def simplifyPolyline(points, tolerance):
+    if len(points) < 3: return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        index, distance = None, tolerance
+        for i in range(first + 1, last):
+            d = distanceToSegment(points[i], points[first], points[last])
+            if d > distance: index, distance = i, d
+        if index is not None:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
 
 
 class QDMCutLine(QGraphicsItem):
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        # cutline的点集合，在QGraphicsview鼠标移动事件中添加
+        # cutline的点集合，在QGraphicsview鼠标移动事件中用addPoint添加
         self.line_points = []
+        self._polygon = QPolygonF()
 
         self._pen = QPen(Qt.yellow)
         self._pen.setWidthF(10)
@@ -16,21 +52,36 @@ class QDMCutLine(QGraphicsItem):
 
         self.setZValue(10)
 
+    # 添加鼠标移动的点，scale为视图的缩放比例，离上一个点太近的点只替换最后一个点
+    def addPoint(self, pos, scale=1.0):
+        self.prepareGeometryChange()
+        if len(self.line_points) > 1 and QLineF(self.line_points[-2], pos).length() * scale < CUTLINE_MIN_SEGMENT:
+            self.line_points[-1] = pos
+            self._polygon[len(self._polygon) - 1] = pos
+        else:
+            self.line_points.append(pos)
+            self._polygon.append(pos)
+
+    def clear(self):
+        self.prepareGeometryChange()
+        self.line_points = []
+        self._polygon = QPolygonF()
+
+    # 剪断时用的简化后的折线
+    def simplifiedPoints(self, scale=1.0):
+        return simplifyPolyline(self.line_points, CUTLINE_SIMPLIFY_TOLERANCE / scale)
+
+    # 没有画线时是空的，不会挡住原点处的鼠标点击
     def boundingRect(self):
-        return self.shape().boundingRect()
+        if len(self.line_points) < 2: return QRectF()
+        width = self._pen.widthF() / 2
+        return self._polygon.boundingRect().adjusted(-width, -width, width, width)
 
     # 根据self.line_ponts形成对应的path路径
     def shape(self):
-        poly = QPolygonF(self.line_points)
-
+        path = QPainterPath()
         if len(self.line_points) > 1:
-            path = QPainterPath(self.line_points[0])
-            for pt in self.line_points[1:]:
-                path.lineTo(pt)
-        else:
-            path = QPainterPath(QPointF(0,0))
-            path.lineTo(QPointF(1,1))
-
+            path.addPolygon(self._polygon)
         return path
 
     def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
@@ -39,5 +90,4 @@ class QDMCutLine(QGraphicsItem):
         painter.setPen(self._pen)
 
         # 多折线图
-        poly = QPolygonF(self.line_points)
-        painter.drawPolyline(poly)
\ No newline at end of file
+        painter.drawPolyline(self._polygon)
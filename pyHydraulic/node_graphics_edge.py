@@ -2,15 +2,21 @@ import math
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
+from pyHydraulic.node_graphics_tiles import isTileCached
 
 
 from pyHydraulic.node_socket import *
 
 
 EDGE_CP_ROUNDNESS = 100
+# 点选edge时的有效宽度(scene单位)
+EDGE_SHAPE_WIDTH = 20.0
 
 
 class QDMGraphicsEdge(QGraphicsPathItem):
+    # 没有选中、两端的控件也没有选中时可以画在视图的分块缓存中
+    tileCacheable = True
+
     def __init__(self, edge, parent=None):
         super().__init__(parent)
 
@@ -34,21 +40,56 @@ class QDMGraphicsEdge(QGraphicsPathItem):
         self.posSource = [0, 0]
         self.posDestination = [200, 100]
 
+        # 路径、外接矩形和选中用的形状只在两端位置变化后计算一次，绘制、BSP索引、选中和剪切都用缓存的结果
+        self._geometry_dirty = True
+        self._path = QPainterPath()
+        self._bounding_rect = QRectF()
+        self._shape = None
+
     def setSource(self, x, y):
+        if self.posSource == [x, y]: return
+        self.geometryChanging()
         self.posSource = [x, y]
 
     def setDestination(self, x, y):
+        if self.posDestination == [x, y]: return
+        self.geometryChanging()
         self.posDestination = [x, y]
 
+    # 改变两端的位置之前调用，通知scene外接矩形要变了，新的几何在下次用到时才计算
+    def geometryChanging(self):
+        if not self._geometry_dirty:
+            self.prepareGeometryChange()
+            self._geometry_dirty = True
+
+    def updateGeometry(self):
+        if not self._geometry_dirty: return
+        self._geometry_dirty = False
+        self._path = self.calcPath()
+        # 外接矩形要包含选中用的形状和线宽
+        margin = max(EDGE_SHAPE_WIDTH, self._pen.widthF()) / 2
+        self._bounding_rect = self._path.boundingRect().adjusted(-margin, -margin, margin, margin)
+        self._shape = None
+
+    def path(self):
+        self.updateGeometry()
+        return self._path
+
     def boundingRect(self):
-        return self.shape().boundingRect()
+        self.updateGeometry()
+        return self._bounding_rect
 
+    # 选中用的形状：按EDGE_SHAPE_WIDTH描边的路径，第一次用到时才计算
     def shape(self):
-        return self.calcPath()
+        self.updateGeometry()
+        if self._shape is None:
+            stroker = QPainterPathStroker()
+            stroker.setWidth(EDGE_SHAPE_WIDTH)
+            self._shape = stroker.createStroke(self._path)
+        return self._shape
 
     def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        self.setPath(self.calcPath())
-
+        if isTileCached(self, widget): return
         if self.edge.end_socket is None:
             painter.setPen(self._pen_dragging)
         else:
@@ -58,10 +99,14 @@ class QDMGraphicsEdge(QGraphicsPathItem):
 
     # 判断直线（p1,p2）与本edge路径是否相交
     def intersectsWith(self, p1, p2):
+        # 线段的外接矩形和edge的外接矩形不相交时不用计算路径的相交
+        rect = self.boundingRect()
+        if max(p1.x(), p2.x()) < rect.left() or min(p1.x(), p2.x()) > rect.right() or \
+                max(p1.y(), p2.y()) < rect.top() or min(p1.y(), p2.y()) > rect.bottom():
+            return False
         cutpath = QPainterPath(p1)
         cutpath.lineTo(p2)
-        path = self.calcPath()
-        return cutpath.intersects(path)
+        return cutpath.intersects(self.path())
 
     def calcPath(self):
         """ Will handle drawing QPainterPath from Point A to B """
@@ -4,39 +4,54 @@
     Author: lee
     Time: 2020-01-06, 14:41
     File: node_graphics_node.py
-    Function: 基本元件节点的绘制文件
+    Function: 基本元件节点的绘制文件，所有控件的父类。具体的控件在node_graphics_sensor.py等模块中，
+              通过node_types.py中的登记表按需导入
 """
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
+from collections import OrderedDict
 import math
+from pyHydraulic.node_graphics_tiles import isTileCached
+from pyHydraulic.node_types import nodeTypeOfClass
 
 DEBUG = True
-# 控件的名称,每一个类型应该独一无二
-NODE_TYPES = ["pressure sensor",
-              "flow meter",
-              "tank",
-              "simple tank",
-              "gauge",
-              "servo valve",
-              "piston dual",
-              "piston right",
-              "piston left",
-              "pump",
-              "filter",
-              "accumulator",
-              "one-way valve",
-              "relief valve",
-              "text"
-              ]
+
+# 细节层次：控件在屏幕上的大小(较长边的像素数)小于LOD_BOX_PIXELS时只画一个实心方块，
+# 小于LOD_OUTLINE_PIXELS时只画外框，否则画完整的控件(paintDetail)
+NODE_LOD_BOX = 0
+NODE_LOD_OUTLINE = 1
+NODE_LOD_FULL = 2
+LOD_BOX_PIXELS = 8
+LOD_OUTLINE_PIXELS = 40
+# 文字在屏幕上小于这个像素数就看不清了，不画
+LOD_TEXT_PIXELS = 6
+
+# 静态控件的符号缓存：同一类型、选中状态和缩放档位(2的整数次幂)的控件共用一张画好的贴图
+SYMBOL_CACHE_SIZE = 256  # 最多缓存的贴图数，超过时丢掉最久没用的
+SYMBOL_CACHE_MAX_SIZE = 2048  # 贴图的最大像素尺寸，放得更大时直接画
+SYMBOL_CACHE_MARGIN = 10  # 线宽会画到boundingRect外面一点，贴图四周留出的余量
+
 # 所有的节点类的父类
 class QAbstractGraphicsNode(QGraphicsItem):
+    # 子类的符号除了选中状态以外不会变化(不随数值变化，也不显示文本)时设为True，绘制时使用共用的符号缓存
+    staticSymbol = False
+    _symbol_cache = OrderedDict()
+    # 子类的数值文本画在子图元(QNodePartItem)中时设为True，本体不显示文本，可以使用符号缓存
+    textInParts = False
+    # 子类有动画(比如油箱的波浪)时设为True，加入scene后由scene的动画时钟定时调用animationStep
+    animated = False
+    # 不在动画也没有选中时可以画在视图的分块缓存中
+    tileCacheable = True
+
     def __init__(self, node):
         super().__init__()
         # 下面是公共的变量放在下面
         self.node = node
-        self.width = 500  # 这两个属性可以根据具体控件在子类中修改
-        self.height = 120
+        # 控件的尺寸和socket的位置只在控件类型的登记表(node_types.py)中登记
+        type_info = node.type_info if node is not None else nodeTypeOfClass(type(self))
+        self.width = type_info.width if type_info is not None else 500
+        self.height = type_info.height if type_info is not None else 120
 
         # 修改选中和不选中的线型
         self._pen_default = QPen(Qt.white)# QPen(QColor("#7F000000"))
@@ -58,10 +73,8 @@ class QAbstractGraphicsNode(QGraphicsItem):
         self._unit = " "  # 显示的文本单位，不想显示，赋值为空即可
         self.textEnable = True  # 是否显示文本开关
         self.textFont = "微软雅黑"
-        # 下面存放本node中的socket的信息：包括1.socket位置坐标，2.socket的个数, 默认只有1个socket，在正中间
-        self.socketInfo = []  # 默认没有socket信息，就没有socket
-
-        # self.socketInfo = [[QPointF(1 / 2 * self.width, 1 / 2 * self.height), 0]]  # 后面0为socket颜色样式，取值0-5
+        # 最近一次绘制时的缩放比例(levelOfDetailFromTransform)，用来判断文字是否看得清
+        self._lod = 1.0
 
 
     @property
@@ -72,9 +85,10 @@ class QAbstractGraphicsNode(QGraphicsItem):
     def value(self, value):
         if isinstance(value, int) or isinstance(value, float):
             if (value >= self._minValue) and (value <= self._maxValue):
+                if value != self._value: self.aboutToChange()
                 self._value = value
                 self._percent = (self._value - self.minValue) / (self.maxValue - self.minValue)  # 0-1取值 百分数
-                self.update()  # 这个会调用下面的paint()函数
+                self.valueChanged()
 
     @property
     def maxValue(self):
@@ -82,6 +96,7 @@ class QAbstractGraphicsNode(QGraphicsItem):
     @maxValue.setter
     def maxValue(self, value):
         if value >= self.value:
+            if value != self._maxValue: self.aboutToChange()
             self._maxValue = value
         else:
             if DEBUG:
@@ -93,6 +108,7 @@ class QAbstractGraphicsNode(QGraphicsItem):
     @minValue.setter
     def minValue(self, value):
         if value<= self.value:
+            if value != self._minValue: self.aboutToChange()
             self._minValue = value
         else:
             if DEBUG:
@@ -105,6 +121,7 @@ class QAbstractGraphicsNode(QGraphicsItem):
     @text.setter
     def text(self, value):
         if type(value) == str:
+            if value != self._text: self.aboutToChange()
             self._text = value
         else:
             if DEBUG:
@@ -117,31 +134,68 @@ class QAbstractGraphicsNode(QGraphicsItem):
     @unit.setter
     def unit(self, value):
         if isinstance(value, str):  # 判断为字符串形式
+            if value != self._unit: self.aboutToChange()
             self._unit = value
         else:#
             if DEBUG:
                 print("node的单位不能为非字符串形式\n")
 
+    # 不检查范围直接设置数值和上下限，用于还原保存过的数据(保存的数据本身是一致的)
+    def restoreValues(self, value, minValue, maxValue):
+        if (value, minValue, maxValue) == (self._value, self._minValue, self._maxValue): return
+        self.aboutToChange()
+        self._minValue = minValue
+        self._maxValue = maxValue
+        self._value = value
+        if self._maxValue != self._minValue:
+            self._percent = (self._value - self._minValue) / (self._maxValue - self._minValue)
+        self.valueChanged()
+
+    # 数值变化后更新显示，默认重画整个控件。有运动部件的子类只移动或转动对应的子图元(QNodePartItem)，
+    # 只有运动部件新旧位置的区域需要重画
+    def valueChanged(self):
+        self.update()  # 这个会调用下面的paint()函数
+
+    # 文字在控件坐标中的外接矩形(pos为文字基线的起点)，画文字的子图元用它作为boundingRect
+    def textRect(self, font, pos, text):
+        rect = QFontMetricsF(font).boundingRect(text).translated(pos)
+        margin = rect.height() / 5
+        return rect.adjusted(-margin, -margin, margin, margin)
+
+    # 控件的状态(位置、角度、数值等)将要改变，通知历史记录保存改变之前的状态
+    def aboutToChange(self):
+        if self.node is not None:
+            self.node.scene.history.objectChanging(self.node)
+
+    def itemChange(self, change, value):
+        if change in (QGraphicsItem.ItemPositionChange, QGraphicsItem.ItemRotationChange, QGraphicsItem.ItemScaleChange):
+            self.aboutToChange()
+        elif self.animated and change == QGraphicsItem.ItemSceneChange:
+            if self.scene() is not None: self.scene().unsubscribeAnimation(self)
+        elif self.animated and change == QGraphicsItem.ItemSceneHasChanged:
+            if self.scene() is not None: self.scene().subscribeAnimation(self)
+        return super().itemChange(change, value)
+
+    # 动画时钟的一步，dt为经过的时间(秒)，只有在视图中看得见时才调用
+    def animationStep(self, dt):
+        pass
+
     # 拖拽node使之移动，触发该事件
     def mouseMoveEvent(self, event):
         super().mouseMoveEvent(event)
 
         # 鼠标变成十字箭头
         self.setCursor(Qt.SizeAllCursor)
-        # optimize me! just update the selected nodes
-        for node in self.scene().scene.nodes:
-            if node.grNode.isSelected():
-                node.updateConnectedEdges()
+        # 只更新选中的node相连的edge，在下一帧统一更新
+        self.node.scene.dragMoved()
         self.wasMoved = True
 
-
-
-
     # 拖拽node后，释放鼠标, 触发该事件
     def mouseReleaseEvent(self, event):
         super().mouseReleaseEvent(event)
         # 鼠标还原成正常箭头
         self.setCursor(Qt.ArrowCursor)
+        self.node.scene.endDrag()
 
         if self.wasMoved:
             self.wasMoved = False
@@ -179,9 +233,38 @@ class QAbstractGraphicsNode(QGraphicsItem):
     def initUI(self):
         self.setFlag(QGraphicsItem.ItemIsSelectable)
         self.setFlag(QGraphicsItem.ItemIsMovable)
+        self.setFlag(QGraphicsItem.ItemSendsGeometryChanges)
+
+    # 缩放比例为lod时的细节层次
+    def detailLevel(self, lod):
+        pixels = max(self.width, self.height) * lod
+        if pixels < LOD_BOX_PIXELS: return NODE_LOD_BOX
+        if pixels < LOD_OUTLINE_PIXELS: return NODE_LOD_OUTLINE
+        return NODE_LOD_FULL
+
+    # 字号为font_size(scene单位)的文字在最近一次绘制时是否看得清
+    def isTextLegible(self, font_size):
+        return font_size * self._lod >= LOD_TEXT_PIXELS
 
-    # 该函数只是在选中的时候，绘制一个框框和原点十字，需要在子类中重写
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None): #自己在子类中重新实现这个函数
+    # 按缩放比例选择细节层次：缩得很小时只画方块或外框，具体控件的绘制在子类的paintDetail中
+    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
+        if isTileCached(self, widget): return
+        self._lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        level = self.detailLevel(self._lod)
+        if level == NODE_LOD_BOX:
+            painter.fillRect(self.boundingRect(), self._pen_default.color() if not self.isSelected() else self._pen_selected.color())
+            return
+
+        self.paintSelection(painter)
+        if level == NODE_LOD_OUTLINE:
+            self.paintOutline(painter)
+        elif self.isSymbolCacheable():
+            self.paintCachedDetail(painter, QStyleOptionGraphicsItem, widget)
+        else:
+            self.paintDetail(painter, QStyleOptionGraphicsItem, widget)
+
+    # 该函数只是在选中的时候，绘制一个框框和原点十字
+    def paintSelection(self, painter):
         if self.isSelected():
             painter.save()
             painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)  # 把笔给画家
@@ -193,883 +276,96 @@ class QAbstractGraphicsNode(QGraphicsItem):
             pen.setColor(Qt.red)
             pen.setWidth(4)
             painter.setPen(pen)  # 把笔给画家
-            painter.drawLine(-self.width / 5,0, self.width / 5,0)
-            painter.drawLine(0, -self.height/10, 0, self.height/10)
-            painter.drawRect(-self.width/2, -self.height/2, self.width, self.height)
+            painter.drawLine(QLineF(-self.width / 5,0, self.width / 5,0))
+            painter.drawLine(QLineF(0, -self.height/10, 0, self.height/10))
+            painter.drawRect(QRectF(-self.width/2, -self.height/2, self.width, self.height))
 
             painter.restore()
-# 1.静止的压力传感器，继承自子上面的node
-class GraphicsNode_pressure_sensor(QAbstractGraphicsNode):
-    def __init__(self, node=None):
-        super().__init__(node)
-        self.unit = "MPa"
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.width = 250  # 整个控件边界的宽度
-        self.height = self.width * 3.0 /2  # 整个控件边界的高度
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(0, self.height/2), 2]]
-
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)  # 把笔给画家
-
-        # 1.画出整个控件的轮廓
-        # painter.drawRect(0, 0, self.width, self.height)
-
-        # 1. 绘制一个圆 QtGui.QPainter.drawEllipse(center, rx, ry)
-        r = self.height / 3.0
-        painter.drawEllipse(QPoint(0, - self.height/6), r, r)  #
-        # 2.绘制一条竖线,作为支架
-        painter.drawLine(0, self.height/6, 0, self.height/2)  #
-        # 3.绘制叉叉
-        painter.drawLine(r * (1 - math.sin(math.pi / 180 * 45))- self.width /2, r * (1 - math.cos(math.pi / 180 * 45)) - self.height /2,
-                         r * (1 + math.cos(math.pi / 180 * 45)) - self.width /2 , r * (1 + math.sin(math.pi / 180 * 45)) - self.height /2)  #
-        painter.drawLine(r * (1 - math.sin(math.pi / 180 * 45)) - self.width /2 , r * (1 + math.cos(math.pi / 180 * 45))- self.height /2 ,
-                         r * (1 + math.cos(math.pi / 180 * 45)) - self.width /2 , r * (1 - math.sin(math.pi / 180 * 45)) - self.height /2 )  #
-        #
-        # index =0
-        # for socket in self.node.sockets:
-        #     self.socketInfo[index][0] = QPointF(socket.grSocket.x(), socket.grSocket.y())
-        #     index +=1
-# 2.静止的流量传感器
-class GraphicsNode_flow_meter(QAbstractGraphicsNode):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.unit = "mL"
-        self.width = 200  # 整个控件边界的宽度
-        self.height = self.width * 2  # 整个控件边界的高度
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(0, - self.height/2), 2],
-                           [QPointF(0, self.height/2), 2]
-                           ]
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-
-        # 根据获取的坐标，更新要绘制的路径
-        path = QPainterPath()
 
-        # 画2个竖线
+    # 缩小时画的简化外框，子类可以重写成更像自己的形状
+    def paintOutline(self, painter):
         painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
-        painter.drawLine(0, - self.height / 2, 0, - self.height * 1 / 4)
-        painter.drawLine(0, self.height * 1 / 4, 0, self.height / 2)
-        painter.drawEllipse(QPointF(0, 0), self.height / 4,
-                            self.height / 4)
-        # 画1个圆上个两个弧形
-
-        painter.drawArc(
-            QRect(-self.width * 9 / 10, - self.height * 4/ 24, self.height / 3, self.height / 3),
-            -60 * 16, 120 * 16)
-        painter.drawArc(QRect(self.width * 2.3 / 10, - self.height * 4 / 24, self.height /3, self.height / 3),
-            120 * 16, 120 * 16)
-
-        # 画1个圆，圆心，直径
-        # path.addEllipse(QPointF(self.width / 2, self.height / 2), self.height / 6, self.height /6)
-
-        # 画1个圆上个两个弧形
-        # path.arcTo(self.width* 8/ 24, self.height *5/ 12, self.height / 4 , self.height / 4, -45, 90)
-
-        # 路径
-        # self.setPath(path)
-        # painter.setBrush(Qt.lightGray)
-        # painter.drawPath(path)
-
-        #  添加文字路径
-        # 4.显示文本
-        if self.textEnable:
-            self.text = str(round(self.value, 1)) + self.unit
-            # painter.setPen(self._pen_default)
-            painter.setFont(QFont(self.textFont, self.width / 4, QFont.Medium))  # 第二个参数是字体大小
-            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-            painter.drawText(QPointF(0, self.height * 0.45), self.text)
-# 3.tank：液面会动的油箱
-class GraphicsNode_tank(QAbstractGraphicsNode):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.unit = "cm"
-        self.width = 1000  # 整个控件边界的宽度
-        self.height = self.width*1 # 整个控件边界的高度
-
-        # 波浪相关的变量
-        self._frequency = 0.0015  # 波浪的频率,Hz
-        self._amplitude = self.width / 50  # 像素，波浪幅值
-        self._phase1 = 0  # 像素，波浪1相位
-        self._phase2 = 0  # 像素，波浪2相位
-        self._deepth = 0  # 水位高度
-        # 修改父类变量
-        self.maxValue = 100
-        self.minValue = 0
-        self.value = 20  # _value为内部变量，此句话意思要调用一下value函数，更新初始状态
-
-
-        # 定义一个Timer，刷新波浪用的
-        # 定时器初始化
-        self.timer = QTimer()
-
-        self.t = 0  # 时间
-        self.sampleTime = 0.1 # s
-        self.timer.setInterval(self.sampleTime * 1000)  # ms
-        self.timer.timeout.connect(self.time_out)
-        self.timer.start()
-
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(0,- self.height /2), 2]]
-
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-
-        waterPath1 = QPainterPath()
-
-        # 1.开始画波浪线
-        # 第一条波浪路径集合
-        waterPath1 = QPainterPath()
-        # 第二条波浪路径集合
-        waterPath2 = QPainterPath()
-
-        self._deepth = self._percent * self.height * 3 / 4  # 像素单位的深度
-        y_deep = self.height - self._deepth - self._amplitude - self.height/2  # 液面的中值坐标
-        waterPath1.moveTo(-self.width/2, y_deep)
-        waterPath2.moveTo(-self.width / 2, y_deep)
-
-        self._phase1 = self.width / 400 * self.t  # 每次更新相位自动加
-        self._phase2 = self.width / 400 * self.t + 2 * math.pi * self._frequency * self.width /5 # 每次更新相位自动加
-        # 开始填充波浪
-        startDraw = -self.width //2
-        endDraw =  self.width // 2
-        stepDraw = self.width // 50
-        for x_wave in range(startDraw, endDraw, stepDraw):
-            y_wave1 = self._amplitude * math.sin(2 * math.pi * self._frequency * x_wave + self._phase1) + y_deep  # 计算波浪点y坐标
-            y_wave2 = self._amplitude * math.sin(2 * math.pi * self._frequency * x_wave + self._phase2) + y_deep  # 计算波浪点y坐标
-
-            waterPath1.lineTo(x_wave, y_wave1)
-            waterPath2.lineTo(x_wave, y_wave2)
-
-        waterPath1.lineTo(self.width / 2, y_deep)  # 移动到右下角结束点,整体形成一个闭合路径
-        waterPath1.lineTo(self.width / 2, self.height / 2)  # 移动到右下角结束点,整体形成一个闭合路径
-        waterPath2.lineTo(self.width / 2, y_deep)
-        waterPath2.lineTo(self.width / 2, self.height / 2)  # 移动到右下角结束点,整体形成一个闭合路径
-
-        waterPath1.lineTo(-self.width / 2, self.height/2)
-        waterPath2.lineTo(-self.width / 2, self.height/2)
-
-        waterPath1.lineTo(-self.width / 2, y_deep)
-        waterPath2.lineTo(-self.width / 2, y_deep)
-
-        # 大路径
-        bigPath = QPainterPath()
-        #后背景
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(QColor("#008B8B"))
-        # painter.setOpacity(0.3)
-        painter.drawPath(waterPath1)
-
-        painter.setBrush(QColor("#40E0D0"))
-        painter.setOpacity(0.5)
-        painter.drawPath(waterPath2)
-         # 2.画出整个tank的轮廓
-        painter.setOpacity(1)
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
-
-        painter.drawLine(-self.width/2, - self.height * 1 / 4, -self.width/2, self.height/2)
-        painter.drawLine(-self.width/2, self.height/2, self.width/2, self.height/2)
-        painter.drawLine(self.width/2, self.height/2, self.width/2, -self.height * 1 / 4)
-        # 画出最后的中间管路
-        painter.drawLine(0, - self.height/2, 0, self.height * 2 / 5)
-        # 4.显示文本
-        if self.textEnable:
-            self.text = str(round(self.value, 1)) + self.unit + "(" + format(self._percent, '.0%') + ")"
-            # painter.setPen(self._pen_default)
-            painter.setFont(QFont(self.textFont, self.width / 12, QFont.Medium))  # 第二个参数是字体大小
-            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-            # 波浪的总高度，也就深度，不是幅值，从液面顶到油箱底的深度
-            painter.drawText(- self.width *3/ 8, self.height * 0.46, self.text)
-
-    def time_out(self):
-        self.t += self.sampleTime
-        self.update()
-# 3.simple_tank：静止的简单tank符号
-class GraphicsNode_simple_tank(QAbstractGraphicsNode):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.unit = "cm"
-        self.width = 250  # 整个控件边界的宽度
-        self.height = self.width/2  # 整个控件边界的高度
-
-         # 修改父类变量
-        self.maxValue = 100
-        self.minValue = 0
-        self.value = 50  # _value为内部变量，此句话意思要调用一下value函数，更新初始状态
-
-        self.textEnable = False
-
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(0, -self.height/2), 2]]
-
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-        # self._deepth = self._percent * self.height * 1 / 2  # 像素单位的深度
-        # y_deep = self.height - self._deepth - self._amplitude  # 液面的中值坐标
-        # path.moveTo(0, y_deep)
-        #
-        # self._phase1 = self.width / 50 * self.t  # 每次更新相位自动加
-        # for x_wave in range(self.width):
-        #     y_wave = self._amplitude * math.sin(2 * math.pi * self._frequency * x_wave + self._phase1) + y_deep  # 计算波浪点y坐标
-        #     path.lineTo(x_wave, y_wave)
-        # path.lineTo(self.width, self.height)
-        # path.lineTo(0, self.height)
-        # path.lineTo(0, y_deep)
-        #
-        # painter.setBrush(Qt.darkRed)
-        # painter.setOpacity(0.2)
-        # painter.drawPath(path)
-        # 2.画出整个tank的轮廓
-        painter.setOpacity(1)
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
-
-        painter.drawLine(-self.width /2, 0, -self.width /2, self.height/2)
-        painter.drawLine(-self.width /2, self.height/2, self.width /2, self.height/2)
-        painter.drawLine(self.width/2, self.height/2, self.width/2, 0)
-        # 画出最后的中间管路
-        painter.drawLine(0, -self.height/2, 0, self.height * 2 / 5)
-        # 4.显示文本
-        if self.textEnable:
-            self._text = str(round(self.value, 1)) + self.unit + "(" + format(self._percent, '.0%') + ")"
-            painter.setPen(self._pen_default)
-            painter.setFont(QFont(self.textFont, self.width / 10, QFont.Medium))  # 第二个参数是字体大小
-            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-            # 波浪的总高度，也就深度，不是幅值，从液面顶到油箱底的深度
-            painter.drawText(self.width / 4, self.height * 0.95, self._text)
-# 4.Gauge：会转动的仪表盘
-class GraphicsNode_gauge(QAbstractGraphicsNode):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.unit = "MPa"
-        self.width = 300  # 整个控件边界的宽度
-        self.height = self.width*2  # 整个控件边界的高度
-
-        # 与偏转相关的物理量
-        self.maxValue = 30
-        self.minValue = 0
-        self.value = 0  # _value为内部变量，此句话意思要调用一下value函数，更新初始状态
-
-        self._angel = 0  # 偏转的角度：protected
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(0, self.height/2), 2]]
-
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)# 把笔给画家
-        # 1.画出整个控件的轮廓
-        # painter.drawRect(0, 0, self.width, self.height)
-
-        # 1. 绘制一个圆 QtGui.QPainter.drawEllipse(center, rx, ry)
-        r = self.height / 4
-        painter.drawEllipse(QPoint(r-self.width / 2, r - self.height / 2), r, r)  #
-        # 2.绘制一条竖线,作为支架
-        painter.drawLine(0, 0, 0, self.height/2)  #
-        # 绘制旋转点
-        painter.save()
-        painter.setBrush(Qt.black)
-        painter.drawEllipse(QPointF(r -self.width / 2, r - self.height / 2), self.width / 40, self.width / 40)
-        painter.restore()
-        # painter.drawPoint(r -self.width / 2, r - self.height / 2)
-        # 3.绘制指针
-        painter.save()
-        # min-max 对应 0-360°转角
-        pen = painter.pen()
-        pen.setWidth(8)
-        painter.setPen(pen)
-        self._angel = self._percent * 360  # 度
-        self._angel = 240 / 360 * self._angel + 60  # 只从60-300转换
-
-        painter.drawLine(r * (1 - math.sin(math.pi / 180 * self._angel) * 3 / 5) -self.width / 2,
-                         r * (1 + math.cos(math.pi / 180 * self._angel) * 3 / 5) - self.height / 2,
-                         r * (1 + math.sin(math.pi / 180 * self._angel) / 5) - self.width / 2,
-                         r * (1 - math.cos(math.pi / 180 * self._angel) / 5)- self.height / 2 )  #
-
-        painter.restore()
-        # 4.绘制刻盘圆弧
-        # （实际单位为1 / 16度），QPainter.drawArc(rect, a（起始角度）, alen（划过的圆角，单位为1/16度）)
-        # 画绿色圆弧
-        painter.save()
-        pen = QPen()
-        # painter.setOpacity(0.4)
-        pen.setWidth(30)
-        pen.setColor(QColor("#7B68EE"))
-        painter.setPen(pen)  # 把笔给画家
-        painter.drawArc(QRect(r * 1 / 5 -self.width / 2, r * 1 / 5 - self.height / 2, r * 8 / 5, r * 8 / 5), 210 * 16, -180 * 16)  # 绘画角度为30°~(330°)
-        # 画红色圆弧
-        pen.setWidth(30)
-        pen.setColor(QColor("#FF0000"))
-        painter.setPen(pen)  # 把笔给画家
-        painter.drawArc(QRect(r * 1 / 5 -self.width / 2, r * 1 / 5 - self.height / 2, r * 8 / 5, r * 8 / 5), 30 * 16, -60 * 16)  # 绘画角度为30°~(330°)
-
-        painter.restore()
-        # 4.显示文本
-        if self.textEnable:
-            self._text = str(round(self.value, 1)) + self.unit
-            # painter.setPen(self._pen_default)
-            painter.setFont(QFont(self.textFont, self.width/6, QFont.Medium))  # 第二个参数是字体大小
-            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-            painter.drawText(-self.width*1/4, -self.height*0.3/7, self._text)
-# 5.Gauge：伺服阀
-class GraphicsNode_servo_valve(QAbstractGraphicsNode):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.node_type = "servo valve"
-        self.unit = "mA"
-        self.width = 2500  # 整个控件边界的宽度
-        self.height = self.width/4  # 整个控件边界的高度
-        self._OffsetPix = 0  # 阀芯偏移的像素点
-        # 与偏转相关的物理量
-        self.maxValue = 100
-        self.minValue = -100
-        self.value = 0  # _value为内部变量，此句话意思要调用一下value函数，更新初始状态
-        # 修改 socket坐标信息
-        self.socketInfo = [[QPointF(1 / 20 * self.width, self.height/2), 2],
-                           [QPointF(-1 / 20 * self.width, self.height/2), 2],
-                           [QPointF(-1 / 20 * self.width, -self.height/2), 2],
-                           [QPointF(1 / 20 * self.width, -self.height/2), 2]
-                           ]
-        # 箭头子类嵌入到本控件中
-        self._arrow_left = MyArrowItem(self, QPointF(self.width * -11.5 / 25, self.height * 4.5 / 10), QPointF(self.width * -7.5 / 25, 0))
-        self._arrow_left.arrowLength = self.width / 50
-
-        self._arrow_right = MyArrowItem(self, QPointF(self.width * 11.5 / 25, self.height * 4.5 / 10), QPointF(self.width * 7.5 / 25, 0))
-        self._arrow_right.arrowLength = self.width / 50
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(self.boundingRect())
+
+    # 完整的控件绘制，需要在子类中重写
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        pass
+
+    def isSymbolCacheable(self):
+        scene = self.scene()
+        if scene is not None and not getattr(scene, 'symbolCacheEnabled', True): return False
+        return self.staticSymbol and (self.textInParts or not self.textEnable)
+
+    # 用共用的贴图画静态控件，贴图按缩放档位画好，显示时只会缩小(0.5~1倍)
+    def paintCachedDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        band = int(math.ceil(math.log2(self._lod)))
+        rect = self.boundingRect().adjusted(-SYMBOL_CACHE_MARGIN, -SYMBOL_CACHE_MARGIN, SYMBOL_CACHE_MARGIN, SYMBOL_CACHE_MARGIN)
+        key = (type(self), self.isSelected(), band, rect.width(), rect.height())
+        pixmap = self._symbol_cache.get(key)
+        if pixmap is None:
+            scale = 2.0 ** band
+            width, height = int(math.ceil(rect.width() * scale)), int(math.ceil(rect.height() * scale))
+            if max(width, height) > SYMBOL_CACHE_MAX_SIZE:
+                self.paintDetail(painter, QStyleOptionGraphicsItem, widget)
+                return
+            pixmap = QPixmap(width, height)
+            pixmap.fill(Qt.transparent)
+            symbol_painter = QPainter(pixmap)
+            symbol_painter.setRenderHints(painter.renderHints())
+            symbol_painter.scale(width / rect.width(), height / rect.height())
+            symbol_painter.translate(-rect.left(), -rect.top())
+            self.paintDetail(symbol_painter, QStyleOptionGraphicsItem, widget)
+            symbol_painter.end()
+
+            self._symbol_cache[key] = pixmap
+            if len(self._symbol_cache) > SYMBOL_CACHE_SIZE: self._symbol_cache.popitem(last=False)
+        else:
+            self._symbol_cache.move_to_end(key)
+        painter.drawPixmap(rect, pixmap, QRectF(pixmap.rect()))
 
-        # 根据获取的坐标，更新要绘制的路径
+    # 改了静态控件的绘制代码或者笔之后，清掉画好的贴图
+    @classmethod
+    def clearSymbolCache(cls):
+        QAbstractGraphicsNode._symbol_cache.clear()
 
-        path = QPainterPath()
 
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
-        # 画2个横线
-        painter.save()
-        pen = painter.pen()
-        pen.setWidth(20)
-        painter.setPen(pen)
-        path.moveTo(self.width *-1.5 / 5, -self.height/2)
-        path.lineTo(self.width * 1.5 / 5,  -self.height/2)
-        path.moveTo(self.width * -1.5 / 5, self.height/2)
-        path.lineTo(self.width * 1.5 / 5, self.height/2)
-        painter.drawPath(path)
-        path.clear()
-        painter.restore()
-        # 添加矩形阀芯，从下面开始就是要整体偏移的绘图
-        # 计算出杆和隔离柱整体的像素偏移, 距离正中间偏移为0，左边为负，右为正
-        self._OffsetPix = (self._percent - 0.5) * self.width * (2 / 5)
-
-        path.addRect(self.width * -1.5 / 5 + self._OffsetPix, self.height *-4 / 10, self.width * 3 / 5,
-                     self.height * 8 / 10)
-        # 添加矩形电磁线圈
-        path.addRect(-self.width / 2 + self._OffsetPix, self.height * 2 / 10, self.width * 1 / 5, self.height * 2 / 10)
-        path.addRect(self.width * 1.5 / 5 + self._OffsetPix, self.height * 2 / 10, self.width * 1 / 5,
-                     self.height * 2 / 10)
-
-        # 画线左线圈上的线
-        path.moveTo(self.width * -11.5/ 25 + self._OffsetPix, self.height * 4 / 10)
-        path.lineTo(self.width * -10.5 / 25 + self._OffsetPix, self.height * 2 / 10)
-        path.moveTo(self.width * -8.5 / 25 + self._OffsetPix, self.height * 4 / 10)
-        path.lineTo(self.width * -9.5 / 25 + self._OffsetPix, self.height * 2 / 10)
-        # 画线右线圈上的线
-        path.moveTo(self.width * 8.5 / 25 + self._OffsetPix, self.height * 4 / 10)
-        path.lineTo(self.width * 9.5 / 25 + self._OffsetPix, self.height * 2 / 10)
-        path.moveTo(self.width * 11.5 / 25 + self._OffsetPix, self.height * 4 / 10)
-        path.lineTo(self.width * 10.5 / 25 + self._OffsetPix, self.height * 2 / 10)
-        # 画中间的竖线
-        path.moveTo(self.width * -0.5 / 5 + self._OffsetPix, self.height * - 4 / 10)
-        path.lineTo(self.width * -0.5 / 5 + self._OffsetPix, self.height * 4 / 10)
-
-        path.moveTo(self.width * -1 / 20 + self._OffsetPix, self.height * -4 / 10)
-        path.lineTo(self.width * -1 / 20 + self._OffsetPix, self.height * 4 / 10)
-
-        path.moveTo(self.width * 1 / 20 + self._OffsetPix, self.height * -4 / 10)
-        path.lineTo(self.width * 1 / 20 + self._OffsetPix, self.height * 4 / 10)
-
-        path.moveTo(self.width * 0.5 / 5 + self._OffsetPix, self.height * -4 / 10)
-        path.lineTo(self.width * 0.5 / 5 + self._OffsetPix, self.height * 4 / 10)
-        # 中间横线
-        path.moveTo(self.width * -1 / 20 + self._OffsetPix, 0)
-        path.lineTo(self.width * 1 / 20 + self._OffsetPix, 0)
-
-        # 画左边的竖线
-        path.moveTo(self.width * -5 / 20 + self._OffsetPix, self.height * -4 / 10)
-        path.lineTo(self.width * -5 / 20 + self._OffsetPix, self.height * 4 / 10)
-
-        path.moveTo(self.width * -3 / 20 + self._OffsetPix, self.height * -4 / 10)
-        path.lineTo(self.width * -3 / 20 + self._OffsetPix, self.height * 4 / 10)
-
-        # 画右边的斜线
-        path.moveTo(self.width * 3 / 20 + self._OffsetPix, self.height * -4 / 10)
-        path.lineTo(self.width * 5 / 20 + self._OffsetPix, self.height * 4 / 10)
-
-        path.moveTo(self.width * 3 / 20 + self._OffsetPix, self.height * 4 / 10)
-        path.lineTo(self.width * 5 / 20 + self._OffsetPix, self.height * -4 / 10)
-
-        painter.setBrush(Qt.black)
-        painter.drawPath(path)
-
-        # 中间添加两个点.点的直径为3
-        path.addEllipse(QPointF(self.width * -1 / 20 + self._OffsetPix, 0), 3, 3)
-        path.addEllipse(QPointF(self.width * 1 / 20 + self._OffsetPix, 0), 3, 3)
-
-        # path.setFillRule(Qt.WindingFill)  # 所有闭合曲线全部填充
-        # 路径
-        painter.setBrush(Qt.darkGreen)
-        painter.drawPath(path)
-
-        # 两个箭头移动位置,下面self._arrow_right.update()比较耗时,父控件更新，子空间也默认更新
-        self._arrow_left.source = QPointF(self.width * -11.5 / 25 + self._OffsetPix, self.height * 4.5 / 10)
-        self._arrow_left.dest = QPointF(self.width * -7.5 / 25 + self._OffsetPix, 0)
-
-        self._arrow_right.source = QPointF(self.width * 11.5 / 25 + self._OffsetPix, self.height * 4.5 / 10)
-        self._arrow_right.dest = QPointF(self.width * 7.5 / 25 + self._OffsetPix, 0)
-
-
-        #  添加文字路径
-        # 4.显示文本
-        if self.textEnable:
-            self._text = str(round(self.value, 1)) + self.unit
-            painter.setPen(self._pen_default)
-            painter.setFont(QFont(self.textFont, self.width / 20, QFont.Medium))  # 第二个参数是字体大小
-            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-            painter.drawText(QPointF(-self.width/2 + self._OffsetPix, 0), self._text)
-# 6.piston：会伸缩的液压缸
-class GraphicsNode_pistion(QAbstractGraphicsNode):
-    # Piston_type_dual = 0  # 对称缸
-    # Piston_type_right = 1  # 右出杆缸
-    # Piston_type_left = 2  # 左出杆缸
-
-    def __init__(self, parent=None):
+# 控件中的运动部件(阀芯、活塞杆、指针、数值文本等)，数值变化时只重画这个子图元，控件本体不变
+class QNodePartItem(QGraphicsItem):
+    def __init__(self, parent, paintFunction, rect=QRectF()):
         super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.unit = "cm"
-        self.width = 5000  # 整个控件边界的宽度
-        self.height = self.width/8  # 整个控件边界的高度
-        self._OffsetPix = 0  # 阀芯偏移的像素点
-
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(-9 / 40 * self.width, self.height/2), 2], [QPointF(9 / 40 * self.width, self.height/2), 2]]
-
-        # 计算加速度方向的属性，即连续三个缸的位置采样点
-        self.x1 = 0
-        self.x2 = 0
-        self.x3 = 0
-        self.acceleration = 0  # 加速度方向默认为0
-
-        # 与偏转相关的物理量
-        self.maxValue = 100
-        self.minValue = -100
-        self.value = 0  # _value为内部变量，此句话意思要调用一下value函数，更新初始状态
-
-
-    # 做的玩，判断缸加速度方向，加速度向右，返回正，否则返回负
-    def jugde_acceleration(self, position):
-        self.x1 = self.x2
-        self.x2 = self.x3
-        self.x3 = position
-        acceleration = self.x3 - 2 * self.x2 + self.x1
-        return acceleration  # 加速度大于零，即方向向右
-
-    # 重写父类value赋值属性，赋值的时候才更新加速度状态
-    @QAbstractGraphicsNode.value.setter
-    def value(self, value):
-        self.acceleration = self.jugde_acceleration(value)
-        super(GraphicsNode_pistion, GraphicsNode_pistion).value.__set__(self, value)
+        self._paint_function = paintFunction
+        self._rect = QRectF(rect)
 
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-
-        pen = QPen()
-        pen.setStyle(Qt.DashDotLine)
-        pen.setWidth(2)
-        pen.setColor(Qt.black)
-
-
-
-
-        # 1.画出整个缸体的轮廓(起始x,起始y,宽，高),缸整体宽度为1/2控件宽度
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)# 把笔给画家
-        painter.drawRect(self.width *-1/4, -self.height/2, self.width/2, self.height)
-        # 2.画出各个腔室
-        pen.setStyle(Qt.NoPen)
-        painter.setOpacity(0.6)
-        painter.setPen(pen)  # 把笔给画家
-
-        # 计算偏移的像素点和加速度
-        self._OffsetPix = (self._percent - 0.5) * self.width * (1 / 2 - 1 / 20)
-        # self.acceleration = self.jugde_acceleration(self.value)
-
-        if self.acceleration > 0:  # 表示缸偏右
-            # 左腔室轮廓
-            painter.setBrush(Qt.red)  # 填充颜色
-            painter.drawRect(self.width *(-1/ 4), -self.height / 2, self.width / 4 + self._OffsetPix, self.height)
-            # 右腔室轮廓
-            painter.setBrush(QColor("#40E0D0"))  # 填充颜色
-            painter.drawRect(0 + self._OffsetPix, -self.height / 2, self.width / 4 - self._OffsetPix,
-                             self.height)
-        elif self.acceleration < 0:  # 表示缸偏左边
-            painter.setBrush(QColor("#40E0D0"))  # 填充颜色
-            painter.drawRect(self.width * -1 / 4, -self.height/2, self.width / 4 + self._OffsetPix, self.height)
-            # 右腔室轮廓
-            painter.setBrush(Qt.red)  # 填充颜色
-            painter.drawRect(0 + self._OffsetPix, -self.height/2, self.width / 4 - self._OffsetPix,
-                             self.height)
-        elif self.acceleration == 0:  # 表示缸偏右边
-            painter.setBrush(QColor("#40E0D0"))  # 填充颜色
-            painter.drawRect(self.width *-1/ 4, -self.height/2, self.width / 4 + self._OffsetPix, self.height)
-            # 右腔室轮廓
-            painter.setBrush(QColor("#40E0D0"))  # 填充颜色
-            painter.drawRect(0 + self._OffsetPix, -self.height/2, self.width / 4 - self._OffsetPix,
-                             self.height)
-
-        # painter.drawRect(self.width * 1 / 4, 0, self.width * 2 / 4, self.height)
-        # 3.画缸中间的隔离柱，隔离柱厚度取1/20的控件宽度
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)# 把笔给画家
-        painter.setBrush(QColor("#B8860B"))  # 填充颜色
-        painter.setOpacity(1)
-        painter.drawRect(self.width * - 1 / 80 + self._OffsetPix, - self.height/2, self.width * 2 / 80,
-                         self.height)
-        # 3.根据缸的类型，画缸左右出杆，中位出杆伸出缸外面长度为1/40控件宽度，杆的上下高度为1/10控件高度
-        if self.node._node_type == "piston dual":  # 对称缸
-            # 3.画缸左出杆，中位出杆伸出缸外面长度为1/40控件宽度，杆的上下高度为1/10控件高度
-            painter.drawRect(self.width * (-1 / 4 - 1 / 80) + self._OffsetPix, self.height *  - 1 / 20,
-                             self.width * 1 / 4, self.height * 1 / 10)
-            # 4.画缸右出杆，中位出杆伸出缸外面长度为1/40控件宽度，杆的上下高度为1/10控件高度
-            painter.drawRect(self.width * (1 / 80) + self._OffsetPix, self.height * (- 1 / 20),
-                             self.width * 1 / 4, self.height * 1 / 10)
-        elif self.node._node_type == "piston right":  # 右出杆
-            painter.drawRect(self.width * (1 / 80) + self._OffsetPix, self.height * (- 1 / 20),
-                             self.width * 1 / 4, self.height * 1 / 10)
-        elif self.node._node_type == "piston left":  # 左出杆
-            painter.drawRect(self.width * (-1 / 4 - 1 / 80) + self._OffsetPix, self.height * (- 1 / 20),
-                             self.width * 1 / 4, self.height * 1 / 10)
-
-        # 5.显示文本
-        if self.textEnable:
-            self._text = str(round(self.value, 1)) + self.unit
-            painter.setPen(self._pen_default)
-            painter.setFont(QFont(self.textFont, self.width / 20, QFont.Medium))  # 第二个参数是字体大小
-            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-            painter.drawText(-self.width/3.8 + self._OffsetPix, -self.width/100, self._text)
-# 7.filter:静止的定量泵
-class GraphicsNode_pump(QAbstractGraphicsNode):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.unit = "L/min"
-        self.width = 300  # 整个控件边界的宽度
-        self.height = self.width * 2  # 整个控件边界的高度
-        self.textEnable = False
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(0, -self.height/2), 2],
-                           [QPointF(0, self.height/2), 2]
-                           ]
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-        # 根据获取的坐标，更新要绘制的路径
+    # 所属的控件，运动部件可以挂在另一个运动部件下面
+    def grNode(self):
+        item = self.parentItem()
+        while not isinstance(item, QAbstractGraphicsNode): item = item.parentItem()
+        return item
 
+    def setRect(self, rect):
+        if rect == self._rect: return
+        self.prepareGeometryChange()
+        self._rect = QRectF(rect)
 
-        # 画2个竖线
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
-        painter.drawLine(0, -self.height/2, 0, self.height * -1 / 4)
-        painter.drawLine(0, self.height * 1 / 4, 0, self.height/2)
-        painter.drawEllipse(QPointF(0, 0), self.height / 4,
-                            self.height / 4)
-        # 画1个圆上个1个箭头
-        tranglePath = QPainterPath()
-        tranglePath.moveTo(0, self.height *-1/ 4)
-        tranglePath.lineTo(self.width / 8, self.height *-1/ 8)
-        tranglePath.lineTo(-self.width / 8, self.height *-1/ 8)
-        tranglePath.lineTo(0, self.height * -1/ 4)
-        painter.setBrush(Qt.black)
-        painter.drawPath(tranglePath)
-        #  添加文字路径
-        # 4.显示文本
-        if self.textEnable:
-            self._text = str(round(self.value, 1)) + self.unit
-            painter.setPen(self._pen_default)
-            painter.setFont(QFont(self.textFont, self.width / 4, QFont.Medium))  # 第二个参数是字体大小
-            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-            painter.drawText(QPointF(self.width * 2 / 3, self.height), self._text)
-# 8.filter:静止的油滤
-class GraphicsNode_filter(QAbstractGraphicsNode):
-    def __init__(self,parent=None):
-        super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.unit = "L/min"
-        self.width = 200  # 整个控件边界的宽度
-        self.height = self.width * 1.6  # 整个控件边界的高度
-        self.textEnable = False
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(0, -self.height/2), 2],
-                           [QPointF(0, self.height/2), 2]
-                           ]
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-        # 根据获取的坐标，更新要绘制的路径
+    def boundingRect(self):
+        return self._rect
 
+    # 运动部件不参与点击和框选，点到它时选中的是所属的控件
+    def shape(self):
+        return QPainterPath()
 
-        # 画2个竖线
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
-        painter.drawLine(0, -self.height/2, 0, self.height * - 1.5 / 5)
-        painter.drawLine(0, self.height * 1.5 / 5, 0, self.height/2)
-         # 画1个个正方形
-        Path = QPainterPath()
-        Path.moveTo(0, self.height * -1.5/ 5)
-        Path.lineTo(-self.width / 2, 0)
-        Path.lineTo(0, self.height * 1.5 / 5)
-        Path.lineTo(self.width/2 , 0)
-        Path.lineTo(0, self.height *-1.5/ 5)
-
-        painter.setBrush(QColor("#B8860B"))
-        painter.drawPath(Path)
-        # 画中间虚线
-        pen = painter.pen()
-        pen.setStyle(Qt.DotLine)
-        pen.setWidth(5)
-        painter.setPen(pen)
-        painter.drawLine(-self.width/2, 0, self.width/2, 0)
-
-
-
-        # painter.drawArc(
-        #     QRect(-self.width * 2 / 5, self.height * 9.2 / 24, self.height / 4, self.height / 4),
-        #     -60 * 16, 120 * 16)
-        # painter.drawArc(
-        #     QRect(self.width * 3.5 / 5, self.height * 9.2 / 24, self.height / 4, self.height / 4),
-        #     120 * 16, 120 * 16)
-
-        # 画1个圆，圆心，直径
-        # path.addEllipse(QPointF(self.width / 2, self.height / 2), self.height / 6, self.height /6)
-
-        # 画1个圆上个两个弧形
-        # path.arcTo(self.width* 8/ 24, self.height *5/ 12, self.height / 4 , self.height / 4, -45, 90)
-
-        # 路径
-        # self.setPath(path)
-        # painter.setBrush(Qt.lightGray)
-        # painter.drawPath(path)
-
-        #  添加文字路径
-        # 4.显示文本
-        if self.textEnable:
-            self._text = str(round(self.value, 1)) + self.unit
-            painter.setPen(self._pen_default)
-            painter.setFont(QFont(self.textFont, self.width / 4, QFont.Medium))  # 第二个参数是字体大小
-            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-            painter.drawText(QPointF(self.width * 0.5 / 3, self.height/2), self._text)
-# 9.accumulator:静止的蓄能器
-class GraphicsNode_accumulator(QAbstractGraphicsNode):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.unit = "mL"
-        self.width = 300  # 整个控件边界的宽度
-        self.height = self.width * 2.5  # 整个控件边界的高度
-        self.textEnable = False
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(0, self.height/2), 2]]
-
-    # 重写node绘制函数
     def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-        # 根据获取的坐标，更新要绘制的路径
+        if isTileCached(self, widget): return
+        # 控件缩得很小时不画运动部件
+        grNode = self.grNode()
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        if grNode.detailLevel(lod) != NODE_LOD_FULL: return
+        grNode._lod = lod
+        self._paint_function(painter)
 
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
 
-        # 画1个个正方形
-        radius_corner = self.width/2
-        painter.drawRoundedRect(-self.width/2, -self.height/2, self.width, self.height*4/5, radius_corner, radius_corner)  # 后面两个参数为xround – int, yround – int,拐角的圆度
-        # 画中间横线
-        painter.drawLine(-self.width/2, self.height*-0.5/5, self.width/2, self.height*-0.5/5)
-        # 画下面竖线
-        painter.drawLine(0, self.height * 1.5/5, 0, self.height/2)
-        # 画弹簧
-        path = QPainterPath()
-        path.moveTo(self.width *-0.5/ 3, self.height* -1.5/5)
-        path.lineTo(self.width * 0.5 / 3, self.height/5 + self.height/20 - self.height/2)
-        path.lineTo(self.width * -0.5 / 3, self.height / 5 + self.height * 2 / 30 - self.height/2)
-        path.lineTo(self.width * 0.5 / 3, self.height / 5 + self.height * 3 / 30 - self.height/2)
-        path.lineTo(self.width * -0.5 / 3, self.height / 5 + self.height * 4 / 30 - self.height/2)
-        path.lineTo(self.width * 0.5 / 3, self.height / 5 + self.height * 5 / 30 - self.height/2)
-        path.lineTo(self.width * -0.5 / 3, self.height / 5 + self.height * 6 / 30 - self.height/2)
-        painter.drawPath(path)
-        # 4.显示文本
-        # if self.textEnable:
-        #     self._text = str(round(self.value, 1)) + self.unit
-        #     painter.setPen(self._pen_default)
-        #     painter.setFont(QFont(self.textFont, self.width / 4, QFont.Medium))  # 第二个参数是字体大小
-        #     painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-        #     painter.drawText(QPointF(self.width * 2 / 3, self.height), self._text)
-# 10.one-way valve:静止的单向阀
-class GraphicsNode_oneway_valve(QAbstractGraphicsNode):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.unit = "mL"
-        self.width = 150  # 整个控件边界的宽度
-        self.height = self.width * 2  # 整个控件边界的高度
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(0, -self.height/2), 2],
-                           [QPointF(0, self.height/2), 2]
-                           ]
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-        # 画2个竖线和圆
-        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
-        painter.drawLine(0, -self.height/2, 0, self.height * (-1 / 4 - 1/20))
-        painter.drawLine(0, self.height * (1 / 4 - 1/20), 0, self.height/2)
-        painter.drawEllipse(QPointF(0, self.height * ( - 2/20)), self.height / 5,
-                            self.height / 5)
-        # 画1个圆上个楔形切线直线
-        painter.drawLine(-self.width/2,  self.height*( - 1 / 20), 0, self.height * (1 / 4 - 1 / 20))
-        painter.drawLine(self.width/2,  self.height*(- 1 / 20), 0, self.height * (1 / 4 - 1 / 20))
-        # 4.显示文本
-        # if self.textEnable:
-        #     self._text = str(round(self.value, 1)) + self.unit
-        #     painter.setPen(self._pen_default)
-        #     painter.setFont(QFont('Times New Roman', self.width / 4, QFont.Medium))  # 第二个参数是字体大小
-        #     painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-        #     painter.drawText(QPointF(self.width * 2 / 3, self.height), self._text)
-# 11.静止的溢流阀
-class GraphicsNode_relief_valve(QAbstractGraphicsNode):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.unit = "mL"
-        self.width = 500  # 整个控件边界的宽度
-        self.height = self.width * 1  # 整个控件边界的高度
-        # 修改 socket信息
-        self.socketInfo = [[QPointF(1 / 8 * self.width, -self.height/2), 2],
-                           [QPointF(1 / 8 * self.width, self.height/2), 2]
-                           ]
-        # 箭头子类嵌入到本控件中
-        self._arrow_left = MyArrowItem(self, QPointF(0, self.height * -2 / 6),
-                                       QPointF(0, self.height * 1.8 / 6))
-        self._arrow_left.arrowLength = self.width / 20
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-        # 根据获取的坐标，更新要绘制的路径
-        path = QPainterPath()
-
-        # 1. 画2个竖线
-        pen = self._pen_default if not self.isSelected() else self._pen_selected
-        painter.setPen(pen)
-        painter.drawLine(self.width * 1 / 8, - self.height/2, self.width * 1 / 8, self.height * -2 / 6)
-        painter.drawLine(self.width * 1 / 8, self.height * 2 / 6, self.width * 1 / 8, self.height/2)
-
-        painter.save()
-        painter.setBrush(QColor("#B8860B"))
-        painter.drawRect(self.width * (1 / 8 - 2 / 6), self.height * -2 / 6, self.width * 4 / 6, self.height * 4 / 6)
-        painter.restore()
-        # 2.画弹簧
-        # 画弹簧
-        path = QPainterPath()
-        path.moveTo(self.width * (1 / 8 + 2 / 6), self.height * -2 / 6)
-        path.lineTo(self.width * (1 / 8 + 2 / 6 + 1 / 20), 0)
-        path.lineTo(self.width * (1 / 8 + 2 / 6 + 2 / 20), self.height * -2 / 6)
-        path.lineTo(self.width * (1 / 8 + 2 / 6 + 3 / 20), 0)
-        path.lineTo(self.width * (1 / 8 + 2 / 6 + 4 / 20), self.height * -2 / 6)
-        path.lineTo(self.width * (1 / 8 + 2 / 6 + 5 / 20), 0)
-
-        painter.drawPath(path)
-
-        # 3.画虚线，下面是拐角的集合
-        points = [QPointF(self.width * (1 / 8 - 2 /6), self.height * 1 / 6),
-                  QPointF(-self.width/2,self.height * 1 / 6),
-                  QPointF(-self.width/2, -self.height/2),
-                  QPointF(self.width * -1/8, -self.height/2),
-                  QPointF(self.width * 1 / 8, self.height * -2 / 6),
-                  ]
-        path = QPainterPath(points[0])  # 先到 第一个点
-        for point in points:
-            path.lineTo(point)
-        pen.setStyle(Qt.DotLine)
-
-        painter.setPen(pen)
-        painter.drawPath(path)
-        pen.setStyle(Qt.SolidLine)  # 还原画笔原有的实线状态，为下一次绘图做准备
-
-
-
-
-
-
-
-
-        # #  添加文字路径
-        # # 4.显示文本
-        # if self.textEnable:
-        #     self._text = str(round(self.value, 1)) + self.unit
-        #     painter.setPen(self._pen_default)
-        #     painter.setFont(QFont('Times New Roman', self.width / 4, QFont.Medium))  # 第二个参数是字体大小
-        #     painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-        #     painter.drawText(QPointF(self.width * 2 / 3, self.height), self._text)
-# 12.静止的文本
-class GraphicsNode_text(QAbstractGraphicsNode):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        # 自己独特的变量，或者对父类变量进行篡改
-        self.text = "Hello world!"
-        self.height = 100  # 整个控件边界的高度
-
-        self.textEnable = True
-
-
-
-
-
-
-
-
-
-    # 重写node绘制函数，画压力传感器
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        super().paint(painter, QStyleOptionGraphicsItem, widget)
-
-        self.width = self.height * (len(self.text) + 1) / 2  # 整个控件边界的宽度
-
-        pen = self._pen_default if not self.isSelected() else self._pen_selected
-        painter.setPen(pen)
-        # painter.drawRect(0,0,self.width,self.height)
-    #  添加文字路径
-        # 4.显示文本
-        if self.textEnable:
-            # self._text = str(round(self.value, 1)) + self.unit
-            painter.setFont(QFont(self.textFont, self.height, QFont.Medium))  # 第二个参数是字体大小
-            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
-            painter.drawText(QPointF(- self.width/2, self.height/2), self.text)
-# 0.箭头，用来嵌入其他控件中, 仅用来在本文件使用
+# 0.箭头，用来嵌入其他控件中(伺服阀、溢流阀)
 class MyArrowItem(QGraphicsLineItem):
     # source箭头线段起始，dest箭头线段终止
     def __init__(self, parent=None, source=QPointF(0, 0), dest=QPointF(0, 0)):
@@ -1087,13 +383,25 @@ class MyArrowItem(QGraphicsLineItem):
         self._pen_selected.setWidth(8)
         self._pen_selected.setJoinStyle(Qt.MiterJoin)
 
+    # 箭头跟着父图元移动，source和dest不变
+    def boundingRect(self):
+        margin = self.arrowLength + self._pen_default.width()
+        return QRectF(self.source, self.dest).normalized().adjusted(-margin, -margin, margin, margin)
 
-
+    def shape(self):
+        return QPainterPath()
 
     def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
+        if isTileCached(self, widget): return
+        # 所在的控件缩得很小时不画箭头
+        parent = self.parentItem()
+        while parent is not None and not hasattr(parent, 'detailLevel'): parent = parent.parentItem()
+        if parent is not None:
+            lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+            if parent.detailLevel(lod) != NODE_LOD_FULL: return
 
-        self.line = QLineF(self.source, self.dest)
-        self.line.setLength(self.line.length() - self.arrowLength)
+        line = QLineF(self.source, self.dest)
+        line.setLength(line.length() - self.arrowLength)
 
         # pen = self._pen_default if not self.isSelected() else self._pen_selected
 
@@ -1105,9 +413,9 @@ class MyArrowItem(QGraphicsLineItem):
         brush.setStyle(Qt.SolidPattern)
         painter.setBrush(brush)
 
-        v = self.line.unitVector()
+        v = line.unitVector()
         v.setLength(self.arrowLength)
-        v.translate(QPointF(self.line.dx(), self.line.dy()))
+        v.translate(QPointF(line.dx(), line.dy()))
 
         n = v.normalVector()
         n.setLength(n.length() * 0.5)
@@ -1118,6 +426,16 @@ class MyArrowItem(QGraphicsLineItem):
         p3 = n2.p2()
 
         # 方法1
-        painter.drawLine(self.line)
+        painter.drawLine(line)
         painter.drawPolygon(p1, p2, p3)
+
+
+# 兼容以前直接从本模块导入具体控件类和NODE_TYPES的代码，这些类已经移到各自的模块中，用到时才导入
+def __getattr__(name):
+    from pyHydraulic.node_types import nodeTypeNames, graphicsClassByName
+    if name == 'NODE_TYPES': return nodeTypeNames()
+    graphics_class = None if name.startswith('__') else graphicsClassByName(name)
+    if graphics_class is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    return graphics_class
 #  *************基本元件节点的绘制文件************** End
\ No newline at end of file
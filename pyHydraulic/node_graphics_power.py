@@ -0,0 +1,310 @@
+"""
+    动力和辅助元件: 油箱、泵、油滤、蓄能器
+    控件类型在node_types.py中登记，第一次用到时才导入本模块
+"""
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+import math
+from pyHydraulic.node_graphics_node import QAbstractGraphicsNode
+
+# 油箱的波浪多边形，按油箱尺寸、波浪频率和幅值共用(见GraphicsNode_tank.wavePolygon)
+_wave_polygons = {}
+
+# 3.tank：液面会动的油箱
+class GraphicsNode_tank(QAbstractGraphicsNode):
+    animated = True  # 波浪由scene的动画时钟推动
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.unit = "cm"
+
+        # 波浪相关的变量
+        self._frequency = 0.0015  # 波浪的频率,Hz
+        self._amplitude = self.width / 50  # 像素，波浪幅值
+        self._phase1 = 0  # 像素，波浪1相位
+        self._phase2 = 0  # 像素，波浪2相位
+        self._deepth = 0  # 水位高度
+        # 修改父类变量
+        self.maxValue = 100
+        self.minValue = 0
+        self.value = 20  # _value为内部变量，此句话意思要调用一下value函数，更新初始状态
+
+        self.t = 0  # 时间，波浪的相位随时间变化
+
+
+
+    # 液面为0、相位为0的波浪和下面的油围成的多边形，x方向比油箱多出一个波长，同样尺寸的油箱共用。
+    # 绘制时只需要按相位左移(不超过一个波长)、按液面下移，再裁剪到油箱里面，不用每次重新计算各点
+    def wavePolygon(self):
+        key = (self.width, self.height, self._frequency, self._amplitude)
+        polygon = _wave_polygons.get(key)
+        if polygon is None:
+            k = 2 * math.pi * self._frequency
+            step = self.width // 50
+            x_end = self.width / 2 + 1 / self._frequency
+            points = [QPointF(x, self._amplitude * math.sin(k * x)) for x in range(-self.width // 2, int(x_end) + step, step)]
+            points += [QPointF(points[-1].x(), self.height * 2), QPointF(points[0].x(), self.height * 2)]
+            polygon = _wave_polygons[key] = QPolygonF(points)
+        return polygon
+
+    # 按相位和液面画一条波浪：sin(kx + phase) 就是波浪左移phase/k
+    def drawWave(self, painter, polygon, y_deep, phase):
+        wavelength = 1 / self._frequency
+        dx = (phase / (2 * math.pi * self._frequency)) % wavelength
+        painter.translate(-dx, y_deep)
+        painter.drawPolygon(polygon)
+        painter.translate(dx, -y_deep)
+
+    # 重写node绘制函数，画压力传感器
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        # 1.画波浪
+        self._deepth = self._percent * self.height * 3 / 4  # 像素单位的深度
+        y_deep = self.height - self._deepth - self._amplitude - self.height/2  # 液面的中值坐标
+        self._phase1 = self.width / 400 * self.t  # 每次更新相位自动加
+        self._phase2 = self.width / 400 * self.t + 2 * math.pi * self._frequency * self.width /5 # 每次更新相位自动加
+
+        polygon = self.wavePolygon()
+        painter.save()
+        painter.setClipRect(QRectF(-self.width / 2, -self.height / 2, self.width, self.height), Qt.IntersectClip)
+        #后背景
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#008B8B"))
+        # painter.setOpacity(0.3)
+        self.drawWave(painter, polygon, y_deep, self._phase1)
+
+        painter.setBrush(QColor("#40E0D0"))
+        painter.setOpacity(0.5)
+        self.drawWave(painter, polygon, y_deep, self._phase2)
+        painter.restore()
+         # 2.画出整个tank的轮廓
+        painter.setOpacity(1)
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+
+        painter.drawLine(QLineF(-self.width/2, - self.height * 1 / 4, -self.width/2, self.height/2))
+        painter.drawLine(QLineF(-self.width/2, self.height/2, self.width/2, self.height/2))
+        painter.drawLine(QLineF(self.width/2, self.height/2, self.width/2, -self.height * 1 / 4))
+        # 画出最后的中间管路
+        painter.drawLine(QLineF(0, - self.height/2, 0, self.height * 2 / 5))
+        # 4.显示文本
+        if self.textEnable:
+            # 文字太小看不清时不画
+            if self.isTextLegible(self.width / 12):
+                # painter.setPen(self._pen_default)
+                painter.setFont(QFont(self.textFont, int(self.width / 12), QFont.Medium))  # 第二个参数是字体大小
+                # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+                # 波浪的总高度，也就深度，不是幅值，从液面顶到油箱底的深度
+                painter.drawText(QPointF(- self.width *3/ 8, self.height * 0.46), self.valueText())
+
+    # 显示的数值文本，绘制时不赋值给text，否则重画也会被记入历史
+    def valueText(self):
+        return str(round(self.value, 1)) + self.unit + "(" + format(self._percent, '.0%') + ")"
+
+    def animationStep(self, dt):
+        self.t += dt
+        self.update()
+
+# 3.simple_tank：静止的简单tank符号
+class GraphicsNode_simple_tank(QAbstractGraphicsNode):
+    staticSymbol = True  # 符号不随数值变化，使用共用的符号缓存
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.unit = "cm"
+
+         # 修改父类变量
+        self.maxValue = 100
+        self.minValue = 0
+        self.value = 50  # _value为内部变量，此句话意思要调用一下value函数，更新初始状态
+
+        self.textEnable = False
+
+
+
+    # 重写node绘制函数，画压力传感器
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        # self._deepth = self._percent * self.height * 1 / 2  # 像素单位的深度
+        # y_deep = self.height - self._deepth - self._amplitude  # 液面的中值坐标
+        # path.moveTo(0, y_deep)
+        #
+        # self._phase1 = self.width / 50 * self.t  # 每次更新相位自动加
+        # for x_wave in range(self.width):
+        #     y_wave = self._amplitude * math.sin(2 * math.pi * self._frequency * x_wave + self._phase1) + y_deep  # 计算波浪点y坐标
+        #     path.lineTo(x_wave, y_wave)
+        # path.lineTo(self.width, self.height)
+        # path.lineTo(0, self.height)
+        # path.lineTo(0, y_deep)
+        #
+        # painter.setBrush(Qt.darkRed)
+        # painter.setOpacity(0.2)
+        # painter.drawPath(path)
+        # 2.画出整个tank的轮廓
+        painter.setOpacity(1)
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+
+        painter.drawLine(QLineF(-self.width /2, 0, -self.width /2, self.height/2))
+        painter.drawLine(QLineF(-self.width /2, self.height/2, self.width /2, self.height/2))
+        painter.drawLine(QLineF(self.width/2, self.height/2, self.width/2, 0))
+        # 画出最后的中间管路
+        painter.drawLine(QLineF(0, -self.height/2, 0, self.height * 2 / 5))
+        # 4.显示文本
+        if self.textEnable:
+            self._text = str(round(self.value, 1)) + self.unit + "(" + format(self._percent, '.0%') + ")"
+            # 文字太小看不清时不画
+            if self.isTextLegible(self.width / 10):
+                painter.setPen(self._pen_default)
+                painter.setFont(QFont(self.textFont, int(self.width / 10), QFont.Medium))  # 第二个参数是字体大小
+                # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+                # 波浪的总高度，也就深度，不是幅值，从液面顶到油箱底的深度
+                painter.drawText(QPointF(self.width / 4, self.height * 0.95), self._text)
+
+# 7.filter:静止的定量泵
+class GraphicsNode_pump(QAbstractGraphicsNode):
+    staticSymbol = True  # 符号不随数值变化，使用共用的符号缓存
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.unit = "L/min"
+        self.textEnable = False
+
+    # 重写node绘制函数，画压力传感器
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        # 根据获取的坐标，更新要绘制的路径
+
+
+        # 画2个竖线
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+        painter.drawLine(QLineF(0, -self.height/2, 0, self.height * -1 / 4))
+        painter.drawLine(QLineF(0, self.height * 1 / 4, 0, self.height/2))
+        painter.drawEllipse(QPointF(0, 0), self.height / 4,
+                            self.height / 4)
+        # 画1个圆上个1个箭头
+        tranglePath = QPainterPath()
+        tranglePath.moveTo(0, self.height *-1/ 4)
+        tranglePath.lineTo(self.width / 8, self.height *-1/ 8)
+        tranglePath.lineTo(-self.width / 8, self.height *-1/ 8)
+        tranglePath.lineTo(0, self.height * -1/ 4)
+        painter.setBrush(Qt.black)
+        painter.drawPath(tranglePath)
+        #  添加文字路径
+        # 4.显示文本
+        if self.textEnable:
+            self._text = str(round(self.value, 1)) + self.unit
+            # 文字太小看不清时不画
+            if self.isTextLegible(self.width / 4):
+                painter.setPen(self._pen_default)
+                painter.setFont(QFont(self.textFont, int(self.width / 4), QFont.Medium))  # 第二个参数是字体大小
+                # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+                painter.drawText(QPointF(self.width * 2 / 3, self.height), self._text)
+
+# 8.filter:静止的油滤
+class GraphicsNode_filter(QAbstractGraphicsNode):
+    staticSymbol = True  # 符号不随数值变化，使用共用的符号缓存
+
+    def __init__(self,parent=None):
+        super().__init__(parent)
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.unit = "L/min"
+        self.textEnable = False
+
+    # 重写node绘制函数，画压力传感器
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        # 根据获取的坐标，更新要绘制的路径
+
+
+        # 画2个竖线
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+        painter.drawLine(QLineF(0, -self.height/2, 0, self.height * - 1.5 / 5))
+        painter.drawLine(QLineF(0, self.height * 1.5 / 5, 0, self.height/2))
+         # 画1个个正方形
+        Path = QPainterPath()
+        Path.moveTo(0, self.height * -1.5/ 5)
+        Path.lineTo(-self.width / 2, 0)
+        Path.lineTo(0, self.height * 1.5 / 5)
+        Path.lineTo(self.width/2 , 0)
+        Path.lineTo(0, self.height *-1.5/ 5)
+
+        painter.setBrush(QColor("#B8860B"))
+        painter.drawPath(Path)
+        # 画中间虚线
+        pen = painter.pen()
+        pen.setStyle(Qt.DotLine)
+        pen.setWidth(5)
+        painter.setPen(pen)
+        painter.drawLine(QLineF(-self.width/2, 0, self.width/2, 0))
+
+
+
+        # painter.drawArc(
+        #     QRect(-self.width * 2 / 5, self.height * 9.2 / 24, self.height / 4, self.height / 4),
+        #     -60 * 16, 120 * 16)
+        # painter.drawArc(
+        #     QRect(self.width * 3.5 / 5, self.height * 9.2 / 24, self.height / 4, self.height / 4),
+        #     120 * 16, 120 * 16)
+
+        # 画1个圆，圆心，直径
+        # path.addEllipse(QPointF(self.width / 2, self.height / 2), self.height / 6, self.height /6)
+
+        # 画1个圆上个两个弧形
+        # path.arcTo(self.width* 8/ 24, self.height *5/ 12, self.height / 4 , self.height / 4, -45, 90)
+
+        # 路径
+        # self.setPath(path)
+        # painter.setBrush(Qt.lightGray)
+        # painter.drawPath(path)
+
+        #  添加文字路径
+        # 4.显示文本
+        if self.textEnable:
+            self._text = str(round(self.value, 1)) + self.unit
+            # 文字太小看不清时不画
+            if self.isTextLegible(self.width / 4):
+                painter.setPen(self._pen_default)
+                painter.setFont(QFont(self.textFont, int(self.width / 4), QFont.Medium))  # 第二个参数是字体大小
+                # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+                painter.drawText(QPointF(self.width * 0.5 / 3, self.height/2), self._text)
+
+# 9.accumulator:静止的蓄能器
+class GraphicsNode_accumulator(QAbstractGraphicsNode):
+    staticSymbol = True  # 符号不随数值变化，使用共用的符号缓存
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.unit = "mL"
+        self.textEnable = False
+
+    # 重写node绘制函数
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        # 根据获取的坐标，更新要绘制的路径
+
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+
+        # 画1个个正方形
+        radius_corner = self.width/2
+        painter.drawRoundedRect(QRectF(-self.width/2, -self.height/2, self.width, self.height*4/5), radius_corner, radius_corner)  # 后面两个参数为xround – int, yround – int,拐角的圆度
+        # 画中间横线
+        painter.drawLine(QLineF(-self.width/2, self.height*-0.5/5, self.width/2, self.height*-0.5/5))
+        # 画下面竖线
+        painter.drawLine(QLineF(0, self.height * 1.5/5, 0, self.height/2))
+        # 画弹簧
+        path = QPainterPath()
+        path.moveTo(self.width *-0.5/ 3, self.height* -1.5/5)
+        path.lineTo(self.width * 0.5 / 3, self.height/5 + self.height/20 - self.height/2)
+        path.lineTo(self.width * -0.5 / 3, self.height / 5 + self.height * 2 / 30 - self.height/2)
+        path.lineTo(self.width * 0.5 / 3, self.height / 5 + self.height * 3 / 30 - self.height/2)
+        path.lineTo(self.width * -0.5 / 3, self.height / 5 + self.height * 4 / 30 - self.height/2)
+        path.lineTo(self.width * 0.5 / 3, self.height / 5 + self.height * 5 / 30 - self.height/2)
+        path.lineTo(self.width * -0.5 / 3, self.height / 5 + self.height * 6 / 30 - self.height/2)
+        painter.drawPath(path)
+        # 4.显示文本
+        # if self.textEnable:
+        #     self._text = str(round(self.value, 1)) + self.unit
+        #     painter.setPen(self._pen_default)
+        #     painter.setFont(QFont(self.textFont, self.width / 4, QFont.Medium))  # 第二个参数是字体大小
+        #     painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+        #     painter.drawText(QPointF(self.width * 2 / 3, self.height), self._text)
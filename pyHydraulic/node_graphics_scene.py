@@ -4,6 +4,14 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
 
+# 网格线在屏幕上的间距小于这个像素数就不画(小格子直接不画，大格子换成更稀的网格)
+GRID_MIN_SPACING = 5
+# 一个网格贴图的最大像素尺寸，放得很大时画面里只有几根线，直接画线，不用贴图
+GRID_TILE_MAX_SIZE = 1024
+# 动画控件(比如油箱的波浪)共用的时钟间隔，毫秒
+ANIMATION_INTERVAL = 100
+
+
 class QDMGraphicsScene(QGraphicsScene):
     def __init__(self, scene, parent=None):
         super().__init__(parent)
@@ -32,42 +40,164 @@ class QDMGraphicsScene(QGraphicsScene):
         # 刷背景
         self.setBackgroundBrush(self._color_background)
 
+        # 每个缩放档位(2的整数次幂)预先画好的一个网格周期的贴图，缩放跨过档位时才重新画
+        self._grid_cache = {}
+
+        # 静态控件是否用共用的符号贴图画；导出文件时关掉，按矢量画
+        self.symbolCacheEnabled = True
+
+        # 整个scene共用一个动画时钟，只推进在某个视图中看得见的动画控件，没有看得见的视图时停止
+        self._animated_items = set()
+        self._animation_timer = QTimer(self)
+        self._animation_timer.setInterval(ANIMATION_INTERVAL)
+        self._animation_timer.timeout.connect(self.animationTick)
+
 
     def setGrScene(self, width, height):
         self.setSceneRect(-width // 2, -height // 2, width, height)
 
-    def drawBackground(self, painter, rect):
-        super().drawBackground(painter, rect)
-        if self._grid_enble:
-            # here we create our grid
-            left = int(math.floor(rect.left()))
-            right = int(math.ceil(rect.right()))
-            top = int(math.floor(rect.top()))
-            bottom = int(math.ceil(rect.bottom()))
+    # 动画控件加入scene时订阅，离开scene时取消订阅(见QAbstractGraphicsNode.itemChange)
+    def subscribeAnimation(self, item):
+        self._animated_items.add(item)
+        self.updateAnimationTimer()
 
-            first_left = left - (left % self.gridSize)
-            first_top = top - (top % self.gridSize)
+    def unsubscribeAnimation(self, item):
+        self._animated_items.discard(item)
+        self.updateAnimationTimer()
 
-            # compute all lines to be drawn
-            lines_light, lines_dark = [], []
-            for x in range(first_left, right, self.gridSize):
-                if (x % (self.gridSize*self.gridSquares) != 0): lines_light.append(QLine(x, top, x, bottom))
-                else: lines_dark.append(QLine(x, top, x, bottom))
+    # 显示出来并且窗口没有最小化的视图中可见的scene区域
+    def visibleSceneRects(self):
+        rects = []
+        for view in self.views():
+            if not view.isVisible() or view.window().isMinimized(): continue
+            rects.append(view.mapToScene(view.viewport().rect()).boundingRect())
+        return rects
 
-            for y in range(first_top, bottom, self.gridSize):
-                if (y % (self.gridSize*self.gridSquares) != 0): lines_light.append(QLine(left, y, right, y))
-                else: lines_dark.append(QLine(left, y, right, y))
+    # 有订阅的控件并且有看得见的视图时才运行时钟；视图显示、隐藏和窗口最小化时重新检查
+    def updateAnimationTimer(self):
+        for view in self.views(): view.window().installEventFilter(self)
+        if self._animated_items and self.visibleSceneRects():
+            if not self._animation_timer.isActive(): self._animation_timer.start()
+        else:
+            self._animation_timer.stop()
 
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.WindowStateChange, QEvent.Show, QEvent.Hide):
+            self.updateAnimationTimer()
+        return super().eventFilter(obj, event)
 
-            # draw the lines
+    def animationTick(self):
+        rects = self.visibleSceneRects()
+        if not rects:
+            self._animation_timer.stop()
+            return
+        dt = ANIMATION_INTERVAL / 1000
+        for item in list(self._animated_items):
+            if not item.isVisible(): continue
+            item_rect = item.sceneBoundingRect()
+            if any(item_rect.intersects(rect) for rect in rects): item.animationStep(dt)
+
+    # 改了网格的尺寸或者笔之后要清掉已经画好的贴图
+    def clearGridCache(self):
+        self._grid_cache = {}
+
+    # 缩放档位对应的网格：(小格子间距或None, 大格子间距)，间距太小的网格去掉
+    def gridSpacing(self, band_scale):
+        minor = self.gridSize
+        major = self.gridSize * self.gridSquares
+        while major * band_scale < GRID_MIN_SPACING: major *= self.gridSquares
+        if minor * band_scale < GRID_MIN_SPACING: minor = None
+        return minor, major
+
+    # 缩放档位的网格贴图，只包含网格线(背景色由背景刷画)，返回(贴图, 贴图像素/scene单位)，贴图太大返回None
+    def gridTile(self, band):
+        if band in self._grid_cache: return self._grid_cache[band]
+
+        band_scale = 2.0 ** band
+        minor, major = self.gridSpacing(band_scale)
+        size = int(round(major * band_scale))
+        if size > GRID_TILE_MAX_SIZE:
+            self._grid_cache[band] = None
+            return None
+        # 贴图的尺寸只能是整数像素，用实际的比例保证贴图拼起来和网格一致
+        tile_scale = size / major
+
+        pixmap = QPixmap(size, size)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.scale(tile_scale, tile_scale)
+        if minor is not None:
             painter.setPen(self._pen_light)
-            painter.drawLines(*lines_light)
+            for i in range(1, self.gridSquares):
+                painter.drawLine(QLineF(i * minor, 0, i * minor, major))
+                painter.drawLine(QLineF(0, i * minor, major, i * minor))
+        # 边上的线两边各画一半，贴图拼起来才是完整的一根线
+        painter.setPen(self._pen_dark)
+        for position in (0, major):
+            painter.drawLine(QLineF(position, 0, position, major))
+            painter.drawLine(QLineF(0, position, major, position))
+        painter.end()
 
-            painter.setPen(self._pen_dark)
-            painter.drawLines(*lines_dark)
+        self._grid_cache[band] = (pixmap, tile_scale)
+        return self._grid_cache[band]
+
+    def drawBackground(self, painter, rect):
+        super().drawBackground(painter, rect)
+        if self._grid_enble:
+            scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+            # 向上取档位，贴图显示时只会缩小(0.5~1倍)，不会放大变模糊
+            band = int(math.ceil(math.log2(scale))) if scale > 0 else 0
+            tile = self.gridTile(band)
+            if tile is not None:
+                self.drawGridTiles(painter, rect, *tile)
+            else:
+                self.drawGridLines(painter, rect, 2.0 ** band)
 
         # draw the orgins
         painter.setPen(self._pen_red)
         painter.setOpacity(0.5)
         painter.drawLine(-self.gridSize * self.gridSquares, 0, self.gridSize * self.gridSquares, 0)
         painter.drawLine(0, -self.gridSize  * self.gridSquares, 0, self.gridSize * self.gridSquares)
+
+    def drawGridTiles(self, painter, rect, pixmap, tile_scale):
+        # 在贴图的像素坐标中平铺，贴图的(0, 0)对齐scene中大格子的线
+        size = pixmap.width()
+        target = QRectF(rect.left() * tile_scale, rect.top() * tile_scale,
+                        rect.width() * tile_scale, rect.height() * tile_scale)
+        offset = QPointF(math.fmod(target.left(), size) % size, math.fmod(target.top(), size) % size)
+        painter.save()
+        painter.scale(1 / tile_scale, 1 / tile_scale)
+        painter.drawTiledPixmap(target, pixmap, offset)
+        painter.restore()
+
+    # 放得很大时画面里的线很少，直接画线
+    def drawGridLines(self, painter, rect, band_scale):
+        minor, major = self.gridSpacing(band_scale)
+        step = minor if minor is not None else major
+
+        left = int(math.floor(rect.left()))
+        right = int(math.ceil(rect.right()))
+        top = int(math.floor(rect.top()))
+        bottom = int(math.ceil(rect.bottom()))
+
+        first_left = left - (left % step)
+        first_top = top - (top % step)
+
+        # compute all lines to be drawn
+        lines_light, lines_dark = [], []
+        for x in range(first_left, right, step):
+            if (x % major != 0): lines_light.append(QLine(x, top, x, bottom))
+            else: lines_dark.append(QLine(x, top, x, bottom))
+
+        for y in range(first_top, bottom, step):
+            if (y % major != 0): lines_light.append(QLine(left, y, right, y))
+            else: lines_dark.append(QLine(left, y, right, y))
+
+        # draw the lines
+        if lines_light:
+            painter.setPen(self._pen_light)
+            painter.drawLines(*lines_light)
+        if lines_dark:
+            painter.setPen(self._pen_dark)
+            painter.drawLines(*lines_dark)
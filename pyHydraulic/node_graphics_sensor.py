@@ -0,0 +1,190 @@
+"""
+    传感器和仪表: 压力传感器、流量计、仪表盘
+    控件类型在node_types.py中登记，第一次用到时才导入本模块
+"""
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+import math
+from pyHydraulic.node_graphics_node import QAbstractGraphicsNode, QNodePartItem
+
+# 1.静止的压力传感器，继承自子上面的node
+class GraphicsNode_pressure_sensor(QAbstractGraphicsNode):
+    staticSymbol = True  # 符号不随数值变化，使用共用的符号缓存
+
+    def __init__(self, node=None):
+        super().__init__(node)
+        self.textEnable = False  # 不显示文本
+        self.unit = "MPa"
+        # 自己独特的变量，或者对父类变量进行篡改
+
+
+    # 重写node绘制函数，画压力传感器
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)  # 把笔给画家
+
+        # 1.画出整个控件的轮廓
+        # painter.drawRect(0, 0, self.width, self.height)
+
+        # 1. 绘制一个圆 QtGui.QPainter.drawEllipse(center, rx, ry)
+        r = self.height / 3.0
+        painter.drawEllipse(QPointF(0, - self.height/6), r, r)  #
+        # 2.绘制一条竖线,作为支架
+        painter.drawLine(QLineF(0, self.height/6, 0, self.height/2))  #
+        # 3.绘制叉叉
+        painter.drawLine(QLineF(r * (1 - math.sin(math.pi / 180 * 45))- self.width /2, r * (1 - math.cos(math.pi / 180 * 45)) - self.height /2,
+                         r * (1 + math.cos(math.pi / 180 * 45)) - self.width /2 , r * (1 + math.sin(math.pi / 180 * 45)) - self.height /2))  #
+        painter.drawLine(QLineF(r * (1 - math.sin(math.pi / 180 * 45)) - self.width /2 , r * (1 + math.cos(math.pi / 180 * 45))- self.height /2 ,
+                         r * (1 + math.cos(math.pi / 180 * 45)) - self.width /2 , r * (1 - math.sin(math.pi / 180 * 45)) - self.height /2 ))  #
+        #
+        # index =0
+        # for socket in self.node.sockets:
+        #     self.socketInfo[index][0] = QPointF(socket.grSocket.x(), socket.grSocket.y())
+        #     index +=1
+
+# 2.静止的流量传感器
+class GraphicsNode_flow_meter(QAbstractGraphicsNode):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.unit = "mL"
+
+    # 重写node绘制函数，画压力传感器
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+
+        # 根据获取的坐标，更新要绘制的路径
+        path = QPainterPath()
+
+        # 画2个竖线
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+        painter.drawLine(QLineF(0, - self.height / 2, 0, - self.height * 1 / 4))
+        painter.drawLine(QLineF(0, self.height * 1 / 4, 0, self.height / 2))
+        painter.drawEllipse(QPointF(0, 0), self.height / 4,
+                            self.height / 4)
+        # 画1个圆上个两个弧形
+
+        painter.drawArc(
+            QRectF(-self.width * 9 / 10, - self.height * 4/ 24, self.height / 3, self.height / 3),
+            -60 * 16, 120 * 16)
+        painter.drawArc(QRectF(self.width * 2.3 / 10, - self.height * 4 / 24, self.height /3, self.height / 3),
+            120 * 16, 120 * 16)
+
+        # 画1个圆，圆心，直径
+        # path.addEllipse(QPointF(self.width / 2, self.height / 2), self.height / 6, self.height /6)
+
+        # 画1个圆上个两个弧形
+        # path.arcTo(self.width* 8/ 24, self.height *5/ 12, self.height / 4 , self.height / 4, -45, 90)
+
+        # 路径
+        # self.setPath(path)
+        # painter.setBrush(Qt.lightGray)
+        # painter.drawPath(path)
+
+        #  添加文字路径
+        # 4.显示文本
+        if self.textEnable:
+            # 文字太小看不清时不画
+            if self.isTextLegible(self.width / 4):
+                # painter.setPen(self._pen_default)
+                painter.setFont(QFont(self.textFont, int(self.width / 4), QFont.Medium))  # 第二个参数是字体大小
+                # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+                painter.drawText(QPointF(0, self.height * 0.45), self.valueText())
+
+    # 显示的数值文本，绘制时不赋值给text，否则重画也会被记入历史
+    def valueText(self):
+        return str(round(self.value, 1)) + self.unit
+
+# 4.Gauge：会转动的仪表盘
+class GraphicsNode_gauge(QAbstractGraphicsNode):
+    # 表盘不随数值变化，使用符号缓存；指针和数值文本是单独的子图元
+    staticSymbol = True
+    textInParts = True
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.unit = "MPa"
+        self._angel = 0  # 偏转的角度：protected
+
+        # 指针按竖直向下(0°)画，数值变化时绕表盘中心转动
+        r = self.height / 4
+        center = QPointF(r - self.width / 2, r - self.height / 2)
+        margin = 8
+        self._needle = QNodePartItem(self, self.paintNeedle, QRectF(center.x() - margin, center.y() - r / 5 - margin,
+                                                                    2 * margin, r * 4 / 5 + 2 * margin))
+        self._needle.setTransformOriginPoint(center)
+        self._text_part = QNodePartItem(self, self.paintText)
+        self._value_font = QFont(self.textFont, int(self.width / 6), QFont.Medium)  # 第二个参数是字体大小
+
+        # 与偏转相关的物理量
+        self.maxValue = 30
+        self.minValue = 0
+        self.value = 0  # _value为内部变量，此句话意思要调用一下value函数，更新初始状态
+
+
+    # min-max 对应 60-300°转角，只转动指针，重画文字
+    def valueChanged(self):
+        self._angel = self._percent * 360  # 度
+        self._angel = 240 / 360 * self._angel + 60  # 只从60-300转换
+        self._needle.setRotation(self._angel)
+        self._text_part.setRect(self.textRect(self._value_font, QPointF(-self.width * 1 / 4, -self.height * 0.3 / 7), self.valueText()))
+        self._text_part.update()
+
+    def valueText(self):
+        return str(round(self.value, 1)) + self.unit
+
+    # 重写node绘制函数，画表盘
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)# 把笔给画家
+        # 1.画出整个控件的轮廓
+        # painter.drawRect(0, 0, self.width, self.height)
+
+        # 1. 绘制一个圆 QtGui.QPainter.drawEllipse(center, rx, ry)
+        r = self.height / 4
+        painter.drawEllipse(QPointF(r-self.width / 2, r - self.height / 2), r, r)  #
+        # 2.绘制一条竖线,作为支架
+        painter.drawLine(QLineF(0, 0, 0, self.height/2))  #
+        # 绘制旋转点
+        painter.save()
+        painter.setBrush(Qt.black)
+        painter.drawEllipse(QPointF(r -self.width / 2, r - self.height / 2), self.width / 40, self.width / 40)
+        painter.restore()
+        # painter.drawPoint(r -self.width / 2, r - self.height / 2)
+        # 4.绘制刻盘圆弧
+        # （实际单位为1 / 16度），QPainter.drawArc(rect, a（起始角度）, alen（划过的圆角，单位为1/16度）)
+        # 画绿色圆弧
+        painter.save()
+        pen = QPen()
+        # painter.setOpacity(0.4)
+        pen.setWidth(30)
+        pen.setColor(QColor("#7B68EE"))
+        painter.setPen(pen)  # 把笔给画家
+        painter.drawArc(QRectF(r * 1 / 5 -self.width / 2, r * 1 / 5 - self.height / 2, r * 8 / 5, r * 8 / 5), 210 * 16, -180 * 16)  # 绘画角度为30°~(330°)
+        # 画红色圆弧
+        pen.setWidth(30)
+        pen.setColor(QColor("#FF0000"))
+        painter.setPen(pen)  # 把笔给画家
+        painter.drawArc(QRectF(r * 1 / 5 -self.width / 2, r * 1 / 5 - self.height / 2, r * 8 / 5, r * 8 / 5), 30 * 16, -60 * 16)  # 绘画角度为30°~(330°)
+
+        painter.restore()
+
+    # 3.绘制指针，转角为0时竖直向下
+    def paintNeedle(self, painter):
+        pen = QPen(self._pen_default if not self.isSelected() else self._pen_selected)
+        pen.setWidth(8)
+        painter.setPen(pen)
+        r = self.height / 4
+        painter.drawLine(QLineF(r - self.width / 2, r * (1 + 3 / 5) - self.height / 2,
+                                r - self.width / 2, r * (1 - 1 / 5) - self.height / 2))
+
+    # 4.显示文本
+    def paintText(self, painter):
+        if not self.textEnable: return
+        self._text = self.valueText()
+        # 文字太小看不清时不画
+        if self.isTextLegible(self.width/6):
+            painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+            painter.setFont(self._value_font)
+            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+            painter.drawText(QPointF(-self.width*1/4, -self.height*0.3/7), self._text)
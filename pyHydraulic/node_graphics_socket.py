@@ -1,6 +1,11 @@
 from PyQt5.QtWidgets import *
 from PyQt5.QtGui import *
 from PyQt5.QtCore import *
+from pyHydraulic.node_graphics_tiles import isTileCached
+
+
+# socket在屏幕上的直径小于这个像素数时不画(缩得很小时所在的控件也只画方块或外框)
+LOD_SOCKET_PIXELS = 4
 
 
 class QDMGraphicsSocket(QGraphicsItem):
@@ -27,6 +32,13 @@ class QDMGraphicsSocket(QGraphicsItem):
         self._pen = QPen(self._color_outline)
         self._pen.setWidthF(self.outline_width)
         self._brush = QBrush(self._color_background)
+        # 缩小时每一帧都要对所有socket多次调用boundingRect，尺寸不变，预先算好
+        self._bounding_rect = QRectF(
+            - self.radius - self.outline_width,
+            - self.radius - self.outline_width,
+            2 * (self.radius + self.outline_width),
+            2 * (self.radius + self.outline_width),
+        )
 
         self.setAcceptHoverEvents(True)
 
@@ -46,20 +58,19 @@ class QDMGraphicsSocket(QGraphicsItem):
             self.linkFlag = True
 
     def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
+        if isTileCached(self, widget): return
         # 重绘之前，都判断当前socket有没有edge链接，如果有，则隐身，没有的话，就现身
         if len(self.socket.edges) ==0:
             self.linkFlag = False
+        # 缩得太小看不清时不画
+        if 2 * self.radius * QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) < LOD_SOCKET_PIXELS:
+            return
         # 没有edge,则现身
         if self.linkFlag == False:
         # painting circle
             painter.setBrush(self._brush)
             painter.setPen(self._pen)
-            painter.drawEllipse(-self.radius, -self.radius, 2 * self.radius, 2 * self.radius)
+            painter.drawEllipse(QRectF(-self.radius, -self.radius, 2 * self.radius, 2 * self.radius))
 
     def boundingRect(self):
-        return QRectF(
-            - self.radius - self.outline_width,
-            - self.radius - self.outline_width,
-            2 * (self.radius + self.outline_width),
-            2 * (self.radius + self.outline_width),
-        )
+        return self._bounding_rect
@@ -0,0 +1,46 @@
+"""
+    文本
+    控件类型在node_types.py中登记，第一次用到时才导入本模块
+"""
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+import math
+from pyHydraulic.node_graphics_node import QAbstractGraphicsNode, NODE_LOD_FULL, NODE_LOD_BOX, LOD_TEXT_PIXELS
+
+# 12.静止的文本
+class GraphicsNode_text(QAbstractGraphicsNode):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.text = "Hello world!"
+
+        self.textEnable = True
+
+
+
+
+
+
+
+
+
+    # 文本控件只有文字，看得清就画文字，否则画方块，不画外框
+    def detailLevel(self, lod):
+        return NODE_LOD_FULL if self.height * lod >= LOD_TEXT_PIXELS else NODE_LOD_BOX
+
+    # 重写node绘制函数，画压力传感器
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+
+        self.width = self.height * (len(self.text) + 1) / 2  # 整个控件边界的宽度
+
+        pen = self._pen_default if not self.isSelected() else self._pen_selected
+        painter.setPen(pen)
+        # painter.drawRect(0,0,self.width,self.height)
+    #  添加文字路径
+        # 4.显示文本
+        if self.textEnable and self.isTextLegible(self.height):
+            # self._text = str(round(self.value, 1)) + self.unit
+            painter.setFont(QFont(self.textFont, int(self.height), QFont.Medium))  # 第二个参数是字体大小
+            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+            painter.drawText(QPointF(- self.width/2, self.height/2), self.text)
@@ -0,0 +1,243 @@
+"""
+    视图的分块缓存：静态的内容(背景、没有选中也不在动画的控件和edge)按视图的缩放比例画到TILE_SIZE像素的QImage分块中，
+    视图重画时贴上分块，只在上面画动态的图元。平移时只需要贴图，图元变化时只重画它所在的分块。
+    图元不是线程安全的，分块的内容先在GUI线程中录成QPicture，再由线程池中的线程画成QImage。
+    可见的分块缺了马上在GUI线程中画好(不会闪烁)，视图四周TILE_PREFETCH圈的分块在空闲时交给线程池预先画好。
+"""
+import math
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, QRectF, QPoint, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter, QPicture, QTransform
+from PyQt5.QtWidgets import QStyleOptionGraphicsItem
+
+
+TILE_SIZE = 256  # 分块的边长，像素
+TILE_MARGIN = 2  # 抗锯齿会画到外接矩形外面一点，分块四周多算的像素
+TILE_PREFETCH = 1  # 视图四周预先画好的分块圈数
+TILE_PREFETCH_BATCH = 4  # 每次空闲时最多录几块，录制在GUI线程中，不能一次录太多
+TILE_CACHE_SIZE = 256  # 最多缓存的分块数，256像素的分块每块256KB
+
+DEBUG = False
+
+
+# 图元在这个视口中是否已经画在分块里了，是的话paint中不用再画
+def isTileCached(item, widget):
+    if widget is None: return False
+    cache = getattr(widget.parent(), 'tileCache', None)
+    return cache is not None and cache.isStatic(item)
+
+
+def rectKey(rect):
+    return (round(rect.x(), 6), round(rect.y(), 6), round(rect.width(), 6), round(rect.height(), 6))
+
+
+# 图元(包括子图元)是否还在scene中，scene清空时C++对象可能已经删除了
+def isInScene(item, grScene):
+    try:
+        return item.scene() is grScene
+    except RuntimeError:
+        return False
+
+
+def treeSceneRect(item):
+    return item.mapToScene(item.boundingRect() | item.childrenBoundingRect()).boundingRect()
+
+
+def rasterizeTile(picture, ratio):
+    size = int(math.ceil(TILE_SIZE * ratio))
+    image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(ratio)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    painter.drawPicture(0, 0, picture)
+    painter.end()
+    return image
+
+
+# 在线程池中把录好的分块画成QImage，画完通过信号交回GUI线程
+class TileJob(QRunnable):
+    def __init__(self, cache, key, picture):
+        super().__init__()
+        self.cache = cache
+        self.key = key
+        self.picture = picture
+
+    def run(self):
+        image = rasterizeTile(self.picture, self.key[2])
+        try:
+            self.cache.tileRasterized.emit(self, image)
+        except RuntimeError:
+            pass  # 视图已经关掉了
+
+
+class TileCache(QObject):
+    tileRasterized = pyqtSignal(object, object)
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.grScene = view.grScene
+
+        self._tiles = OrderedDict()  # (x缩放, y缩放, 设备像素比, 列, 行) -> QImage
+        self._pending = {}  # 交给线程池还没画完的分块
+        self._dynamic = set()  # 最近一次重画时的动态图元(顶层图元)
+        self._dynamic_rects = set()  # 动态图元上一次的外接矩形，scene的changed中这些矩形不用重画分块
+        self._active = False  # 当前这次重画是否贴分块，没有贴的时候图元要自己画
+        self._prefetch = []
+
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(0)
+        self._prefetch_timer.timeout.connect(self.prefetchStep)
+
+        self.tileRasterized.connect(self.tileFinished)
+        self.grScene.changed.connect(self.sceneChanged)
+
+    def stop(self):
+        self._prefetch_timer.stop()
+        self.grScene.changed.disconnect(self.sceneChanged)
+        self.clear()
+        self._active = False
+
+    def clear(self):
+        self._tiles.clear()
+        self._pending.clear()
+        self._prefetch = []
+
+    def tileSceneRect(self, key, margin=0):
+        sx, sy, ratio, col, row = key
+        return QRectF((col * TILE_SIZE - margin) / sx, (row * TILE_SIZE - margin) / sy,
+                      (TILE_SIZE + 2 * margin) / sx, (TILE_SIZE + 2 * margin) / sy)
+
+    # 覆盖scene区域rect的分块，四周再多取margin圈
+    def tileKeys(self, sx, sy, ratio, rect, margin=0):
+        left, right = int(math.floor(rect.left() * sx / TILE_SIZE)), int(math.floor(rect.right() * sx / TILE_SIZE))
+        top, bottom = int(math.floor(rect.top() * sy / TILE_SIZE)), int(math.floor(rect.bottom() * sy / TILE_SIZE))
+        return [(sx, sy, ratio, col, row) for row in range(top - margin, bottom + margin + 1)
+                for col in range(left - margin, right + margin + 1)]
+
+    # 动态的图元：选中的、在动画的、和选中的控件相连的edge、正在拖的edge
+    # 每次绘制都会调用，选中的对象用scene维护的集合，不再遍历selectedItems()
+    def dynamicItems(self):
+        dynamic = set(self.grScene._animated_items)
+        scene = self.grScene.scene
+        for node in scene.selected_nodes:
+            if node.grNode is not None: dynamic.add(node.grNode.topLevelItem())
+            for socket in node.sockets:
+                for edge in socket.edges:
+                    if edge.grEdge is not None: dynamic.add(edge.grEdge)
+        for edge in scene.selected_edges:
+            if edge.grEdge is not None: dynamic.add(edge.grEdge)
+        drag_edge = getattr(self.view, 'drag_edge', None)
+        if drag_edge is not None and drag_edge.grEdge is not None: dynamic.add(drag_edge.grEdge)
+        return dynamic
+
+    def isCacheable(self, item):
+        top = item.topLevelItem()
+        return getattr(top, 'tileCacheable', False) and top not in self._dynamic
+
+    def isStatic(self, item):
+        return self._active and self.isCacheable(item)
+
+    def invalidate(self, rect):
+        for tiles in (self._tiles, self._pending):
+            for key in [key for key in tiles if self.tileSceneRect(key, TILE_MARGIN).intersects(rect)]:
+                del tiles[key]
+
+    # 图元在动态和静态之间切换时，重画它所在的分块
+    def updateDynamic(self):
+        dynamic = self.dynamicItems()
+        changed = dynamic ^ self._dynamic
+        self._dynamic = dynamic
+        for item in changed:
+            if isInScene(item, self.grScene): self.invalidate(treeSceneRect(item))
+
+    def addDynamicRects(self, item, rects):
+        rects.add(rectKey(item.sceneBoundingRect()))
+        for child in item.childItems(): self.addDynamicRects(child, rects)
+
+    # 动态图元(比如动画)自己的变化不影响分块，其余变化的区域重画分块
+    def sceneChanged(self, rects):
+        current = set()
+        for item in self._dynamic:
+            if isInScene(item, self.grScene): self.addDynamicRects(item, current)
+        known = current | self._dynamic_rects
+        self._dynamic_rects = current
+        if not self._tiles and not self._pending: return
+        for rect in rects:
+            if rectKey(rect) not in known: self.invalidate(rect)
+
+    # 在GUI线程中把一个分块的背景和静态图元录成QPicture，坐标是分块的像素
+    def recordTile(self, key):
+        sx, sy, ratio, col, row = key
+        base = QTransform(sx, 0, 0, sy, -col * TILE_SIZE, -row * TILE_SIZE)
+        picture = QPicture()
+        painter = QPainter(picture)
+        painter.setRenderHints(self.view.settledRenderHints())
+        painter.setWorldTransform(base)
+        self.grScene.drawBackground(painter, self.tileSceneRect(key))
+
+        option = QStyleOptionGraphicsItem()
+        for item in self.grScene.items(self.tileSceneRect(key, TILE_MARGIN), Qt.IntersectsItemBoundingRect, Qt.AscendingOrder):
+            if not item.isVisible() or not self.isCacheable(item): continue
+            option.exposedRect = item.boundingRect()
+            painter.save()
+            painter.setWorldTransform(item.sceneTransform() * base)
+            painter.setOpacity(item.effectiveOpacity())
+            item.paint(painter, option, None)
+            painter.restore()
+        painter.end()
+        return picture
+
+    # 视图的drawBackground中调用：贴上覆盖rect的分块，缺的分块马上画。视图旋转等不能贴图时返回False
+    def paint(self, painter, rect):
+        transform = painter.worldTransform()
+        self._active = transform.type() <= QTransform.TxScale
+        if not self._active: return False
+        self.updateDynamic()
+
+        sx, sy = round(transform.m11(), 9), round(transform.m22(), 9)
+        ratio = painter.device().devicePixelRatioF()
+        keys = self.tileKeys(sx, sy, ratio, rect)
+        for key in keys:
+            if key not in self._tiles:
+                self._pending.pop(key, None)
+                self._tiles[key] = rasterizeTile(self.recordTile(key), ratio)
+                if DEBUG: print("TileCache:", "rendered", key)
+
+        painter.save()
+        painter.resetTransform()
+        for key in keys:
+            self._tiles.move_to_end(key)
+            origin = transform.map(self.tileSceneRect(key).topLeft())
+            painter.drawImage(QPoint(int(round(origin.x())), int(round(origin.y()))), self._tiles[key])
+        painter.restore()
+
+        self.trim(len(keys))
+        self.schedulePrefetch(sx, sy, ratio)
+        return True
+
+    def trim(self, keep=0):
+        while len(self._tiles) > max(TILE_CACHE_SIZE, 2 * keep):
+            self._tiles.popitem(last=False)
+
+    def schedulePrefetch(self, sx, sy, ratio):
+        keys = self.tileKeys(sx, sy, ratio, self.view.visibleSceneRect(), TILE_PREFETCH)
+        self._prefetch = [key for key in keys if key not in self._tiles and key not in self._pending]
+        if self._prefetch: self._prefetch_timer.start()
+
+    def prefetchStep(self):
+        batch, self._prefetch = self._prefetch[:TILE_PREFETCH_BATCH], self._prefetch[TILE_PREFETCH_BATCH:]
+        for key in batch:
+            if key in self._tiles or key in self._pending: continue
+            job = TileJob(self, key, self.recordTile(key))
+            self._pending[key] = job
+            QThreadPool.globalInstance().start(job)
+        if self._prefetch: self._prefetch_timer.start()
+
+    def tileFinished(self, job, image):
+        # 画的过程中分块已经失效或者已经在GUI线程中画好了
+        if self._pending.get(job.key) is not job: return
+        del self._pending[job.key]
+        self._tiles[job.key] = image
+        self.trim()
@@ -0,0 +1,245 @@
+"""
+    阀: 伺服阀、单向阀、溢流阀
+    控件类型在node_types.py中登记，第一次用到时才导入本模块
+"""
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+import math
+from pyHydraulic.node_graphics_node import QAbstractGraphicsNode, QNodePartItem, MyArrowItem
+
+# 5.Gauge：伺服阀
+class GraphicsNode_servo_valve(QAbstractGraphicsNode):
+    # 阀体不随数值变化，使用符号缓存；阀芯(连同线圈和箭头)和数值文本是单独的子图元
+    staticSymbol = True
+    textInParts = True
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.node_type = "servo valve"
+        self.unit = "mA"
+        self._OffsetPix = 0  # 阀芯偏移的像素点
+
+        # 阀芯按阀芯居中时的坐标画，数值变化时只平移阀芯
+        margin = self._pen_selected.width()
+        self._spool = QNodePartItem(self, self.paintSpool, QRectF(-self.width / 2, self.height * -4.5 / 10, self.width,
+                                                                  self.height * 9 / 10).adjusted(-margin, -margin, margin, margin))
+        # 箭头子类嵌入到阀芯中，跟着阀芯移动
+        self._arrow_left = MyArrowItem(self._spool, QPointF(self.width * -11.5 / 25, self.height * 4.5 / 10), QPointF(self.width * -7.5 / 25, 0))
+        self._arrow_left.arrowLength = self.width / 50
+
+        self._arrow_right = MyArrowItem(self._spool, QPointF(self.width * 11.5 / 25, self.height * 4.5 / 10), QPointF(self.width * 7.5 / 25, 0))
+        self._arrow_right.arrowLength = self.width / 50
+
+        self._text_part = QNodePartItem(self, self.paintText)
+        self._value_font = QFont(self.textFont, int(self.width / 20), QFont.Medium)  # 第二个参数是字体大小
+
+        # 与偏转相关的物理量
+        self.maxValue = 100
+        self.minValue = -100
+        self.value = 0  # _value为内部变量，此句话意思要调用一下value函数，更新初始状态
+
+    # 计算出阀芯的像素偏移, 距离正中间偏移为0，左边为负，右为正，只平移阀芯和文字
+    def valueChanged(self):
+        self._OffsetPix = (self._percent - 0.5) * self.width * (2 / 5)
+        self._spool.setPos(self._OffsetPix, 0)
+        self._text_part.setRect(self.textRect(self._value_font, QPointF(-self.width / 2 + self._OffsetPix, 0), self.valueText()))
+        self._text_part.update()
+
+    def valueText(self):
+        return str(round(self.value, 1)) + self.unit
+
+    # 重写node绘制函数，只画阀体的2个横线
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        path = QPainterPath()
+
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+        # 画2个横线
+        painter.save()
+        pen = painter.pen()
+        pen.setWidth(20)
+        painter.setPen(pen)
+        path.moveTo(self.width *-1.5 / 5, -self.height/2)
+        path.lineTo(self.width * 1.5 / 5,  -self.height/2)
+        path.moveTo(self.width * -1.5 / 5, self.height/2)
+        path.lineTo(self.width * 1.5 / 5, self.height/2)
+        painter.drawPath(path)
+        painter.restore()
+
+    # 阀芯：矩形阀芯、电磁线圈和中间的线，按阀芯居中时的坐标画
+    def paintSpool(self, painter):
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+        path = QPainterPath()
+
+        path.addRect(self.width * -1.5 / 5, self.height *-4 / 10, self.width * 3 / 5,
+                     self.height * 8 / 10)
+        # 添加矩形电磁线圈
+        path.addRect(-self.width / 2, self.height * 2 / 10, self.width * 1 / 5, self.height * 2 / 10)
+        path.addRect(self.width * 1.5 / 5, self.height * 2 / 10, self.width * 1 / 5,
+                     self.height * 2 / 10)
+
+        # 画线左线圈上的线
+        path.moveTo(self.width * -11.5/ 25, self.height * 4 / 10)
+        path.lineTo(self.width * -10.5 / 25, self.height * 2 / 10)
+        path.moveTo(self.width * -8.5 / 25, self.height * 4 / 10)
+        path.lineTo(self.width * -9.5 / 25, self.height * 2 / 10)
+        # 画线右线圈上的线
+        path.moveTo(self.width * 8.5 / 25, self.height * 4 / 10)
+        path.lineTo(self.width * 9.5 / 25, self.height * 2 / 10)
+        path.moveTo(self.width * 11.5 / 25, self.height * 4 / 10)
+        path.lineTo(self.width * 10.5 / 25, self.height * 2 / 10)
+        # 画中间的竖线
+        path.moveTo(self.width * -0.5 / 5, self.height * - 4 / 10)
+        path.lineTo(self.width * -0.5 / 5, self.height * 4 / 10)
+
+        path.moveTo(self.width * -1 / 20, self.height * -4 / 10)
+        path.lineTo(self.width * -1 / 20, self.height * 4 / 10)
+
+        path.moveTo(self.width * 1 / 20, self.height * -4 / 10)
+        path.lineTo(self.width * 1 / 20, self.height * 4 / 10)
+
+        path.moveTo(self.width * 0.5 / 5, self.height * -4 / 10)
+        path.lineTo(self.width * 0.5 / 5, self.height * 4 / 10)
+        # 中间横线
+        path.moveTo(self.width * -1 / 20, 0)
+        path.lineTo(self.width * 1 / 20, 0)
+
+        # 画左边的竖线
+        path.moveTo(self.width * -5 / 20, self.height * -4 / 10)
+        path.lineTo(self.width * -5 / 20, self.height * 4 / 10)
+
+        path.moveTo(self.width * -3 / 20, self.height * -4 / 10)
+        path.lineTo(self.width * -3 / 20, self.height * 4 / 10)
+
+        # 画右边的斜线
+        path.moveTo(self.width * 3 / 20, self.height * -4 / 10)
+        path.lineTo(self.width * 5 / 20, self.height * 4 / 10)
+
+        path.moveTo(self.width * 3 / 20, self.height * 4 / 10)
+        path.lineTo(self.width * 5 / 20, self.height * -4 / 10)
+
+        painter.setBrush(Qt.black)
+        painter.drawPath(path)
+
+        # 中间添加两个点.点的直径为3
+        path.addEllipse(QPointF(self.width * -1 / 20, 0), 3, 3)
+        path.addEllipse(QPointF(self.width * 1 / 20, 0), 3, 3)
+
+        # path.setFillRule(Qt.WindingFill)  # 所有闭合曲线全部填充
+        # 路径
+        painter.setBrush(Qt.darkGreen)
+        painter.drawPath(path)
+
+    # 4.显示文本，跟着阀芯移动
+    def paintText(self, painter):
+        if not self.textEnable: return
+        self._text = self.valueText()
+        # 文字太小看不清时不画
+        if self.isTextLegible(self.width / 20):
+            painter.setPen(self._pen_default)
+            painter.setFont(self._value_font)
+            # painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+            painter.drawText(QPointF(-self.width/2 + self._OffsetPix, 0), self._text)
+
+# 10.one-way valve:静止的单向阀
+class GraphicsNode_oneway_valve(QAbstractGraphicsNode):
+    staticSymbol = True  # 符号不随数值变化，使用共用的符号缓存
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.textEnable = False  # 不显示文本
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.unit = "mL"
+
+    # 重写node绘制函数，画压力传感器
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        # 画2个竖线和圆
+        painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+        painter.drawLine(QLineF(0, -self.height/2, 0, self.height * (-1 / 4 - 1/20)))
+        painter.drawLine(QLineF(0, self.height * (1 / 4 - 1/20), 0, self.height/2))
+        painter.drawEllipse(QPointF(0, self.height * ( - 2/20)), self.height / 5,
+                            self.height / 5)
+        # 画1个圆上个楔形切线直线
+        painter.drawLine(QLineF(-self.width/2,  self.height*( - 1 / 20), 0, self.height * (1 / 4 - 1 / 20)))
+        painter.drawLine(QLineF(self.width/2,  self.height*(- 1 / 20), 0, self.height * (1 / 4 - 1 / 20)))
+        # 4.显示文本
+        # if self.textEnable:
+        #     self._text = str(round(self.value, 1)) + self.unit
+        #     painter.setPen(self._pen_default)
+        #     painter.setFont(QFont('Times New Roman', self.width / 4, QFont.Medium))  # 第二个参数是字体大小
+        #     painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+        #     painter.drawText(QPointF(self.width * 2 / 3, self.height), self._text)
+
+# 11.静止的溢流阀
+class GraphicsNode_relief_valve(QAbstractGraphicsNode):
+    staticSymbol = True  # 符号不随数值变化，使用共用的符号缓存
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.textEnable = False  # 不显示文本
+        # 自己独特的变量，或者对父类变量进行篡改
+        self.unit = "mL"
+        # 箭头子类嵌入到本控件中
+        self._arrow_left = MyArrowItem(self, QPointF(0, self.height * -2 / 6),
+                                       QPointF(0, self.height * 1.8 / 6))
+        self._arrow_left.arrowLength = self.width / 20
+
+    # 重写node绘制函数，画压力传感器
+    def paintDetail(self, painter, QStyleOptionGraphicsItem, widget=None):
+        # 根据获取的坐标，更新要绘制的路径
+        path = QPainterPath()
+
+        # 1. 画2个竖线
+        pen = self._pen_default if not self.isSelected() else self._pen_selected
+        painter.setPen(pen)
+        painter.drawLine(QLineF(self.width * 1 / 8, - self.height/2, self.width * 1 / 8, self.height * -2 / 6))
+        painter.drawLine(QLineF(self.width * 1 / 8, self.height * 2 / 6, self.width * 1 / 8, self.height/2))
+
+        painter.save()
+        painter.setBrush(QColor("#B8860B"))
+        painter.drawRect(QRectF(self.width * (1 / 8 - 2 / 6), self.height * -2 / 6, self.width * 4 / 6, self.height * 4 / 6))
+        painter.restore()
+        # 2.画弹簧
+        # 画弹簧
+        path = QPainterPath()
+        path.moveTo(self.width * (1 / 8 + 2 / 6), self.height * -2 / 6)
+        path.lineTo(self.width * (1 / 8 + 2 / 6 + 1 / 20), 0)
+        path.lineTo(self.width * (1 / 8 + 2 / 6 + 2 / 20), self.height * -2 / 6)
+        path.lineTo(self.width * (1 / 8 + 2 / 6 + 3 / 20), 0)
+        path.lineTo(self.width * (1 / 8 + 2 / 6 + 4 / 20), self.height * -2 / 6)
+        path.lineTo(self.width * (1 / 8 + 2 / 6 + 5 / 20), 0)
+
+        painter.drawPath(path)
+
+        # 3.画虚线，下面是拐角的集合
+        points = [QPointF(self.width * (1 / 8 - 2 /6), self.height * 1 / 6),
+                  QPointF(-self.width/2,self.height * 1 / 6),
+                  QPointF(-self.width/2, -self.height/2),
+                  QPointF(self.width * -1/8, -self.height/2),
+                  QPointF(self.width * 1 / 8, self.height * -2 / 6),
+                  ]
+        path = QPainterPath(points[0])  # 先到 第一个点
+        for point in points:
+            path.lineTo(point)
+        pen.setStyle(Qt.DotLine)
+
+        painter.setPen(pen)
+        painter.drawPath(path)
+        pen.setStyle(Qt.SolidLine)  # 还原画笔原有的实线状态，为下一次绘图做准备
+
+
+
+
+
+
+
+
+        # #  添加文字路径
+        # # 4.显示文本
+        # if self.textEnable:
+        #     self._text = str(round(self.value, 1)) + self.unit
+        #     painter.setPen(self._pen_default)
+        #     painter.setFont(QFont('Times New Roman', self.width / 4, QFont.Medium))  # 第二个参数是字体大小
+        #     painter.setOpacity(0.6)  # 0：完全透明，1：完全不透明
+        #     painter.drawText(QPointF(self.width * 2 / 3, self.height), self._text)
@@ -8,6 +8,8 @@ from pyHydraulic.node_graphics_edge import QDMGraphicsEdge
 from pyHydraulic.node_edge import Edge, EDGE_TYPE_BEZIER, EDGE_TYPE_POLYGONAL
 from pyHydraulic.node_graphics_cutline import QDMCutLine
 from pyHydraulic.node_graphics_node import QAbstractGraphicsNode
+from pyHydraulic.node_graphics_tiles import TileCache
+from pyHydraulic.utils import CoalescedSignal
 
 MODE_NOOP = 1
 MODE_EDGE_DRAG = 2
@@ -15,6 +17,43 @@ MODE_EDGE_CUT = 3
 
 EDGE_DRAG_START_THRESHOLD = 10
 
+# 绘制质量方案：quality为完整质量(原来的设置)，balanced和performance在平移、缩放和拖动时去掉抗锯齿，
+# 停止操作RENDER_INTERACTION_SETTLE毫秒后再用完整的设置重画一次
+RENDER_PROFILE_QUALITY = "quality"
+RENDER_PROFILE_BALANCED = "balanced"
+RENDER_PROFILE_PERFORMANCE = "performance"
+RENDER_INTERACTION_SETTLE = 150
+
+# 平滑缩放：滚轮时先缩放当前画面的截图做动画，停止滚动SMOOTH_ZOOM_SETTLE毫秒后才真正缩放并重画一次
+SMOOTH_ZOOM_DURATION = 120  # 每一格滚轮的动画时间，毫秒
+SMOOTH_ZOOM_SETTLE = 150
+SMOOTH_ZOOM_FRAME = 15  # 动画的帧间隔，毫秒
+
+_ALL_RENDER_HINTS = QPainter.Antialiasing | QPainter.HighQualityAntialiasing | QPainter.TextAntialiasing | QPainter.SmoothPixmapTransform
+RENDER_PROFILES = {
+    RENDER_PROFILE_QUALITY: {
+        'render_hints': _ALL_RENDER_HINTS,
+        'interaction_hints': _ALL_RENDER_HINTS,
+        'update_mode': QGraphicsView.FullViewportUpdate,
+        'cache_mode': QGraphicsView.CacheNone,
+        'optimization_flags': QGraphicsView.OptimizationFlags(),
+    },
+    RENDER_PROFILE_BALANCED: {
+        'render_hints': QPainter.Antialiasing | QPainter.TextAntialiasing | QPainter.SmoothPixmapTransform,
+        'interaction_hints': QPainter.RenderHints(QPainter.TextAntialiasing),
+        'update_mode': QGraphicsView.SmartViewportUpdate,
+        'cache_mode': QGraphicsView.CacheBackground,
+        'optimization_flags': QGraphicsView.OptimizationFlags(),
+    },
+    RENDER_PROFILE_PERFORMANCE: {
+        'render_hints': QPainter.RenderHints(QPainter.TextAntialiasing),
+        'interaction_hints': QPainter.RenderHints(),
+        'update_mode': QGraphicsView.BoundingRectViewportUpdate,
+        'cache_mode': QGraphicsView.CacheBackground,
+        'optimization_flags': QGraphicsView.OptimizationFlags(QGraphicsView.DontAdjustForAntialiasing),
+    },
+}
+
 
 DEBUG = True
 
@@ -40,16 +79,47 @@ class QDMGraphicsView(QGraphicsView):
         self.zoom = 10  # 初始的倍数值
         self.zoomStep = 1  # 每次滚轮，self.zoom的变化值
         self.zoomRange = [-1, 7]  # self.zoom的变化值的变化范围，超过范围，zoomInFactor为False
+        self.smoothZoom = True  # 是否使用平滑缩放
+
+        # 平滑缩放的状态：截图、截图当前和目标的缩放倍数、缩放中心(视口坐标和scene坐标)
+        self._zoom_snapshot = None
+        self._zoom_scale = 1.0
+        self._zoom_scale_from = 1.0
+        self._zoom_scale_target = 1.0
+        self._zoom_anchor = None
+        self._zoom_scene_anchor = None
+        self._zoom_applying = False
+        self._zoom_clock = QElapsedTimer()
+        self._zoom_last_wheel = QElapsedTimer()
+        self._zoom_timer = QTimer(self)
+        self._zoom_timer.setInterval(SMOOTH_ZOOM_FRAME)
+        self._zoom_timer.timeout.connect(self.smoothZoomStep)
 
         # cutline
         self.cutline = QDMCutLine()
         self.grScene.addItem(self.cutline)
 
+        # 视图滚动、缩放之后通知虚拟化的scene创建和释放图元，连续滚动时合并成一次
+        self._virtual_region_timer = QTimer(self)
+        self._virtual_region_timer.setSingleShot(True)
+        self._virtual_region_timer.setInterval(30)
+        self._virtual_region_timer.timeout.connect(self.updateVirtualRegion)
 
-    def initUI(self):
-        self.setRenderHints(QPainter.Antialiasing | QPainter.HighQualityAntialiasing | QPainter.TextAntialiasing | QPainter.SmoothPixmapTransform)
+        # 鼠标位置和选中对象的通知每帧最多发射一次，相同的不重复发射
+        self._scene_pos_signal = CoalescedSignal(self.scenePosChanged, parent=self)
+        self._item_selected_signal = CoalescedSignal(self.sceneItemSelected, parent=self)
 
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+
+    def initUI(self):
+        # 静态内容的分块缓存，setTileCacheEnabled打开
+        self.tileCache = None
+        # 平移、缩放和拖动停止一段时间后恢复完整的绘制质量
+        self._interacting = False
+        self._interaction_timer = QTimer(self)
+        self._interaction_timer.setSingleShot(True)
+        self._interaction_timer.setInterval(RENDER_INTERACTION_SETTLE)
+        self._interaction_timer.timeout.connect(self.interactionFinished)
+        self.setRenderProfile(RENDER_PROFILE_QUALITY)
 
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
@@ -58,7 +128,63 @@ class QDMGraphicsView(QGraphicsView):
         self.setDragMode(QGraphicsView.RubberBandDrag)
 
 
+    # 选择绘制质量方案，决定视口的更新方式、缓存、优化选项和操作时的抗锯齿
+    def setRenderProfile(self, name):
+        if name not in RENDER_PROFILES:
+            print("!W:", "View::setRenderProfile", "unknown render profile", name)
+            return
+        self.render_profile = name
+        profile = RENDER_PROFILES[name]
+        self.setViewportUpdateMode(profile['update_mode'])
+        # 背景缓存会把分块缓存的静态内容也存下来，分块缓存打开时不用
+        self.setCacheMode(profile['cache_mode'] if self.tileCache is None else QGraphicsView.CacheNone)
+        self.setOptimizationFlags(profile['optimization_flags'])
+        self.setRenderHints(profile['interaction_hints'] if self._interacting else profile['render_hints'])
+        self.resetCachedContent()
+        if self.tileCache is not None: self.tileCache.clear()
+
+    # 停止操作后的绘制设置，分块缓存一直用这个设置画
+    def settledRenderHints(self):
+        return RENDER_PROFILES[self.render_profile]['render_hints']
+
+    # 分块缓存：静态的控件和edge在后台线程中按缩放比例画成分块，重画时只贴图，动态的图元画在上面
+    def setTileCacheEnabled(self, enabled):
+        if enabled == (self.tileCache is not None): return
+        if enabled:
+            self.tileCache = TileCache(self)
+        else:
+            self.tileCache.stop()
+            self.tileCache.deleteLater()
+            self.tileCache = None
+        self.setRenderProfile(self.render_profile)
+        self.viewport().update()
+
+    def isTileCacheEnabled(self):
+        return self.tileCache is not None
+
+    # 平移、缩放或拖动时调用，换成操作时的绘制设置，停止操作后由interactionFinished恢复
+    def interactionStarted(self):
+        if not self._interacting:
+            self._interacting = True
+            self.setRenderHints(RENDER_PROFILES[self.render_profile]['interaction_hints'])
+        self._interaction_timer.start()
+
+    def interactionFinished(self):
+        # 还按着鼠标(比如拖动停在原地)时继续等待
+        if QApplication.mouseButtons() != Qt.NoButton:
+            self._interaction_timer.start()
+            return
+        self._interaction_timer.stop()
+        if self._interacting:
+            self._interacting = False
+            self.setRenderHints(RENDER_PROFILES[self.render_profile]['render_hints'])
+
+    def isInteracting(self):
+        return self._interacting
+
     def mousePressEvent(self, event):
+        # 点击时先完成正在进行的平滑缩放，图元的位置才和画面一致
+        self.finishSmoothZoom()
         if event.button() == Qt.MiddleButton:
             self.middleMouseButtonPress(event)
         elif event.button() == Qt.LeftButton:
@@ -127,6 +253,8 @@ class QDMGraphicsView(QGraphicsView):
         if self.mode == MODE_EDGE_DRAG:
             res = self.edgeDragEnd(item)
             if res: return
+            # 点到的可能是刚删除的拖动中的edge，重新找一次
+            item = self.getItemAtClick(event)
 
         if item is None:
             # 如果按住ctrl键盘情况下，左键鼠标
@@ -140,14 +268,13 @@ class QDMGraphicsView(QGraphicsView):
             else:
                 self.rubberBandDraggingRectangle = True
 
-        item = self.getItemAtClick(event)
         if isinstance(item, QAbstractGraphicsNode):   # 如果选中的是node对象或者子对象
             QApplication.setOverrideCursor(Qt.ClosedHandCursor)  #选中后变成移动图标
-            self.sceneItemSelected.emit(item.node._node_type, item.node.id)  # "选中的node的类型为%s, id为%d,"
+            self._item_selected_signal.post(item.node._node_type, item.node.id)  # "选中的node的类型为%s, id为%d,"
         elif isinstance(item, QDMGraphicsEdge):  # 如果选中的是edge对象
-            self.sceneItemSelected.emit("edge"+str(item.edge.edge_type), item.edge.id)
+            self._item_selected_signal.post("edge"+str(item.edge.edge_type), item.edge.id)
         else:
-            self.sceneItemSelected.emit("", 0) # 如果选中的是空对象
+            self._item_selected_signal.post("", 0) # 如果选中的是空对象
 
         super().mousePressEvent(event)
 
@@ -175,8 +302,7 @@ class QDMGraphicsView(QGraphicsView):
 
         if self.mode == MODE_EDGE_CUT:
             self.cutIntersectingEdges()
-            self.cutline.line_points = []
-            self.cutline.update()
+            self.cutline.clear()
             self.mode = MODE_NOOP
 
 
@@ -184,7 +310,7 @@ class QDMGraphicsView(QGraphicsView):
 
 
         if self.rubberBandDraggingRectangle:
-            self.grScene.scene.history.storeHistory("Selection changed")
+            self.grScene.scene.history.storeSelection("Selection changed")
             self.rubberBandDraggingRectangle = False
 
         super().mouseReleaseEvent(event)
@@ -222,12 +348,14 @@ class QDMGraphicsView(QGraphicsView):
         # 添加鼠标当前点进入line_points
         if self.mode == MODE_EDGE_CUT:
             pos = self.mapToScene(event.pos()) # 移动一下，就添加一个点
-            self.cutline.line_points.append(pos)
-            self.cutline.update()
+            self.cutline.addPoint(pos, self.transform().m11())
+
+        # 按着鼠标移动是在拖动控件、选框或者平移视图
+        if event.buttons() != Qt.NoButton or self.mode == MODE_EDGE_DRAG: self.interactionStarted()
 
         self.last_scene_mouse_position = self.mapToScene(event.pos())
-        # 这里发射鼠标移动点信号
-        self.scenePosChanged.emit(
+        # 这里发射鼠标移动点信号，每帧最多一次
+        self._scene_pos_signal.post(
             int(self.last_scene_mouse_position.x()), int(self.last_scene_mouse_position.y())
         )
 
@@ -261,42 +389,45 @@ class QDMGraphicsView(QGraphicsView):
         # else:
         super().keyPressEvent(event)
 
-    # 判断cutLine与当前scene中每个edge是否相交，如果相交，就切断相交的edge
+    # 判断cutLine与edge是否相交，如果相交，就切断相交的edge
+    # 先用grScene的BSP索引找出外接矩形和每一段相交的edge，只对这些edge精确判断相交
     def cutIntersectingEdges(self):
-        for ix in range(len(self.cutline.line_points) - 1):
-            p1 = self.cutline.line_points[ix]
-            p2 = self.cutline.line_points[ix + 1]
-
-            for edge in self.grScene.scene.edges:
-                if edge.grEdge.intersectsWith(p1, p2):
-                    # 删除edge
-                    edge.remove()
+        points = self.cutline.simplifiedPoints(self.transform().m11())
+        cut = {}
+        for p1, p2 in zip(points, points[1:]):
+            rect = QRectF(p1, p2).normalized().adjusted(-1, -1, 1, 1)
+            # 没有图元的edge离视图很远，不会和cutLine相交
+            for item in self.grScene.items(rect, Qt.IntersectsItemBoundingRect, Qt.AscendingOrder):
+                if isinstance(item, QDMGraphicsEdge) and item.edge not in cut and item.intersectsWith(p1, p2):
+                    cut[item.edge] = True
+        if not cut: return
 
-        self.grScene.scene.history.storeHistory("Delete cutted edges", setModified=True)
+        # 一次删除所有剪断的edge，只记一次历史
+        scene = self.grScene.scene
+        with scene.batch():
+            for edge in cut:
+                edge.remove()
+            scene.history.storeHistory("Delete cutted edges", setModified=True)
 
 
 
     def deleteSelected(self):
-        # 选中的只能是gr对象
-        for item in self.grScene.selectedItems():
-            if isinstance(item, QDMGraphicsEdge):  # 如果是grEdge对象
-                item.edge.remove()
-            elif isinstance(item, QAbstractGraphicsNode): #hasattr(item, 'node'):  # 如果是grNode对象，具有属性'node'
-                item.node.remove()
+        # 先删除edge，node删除时会删除和它相连的edge
+        scene = self.grScene.scene
+        for edge in scene.selected_edges:
+            edge.remove()
+        for node in scene.selected_nodes:
+            node.remove()
         self.grScene.scene.history.storeHistory("Delete selected", setModified=True)
 
     def rotateSelected(self, angle):
-        # 选中的只能是grnode对象
-        for item in self.grScene.selectedItems():
-            if isinstance(item, QAbstractGraphicsNode): #hasattr(item, 'node'):  # 如果是grNode对象，具有属性'node'
-                item.node.rotate(angle)
+        for node in self.grScene.scene.selected_nodes:
+            node.rotate(angle)
         self.grScene.scene.history.storeHistory("Rotate selected", setModified=True)
 
     def scaleSelected(self, scale):
-        # 选中的只能是grnode对象
-        for item in self.grScene.selectedItems():
-            if isinstance(item, QAbstractGraphicsNode):  # hasattr(item, 'node'):  # 如果是grNode对象，具有属性'node'
-                item.node.setRelativeScale(scale)
+        for node in self.grScene.scene.selected_nodes:
+            node.setRelativeScale(scale)
         self.grScene.scene.history.storeHistory("Scale selected", setModified=True)
 
 
@@ -390,5 +521,107 @@ class QDMGraphicsView(QGraphicsView):
 
         # set scene scale
         if not clamped or self.zoomClamp is False:
+            if self.smoothZoom:
+                self.startSmoothZoom(zoomFactor, event.pos())
+                return
+            self.interactionStarted()
             self.scale(zoomFactor, zoomFactor)
-
+        self.scheduleVirtualRegionUpdate()
+
+    # 开始或者继续平滑缩放：第一格滚轮时截取当前画面，之后只改变截图缩放的目标倍数
+    def startSmoothZoom(self, factor, anchor):
+        if self._zoom_snapshot is None:
+            self._zoom_snapshot = self.viewport().grab()
+            self._zoom_scale = self._zoom_scale_target = 1.0
+            self._zoom_anchor = QPointF(anchor)
+            self._zoom_scene_anchor = self.mapToScene(anchor)
+        self._zoom_scale_from = self._zoom_scale
+        self._zoom_scale_target *= factor
+        self._zoom_clock.start()
+        self._zoom_last_wheel.start()
+        if not self._zoom_timer.isActive(): self._zoom_timer.start()
+
+    def isSmoothZooming(self):
+        return self._zoom_snapshot is not None
+
+    def smoothZoomStep(self):
+        t = min(1.0, self._zoom_clock.elapsed() / SMOOTH_ZOOM_DURATION)
+        # 先快后慢
+        t = 1 - (1 - t) * (1 - t)
+        self._zoom_scale = self._zoom_scale_from + (self._zoom_scale_target - self._zoom_scale_from) * t
+        self.viewport().update()
+        if t >= 1.0 and self._zoom_last_wheel.elapsed() >= SMOOTH_ZOOM_SETTLE:
+            self.finishSmoothZoom()
+
+    # 真正缩放视图，保持缩放中心下的scene坐标不变，然后重画一次
+    def finishSmoothZoom(self):
+        if self._zoom_snapshot is None: return
+        self._zoom_timer.stop()
+        scale, anchor, scene_anchor = self._zoom_scale_target, self._zoom_anchor, self._zoom_scene_anchor
+        self._zoom_snapshot = None
+        self._zoom_scale = self._zoom_scale_from = self._zoom_scale_target = 1.0
+
+        self._zoom_applying = True
+        transformation_anchor = self.transformationAnchor()
+        self.setTransformationAnchor(QGraphicsView.NoAnchor)
+        try:
+            self.scale(scale, scale)
+            offset = self.mapFromScene(scene_anchor) - anchor.toPoint()
+            self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() + offset.x())
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() + offset.y())
+        finally:
+            self.setTransformationAnchor(transformation_anchor)
+            self._zoom_applying = False
+        self.viewport().update()
+        self.scheduleVirtualRegionUpdate()
+
+    def paintEvent(self, event):
+        # 平滑缩放的过程中只画缩放后的截图
+        if self._zoom_snapshot is not None:
+            painter = QPainter(self.viewport())
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.fillRect(self.viewport().rect(), self.backgroundBrush() if self.backgroundBrush().style() != Qt.NoBrush
+                             else self.grScene.backgroundBrush())
+            painter.translate(self._zoom_anchor)
+            painter.scale(self._zoom_scale, self._zoom_scale)
+            painter.translate(-self._zoom_anchor)
+            painter.drawPixmap(0, 0, self._zoom_snapshot)
+            painter.end()
+            return
+        super().paintEvent(event)
+
+    def drawBackground(self, painter, rect):
+        if self.tileCache is not None and self.tileCache.paint(painter, rect): return
+        super().drawBackground(painter, rect)
+
+    def scrollContentsBy(self, dx, dy):
+        if not self._zoom_applying: self.interactionStarted()
+        super().scrollContentsBy(dx, dy)
+        self.scheduleVirtualRegionUpdate()
+
+    def resizeEvent(self, event):
+        self.finishSmoothZoom()
+        super().resizeEvent(event)
+        self.scheduleVirtualRegionUpdate()
+
+    # 视图显示或隐藏后，scene的动画时钟重新检查是否有看得见的视图。
+    # 关闭程序时scene可能先于视图删除，这时scene()为None
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.scene() is not None: self.grScene.updateAnimationTimer()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.scene() is not None: self.grScene.updateAnimationTimer()
+
+    # 当前视图中可见的scene区域
+    def visibleSceneRect(self):
+        return self.mapToScene(self.viewport().rect()).boundingRect()
+
+    def scheduleVirtualRegionUpdate(self):
+        if self.grScene.scene.isVirtualized() and not self._virtual_region_timer.isActive():
+            self._virtual_region_timer.start()
+
+    def updateVirtualRegion(self):
+        if self.grScene.scene.isVirtualized():
+            self.grScene.scene.virtualizer.setViewRect(self, self.visibleSceneRect())
@@ -1,6 +1,9 @@
-from pyHydraulic.node_graphics_node import *
-from pyHydraulic.node_content_widget import QDMNodeContentWidget
-from pyHydraulic.node_socket import *
+import math
+from collections import OrderedDict
+from PyQt5.QtCore import QPointF, QRectF
+from pyHydraulic.node_serializable import Serializable
+from pyHydraulic.node_socket import Socket
+from pyHydraulic.node_types import getNodeType
 from pyHydraulic.utils import dumpException
 
 DEBUG = False
@@ -16,62 +19,145 @@ class Node(Serializable):
         # 本node的当前比例系数
         self.scaleFactor = 1
 
-        #  self.grNode = QDMGraphicsNode(self)
-        #  判断要实例化控件的类型
-        if self._node_type in NODE_TYPES:
-            if self._node_type == "pressure sensor":
-                self.grNode = GraphicsNode_pressure_sensor(self)
-            elif self._node_type == "flow meter":
-                self.grNode = GraphicsNode_flow_meter(self)
-            elif self._node_type == "tank":
-                self.grNode = GraphicsNode_tank(self)
-            elif self._node_type == "gauge":
-                self.grNode = GraphicsNode_gauge(self)
-            elif self._node_type == "simple tank":
-                self.grNode = GraphicsNode_simple_tank(self)
-            elif self._node_type == "servo valve":
-                self.grNode = GraphicsNode_servo_valve(self)
-            elif self._node_type == "piston dual" or self._node_type == "piston right" or self._node_type == "piston left":
-                self.grNode = GraphicsNode_pistion(self)
-            elif self._node_type == "pump":
-                self.grNode = GraphicsNode_pump(self)
-            elif self._node_type == "filter":
-                self.grNode = GraphicsNode_filter(self)
-            elif self._node_type == "accumulator":
-                self.grNode = GraphicsNode_accumulator(self)
-            elif self._node_type == "one-way valve":
-                self.grNode = GraphicsNode_oneway_valve(self)
-            elif self._node_type == "relief valve":
-                self.grNode = GraphicsNode_relief_valve(self)
-            elif self._node_type == "text":
-                self.grNode = GraphicsNode_text(self)
-            else:
-                self.grNode = QAbstractGraphicsNode(self)
         self.title = self._node_type
-        # 下面scence注册一个Node,下一句是显示出Node
-        self.scene.addNode(self)
-        self.scene.grScene.addItem(self.grNode)
+        # 控件类型的元数据(尺寸、socket、默认数值)和创建图元的工厂，见node_types.py
+        self.type_info = getNodeType(self._node_type)
+        self.grNode = None
+        # 没有图元时node的状态(位置、角度、数值等)保存在这里，
+        # 无界面的scene中的node和虚拟化的scene中离视图较远的node都没有图元
+        self._state = None
+        if self.scene.hasGraphics() and not self.scene.isVirtualized():
+            #  按登记的类型实例化控件
+            self.grNode = self.type_info.createGraphics(self)
+            # 显示出Node
+            self.scene.addGraphicsItem(self.grNode)
+        else:
+            self._state = self.defaultState(self.type_info)
 
         # self.socket_spacing = 10
 
         # 在Node中根据socket信息添加socket到node中，self.sockets存放的是socket对象，统计用
         self.sockets = []
         counter = 0
-        for item in self.grNode.socketInfo:  # inputs存放的是socket样式索引，item[1]为socket坐标
-            socket = Socket(node=self, index=counter, socket_type=item[1], multi_edges=True)  # 这行就是把socket添加到了node中了
+        for item in self.type_info.sockets:  # item为(x, y, socket样式索引)
+            socket = Socket(node=self, index=counter, socket_type=item[2], multi_edges=True)  # 这行就是把socket添加到了node中了
             counter += 1
             self.sockets.append(socket)
+            self.scene.addSocket(socket)
+        # socket都创建好之后再向scene注册Node，并记录到历史的变化中
+        self.scene.addNode(self)
+        self.scene.history.objectAdded(self)
+        if self.scene.isVirtualized(): self.scene.virtualizer.objectAdded(self)
 
     def __str__(self):
         return "<Node %s..%s>" % (hex(id(self))[2:5], hex(id(self))[-3:])
 
+    def onIdChanged(self, old_id):
+        self.scene.reindexObject(self, old_id)
+
+    # 刚创建的node的状态，来自控件类型的元数据
+    @staticmethod
+    def defaultState(type_info):
+        return {
+            'pos_x': 0.0,
+            'pos_y': 0.0,
+            'rotation': 0.0,
+            'scale': 1.0,
+            'value': type_info.value,
+            'unit': type_info.unit,
+            'maxValue': type_info.maxValue,
+            'minValue': type_info.minValue,
+            'text': type_info.text,
+            'width': type_info.width,
+            'height': type_info.height,
+        }
+
+    # 从图元中取出node的状态
+    @staticmethod
+    def graphicsState(grNode):
+        return {
+            'pos_x': grNode.pos().x(),
+            'pos_y': grNode.pos().y(),
+            'rotation': grNode.rotation(),
+            'scale': grNode.scale(),
+            'value': grNode.value,
+            'unit': grNode.unit,
+            'maxValue': grNode.maxValue,
+            'minValue': grNode.minValue,
+            'text': grNode.text,
+            'width': grNode.width,
+            'height': grNode.height,
+        }
+
+    # 创建图元并恢复保存的状态
+    def createGraphics(self):
+        if self.grNode is not None: return
+        state = self._state
+        grNode = self.type_info.createGraphics(self)
+        grNode.setPos(state['pos_x'], state['pos_y'])
+        grNode.setTransformOriginPoint(grNode.boundingRect().center())
+        grNode.setRotation(state['rotation'])
+        grNode.setScale(state['scale'])
+        grNode.unit = state['unit']
+        grNode.restoreValues(state['value'], state['minValue'], state['maxValue'])
+        grNode.text = state['text']
+        self.grNode = grNode
+        self._state = None
+        self.scene.addGraphicsItem(self.grNode)
+        for socket in self.sockets: socket.createGraphics()
+
+    # 释放图元，状态保存到node中
+    def releaseGraphics(self):
+        if self.grNode is None: return
+        self._state = self.graphicsState(self.grNode)
+        for socket in self.sockets: socket.releaseGraphics()
+        self.scene.removeGraphicsItem(self.grNode)
+        self.grNode = None
+
+    # 没有图元时修改保存的状态
+    def _setState(self, key, value):
+        if self._state[key] != value:
+            self.scene.history.objectChanging(self)
+            self._state[key] = value
+
+    # 没有图元的node位置、角度或缩放变了，通知虚拟化的scene
+    def _stateMoved(self):
+        if self.scene.isVirtualized(): self.scene.virtualizer.objectMoved(self)
+
     # 1. 返回和设置item在父项或scene中的坐标
     @property
     def pos(self):
+        if self.grNode is None: return QPointF(self._state['pos_x'], self._state['pos_y'])
         return self.grNode.pos()        # QPointF
 
     def setPos(self, x, y):
-        self.grNode.setPos(x, y)
+        if self.grNode is None:
+            self._setState('pos_x', float(x))
+            self._setState('pos_y', float(y))
+            self._stateMoved()
+        else:
+            self.grNode.setPos(x, y)
+
+    # 把node局部坐标中的点转换成scene坐标，旋转和缩放的中心为控件中心(局部坐标原点)
+    def mapToScene(self, point):
+        if self.grNode is not None: return self.grNode.mapToScene(point)
+        return QPointF(*self._mapStateToScene(point.x(), point.y()))
+
+    # 按保存的状态计算，和QGraphicsItem的变换一致: 先缩放、再顺时针旋转、最后平移
+    def _mapStateToScene(self, x, y):
+        state = self._state
+        angle = math.radians(state['rotation'])
+        cos, sin = math.cos(angle) * state['scale'], math.sin(angle) * state['scale']
+        return state['pos_x'] + cos * x - sin * y, state['pos_y'] + sin * x + cos * y
+
+    # 控件在scene中的外接矩形
+    def sceneBoundingRect(self):
+        if self.grNode is not None: return self.grNode.sceneBoundingRect()
+        width, height = self._state['width'] / 2, self._state['height'] / 2
+        corners = [self._mapStateToScene(x, y) for x, y in
+                   ((-width, -height), (width, -height), (width, height), (-width, height))]
+        xs, ys = [corner[0] for corner in corners], [corner[1] for corner in corners]
+        return QRectF(QPointF(min(xs), min(ys)), QPointF(max(xs), max(ys)))
 
     # 2. 返回和设置item的名称
     @property
@@ -82,12 +168,62 @@ class Node(Serializable):
         self._node_type = value
         # self.grNode.title = self._node_type
 
+    # 控件的数值、单位和文本，有图元时就是图元中的值
+    @property
+    def value(self): return self.grNode.value if self.grNode is not None else self._state['value']
+
+    @value.setter
+    def value(self, value):
+        if self.grNode is not None: self.grNode.value = value
+        else: self._setState('value', value)
+
+    @property
+    def maxValue(self): return self.grNode.maxValue if self.grNode is not None else self._state['maxValue']
+
+    @maxValue.setter
+    def maxValue(self, value):
+        if self.grNode is not None: self.grNode.maxValue = value
+        else: self._setState('maxValue', value)
+
+    @property
+    def minValue(self): return self.grNode.minValue if self.grNode is not None else self._state['minValue']
+
+    @minValue.setter
+    def minValue(self, value):
+        if self.grNode is not None: self.grNode.minValue = value
+        else: self._setState('minValue', value)
+
+    @property
+    def unit(self): return self.grNode.unit if self.grNode is not None else self._state['unit']
+
+    @unit.setter
+    def unit(self, value):
+        if self.grNode is not None: self.grNode.unit = value
+        else: self._setState('unit', value)
+
+    @property
+    def text(self): return self.grNode.text if self.grNode is not None else self._state['text']
+
+    @text.setter
+    def text(self, value):
+        if self.grNode is not None: self.grNode.text = value
+        else: self._setState('text', value)
+
+    # 不检查范围直接设置数值和上下限，用于还原保存过的数据
+    def restoreValues(self, value, minValue, maxValue):
+        if self.grNode is not None:
+            self.grNode.restoreValues(value, minValue, maxValue)
+        else:
+            self._setState('value', value)
+            self._setState('minValue', minValue)
+            self._setState('maxValue', maxValue)
+
     # 3. 返回和设置item中socket在父项item 的局部坐标，index为索引
-    # 进到每个grNode里的socketInfo里去查每个socket的位置信息，返回的基于node的局部坐标，并不是scene坐标
+    # 从控件类型的元数据里去查每个socket的位置信息，返回的基于node的局部坐标，并不是scene坐标
     def getSocketPosition(self, index):
-        if index < len(self.grNode.socketInfo):
-            postion = self.grNode.socketInfo[index][0]
-            return [postion.x(), postion.y()]
+        sockets = self.type_info.sockets
+        if index < len(sockets):
+            return [sockets[index][0], sockets[index][1]]
         else: return None
 
     # 4.更新socket中线Edge的坐标
@@ -97,60 +233,80 @@ class Node(Serializable):
             for edge in socket.edges:
                 edge.updatePositions()
 
+    # 标记连接在本node上的edge需要更新位置，由scene在下一帧统一更新
+    def markConnectedEdgesDirty(self):
+        for socket in self.sockets:
+            for edge in socket.edges:
+                self.scene.markEdgeDirty(edge)
+
     # 5.删除Node，要删除所有的socket，还有edge
     def remove(self):
         if DEBUG: print("> Removing Node", self)
+        self.scene.history.objectChanging(self)
         if DEBUG: print(" - remove all edges from sockets")
         # 1.删除所有的socket
         for socket in self.sockets:
             # if socket.hasEdge():
-            # 2.删除所有的edges
-            for edge in socket.edges:
+            # 2.删除所有的edges，edge.remove()会修改socket.edges，所以遍历副本
+            for edge in list(socket.edges):
                 if DEBUG: print("    - removing from socket:", socket, "edge:", edge)
                 edge.remove()
         if DEBUG: print(" - remove grNode")
         # 3.移除自身node
-        self.scene.grScene.removeItem(self.grNode)
-        self.grNode = None
+        if self.grNode is not None:
+            self._state = self.graphicsState(self.grNode)
+            self.scene.removeGraphicsItem(self.grNode)
+            self.grNode = None
+        if self.scene.isVirtualized(): self.scene.virtualizer.objectRemoved(self)
         if DEBUG: print(" - remove node from the scene")
-        # 4.删除scene统计中的node
+        # 4.删除scene统计中的node和socket
+        for socket in self.sockets:
+            self.scene.removeSocket(socket)
         self.scene.removeNode(self)
         if DEBUG: print(" - everything was done.")
 
     # 6.顺时针旋转增量angel，单位为度,
     def rotate(self, angle):
-        self.setRotation(self.grNode.rotation() + angle)
+        self.setRotation(self.rotation() + angle)
         # 顺时针旋转到绝对角度angel，单位为度,
 
     # 返回绝对位置角度
     def rotation(self):
+        if self.grNode is None: return self._state['rotation']
         return self.grNode.rotation()
 
     # 设置绝对位置
     def setRotation(self, angle):
-        # 1.设置旋转中心为操作图元的中心
-        self.grNode.setTransformOriginPoint(self.grNode.boundingRect().center().x(),
-                                            self.grNode.boundingRect().center().y())
-        # 2.每次调用，在原先的旋转角度上，加上新的旋转角度
-        self.grNode.setRotation(angle)
-        # 3.旋转之后将scene中的所有edge更新一遍
-        for edge in self.scene.edges:
-            edge.updatePositions()
+        if self.grNode is None:
+            self._setState('rotation', float(angle))
+            self._stateMoved()
+        else:
+            # 1.设置旋转中心为操作图元的中心
+            self.grNode.setTransformOriginPoint(self.grNode.boundingRect().center().x(),
+                                                self.grNode.boundingRect().center().y())
+            # 2.每次调用，在原先的旋转角度上，加上新的旋转角度
+            self.grNode.setRotation(angle)
+        # 3.只有连接在本node上的edge需要更新
+        self.markConnectedEdgesDirty()
 
     # 获取绝对缩放因子
     def scale(self):
+        if self.grNode is None: return self._state['scale']
         return self.grNode.scale()
 
     # 设置绝对缩放因子
     def setAbsoluteScale(self, factor):
-        # 1.设置旋转中心为操作图元的中心
-        self.grNode.setTransformOriginPoint(self.grNode.boundingRect().center().x(),
-                                            self.grNode.boundingRect().center().y())
-        # 2.每次调用，在原先的旋转角度上，加上新的旋转角度
-        self.grNode.setScale(factor)
-        # 3.旋转之后将scene中的所有edge更新一遍
-        for edge in self.scene.edges:
-            edge.updatePositions()
+        if self.grNode is None:
+            self._setState('scale', float(factor))
+            self._stateMoved()
+        else:
+            # 1.设置旋转中心为操作图元的中心
+            self.grNode.setTransformOriginPoint(self.grNode.boundingRect().center().x(),
+                                                self.grNode.boundingRect().center().y())
+            # 2.每次调用，在原先的旋转角度上，加上新的旋转角度
+            self.grNode.setScale(factor)
+        # 3.只有连接在本node上的edge需要更新
+        self.markConnectedEdgesDirty()
 
 
     def setRelativeScale(self, deltaScale):
@@ -166,21 +322,38 @@ class Node(Serializable):
         # 虽然每个node中的socket是固定死的，但是，主要是想记录socket的id，所以socket对象还是要序列化，
         sockets = [] # 存放sockets的序列化数据，主要是想记录socket的id
         for socket in self.sockets: sockets.append(socket.serialize())
+        pos = self.pos
         return OrderedDict([
             ('id', self.id),
             ('node_type', self._node_type),
-            ('pos_x', self.grNode.scenePos().x()),
-            ('pos_y', self.grNode.scenePos().y()),
+            ('pos_x', pos.x()),
+            ('pos_y', pos.y()),
             ('rotation', self.rotation()),  # 添加当前的角度位置
             ('scale', self.scale()),  # 当前缩放因子
-            ('value', self.grNode.value),  #
-            ('unit', self.grNode.unit),  #
-            ('maxValue', self.grNode.maxValue),  #
-            ('minValue', self.grNode.minValue),  #
-            ('text', self.grNode.text),  #
+            ('value', self.value),  #
+            ('unit', self.unit),  #
+            ('maxValue', self.maxValue),  #
+            ('minValue', self.minValue),  #
+            ('text', self.text),  #
             ('sockets', sockets),
         ])
 
+    # 按data就地更新node，只修改有变化的位置、角度、缩放和数值，不重新创建图元（撤销/重做用）
+    def reconcile(self, data):
+        moved = False
+        if self.pos.x() != data['pos_x'] or self.pos.y() != data['pos_y']:
+            self.setPos(data['pos_x'], data['pos_y'])
+            moved = True
+        # setRotation和setAbsoluteScale会自己更新edge
+        if self.rotation() != data['rotation']: self.setRotation(data['rotation'])
+        if self.scale() != data['scale']: self.setAbsoluteScale(data['scale'])
+        # 与Scene.deserializeNode的还原顺序一致
+        if self.unit != data['unit']: self.unit = data['unit']
+        self.restoreValues(data['value'], data['minValue'], data['maxValue'])
+        if self.text != data['text']: self.text = data['text']
+        self.deserialize(data, {}, restore_id=True)
+        if moved: self.markConnectedEdgesDirty()
+
     # 反序列化单个node的数据data，一个node里面含有多个socket数据
     def deserialize(self, data, hashmap={}, restore_id=True):
         try:
@@ -1,13 +1,18 @@
 import os
 import json
+import struct
+from contextlib import contextmanager
 from collections import OrderedDict
-from pyHydraulic.utils import dumpException
+from pyHydraulic.utils import dumpException, displayFrameInterval
 from pyHydraulic.node_serializable import Serializable
-from pyHydraulic.node_graphics_scene import QDMGraphicsScene
 from pyHydraulic.node_node import Node
 from pyHydraulic.node_edge import Edge
+from pyHydraulic.node_socket import Socket
 from pyHydraulic.node_scene_history import SceneHistory
 from pyHydraulic.node_scene_clipboard import SceneClipboard
+from pyHydraulic.node_scene_loader import SceneLoader
+from pyHydraulic.node_scene_virtualizer import SceneVirtualizer
+from pyHydraulic.node_scene_binary import isBinaryFilename, dumpSceneData, loadSceneData, InvalidBinaryFile
 from PyQt5.QtCore import Qt
 
 
@@ -15,10 +20,18 @@ class InvalidFile(Exception): pass
 
 
 class Scene(Serializable):
-    def __init__(self):
+    # headless为True时不创建grScene和任何图元，只有node/edge/socket的模型，
+    # 不需要QApplication，可以在脚本和服务器中加载、修改和保存文件，需要显示时再调用attachGraphics
+    def __init__(self, headless=False):
         super().__init__()
-        self.nodes = []
-        self.edges = []
+        self.headless = headless
+        # node和edge的有序集合(dict只用key)，删除为O(1)且保持添加顺序
+        self._nodes = {}
+        self._edges = {}
+        # 以Serializable.id为键的对象登记表，按id查找node/edge/socket为O(1)
+        self._nodes_by_id = {}
+        self._edges_by_id = {}
+        self._sockets_by_id = {}
 
         self.scene_width = 640000
         self.scene_height = 640000
@@ -26,10 +39,47 @@ class Scene(Serializable):
         self._has_been_modified = False
         self._has_been_modified_listeners = []
 
+        # 虚拟化时只有视图附近的node和edge有图元，见setVirtualized
+        self.virtualizer = None
+
+        # 批量构建(见batch)的嵌套层数，和推迟到批量构建结束时才处理的图元和修改通知
+        self._batch_depth = 0
+        self._batch_items = {}
+        self._batch_modified = False
+        # 位置需要更新的edge(dict只用key)，在下一帧(显示器刷新间隔)或者批量构建结束时统一更新一次
+        self._dirty_edges = {}
+        # 拖动选中的node时相连的edge，开始拖动时收集一次，拖动中和dirty的edge在同一帧一起更新，不拖动时为None
+        self._drag_edges = None
+        self._drag_moved = False
+        # 选中的node和edge(dict只用key)，grScene的选区变化时只做标记，用到时才重新收集一次
+        self._selected_nodes = {}
+        self._selected_edges = {}
+        self._selection_dirty = False
+
         self.initUI()
         self.history = SceneHistory(self)
         self.clipboard = SceneClipboard(self)
 
+    # 只读的视图，不复制；增删node和edge要通过addNode/removeNode等，视图上没有append/remove，误用时直接报错。
+    # 遍历时要删除对象的话先用list()复制
+    @property
+    def nodes(self):
+        return self._nodes.keys()
+
+    @property
+    def edges(self):
+        return self._edges.keys()
+
+    @property
+    def selected_nodes(self):
+        self.updateSelection()
+        return list(self._selected_nodes)
+
+    @property
+    def selected_edges(self):
+        self.updateSelection()
+        return list(self._selected_edges)
+
     @property
     def has_been_modified(self):
         return self._has_been_modified
@@ -38,6 +88,10 @@ class Scene(Serializable):
     def has_been_modified(self, value):
         if not self._has_been_modified and value:
             self._has_been_modified = value
+            # 批量构建时推迟到结束时再通知
+            if self._batch_depth > 0:
+                self._batch_modified = True
+                return
 
             # call all registered listeners
             for callback in self._has_been_modified_listeners:
@@ -49,55 +103,276 @@ class Scene(Serializable):
     def addHasBeenModifiedListener(self, callback):
         self._has_been_modified_listeners.append(callback)
 
+    # 批量构建：在with块中创建和修改node、edge时，edge的几何更新、图元加入grScene、修改通知和历史记录
+    # 都推迟到块结束时一次完成。可以嵌套，最外层结束时才处理
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0: self.flushBatch()
+
+    def inBatch(self):
+        return self._batch_depth > 0
+
+    def flushBatch(self):
+        # 1.先更新edge的几何，图元加入grScene的时候就是最终的位置
+        self.updateDirtyEdges()
+
+        # 2.加入图元，grScene的BSP索引在第一次查询时才一起建立
+        # (不要临时切换成NoIndex再切回来，切换后重建的索引查询时仍然会逐个检查所有图元)
+        items, self._batch_items = self._batch_items, {}
+        for item in items: self.grScene.addItem(item)
+
+        # 3.历史记录和修改通知
+        self.history.flushDeferred()
+        if self._batch_modified:
+            self._batch_modified = False
+            if self._has_been_modified:
+                for callback in self._has_been_modified_listeners: callback()
+
+    # 把图元加入grScene，批量构建时推迟到结束时一起加入
+    def addGraphicsItem(self, item):
+        if self._batch_depth > 0: self._batch_items[item] = None
+        else: self.grScene.addItem(item)
+
+    def removeGraphicsItem(self, item):
+        if item in self._batch_items: del self._batch_items[item]
+        else: self.grScene.removeItem(item)
+
+    # 标记edge的位置需要更新，两端的node都变化了也只更新一次
+    def markEdgeDirty(self, edge):
+        if self.grScene is None: return
+        self._dirty_edges[edge] = None
+        if self._batch_depth == 0 and not self._dirty_edges_timer.isActive():
+            self._dirty_edges_timer.start()
+
+    def updateDirtyEdges(self):
+        if self.grScene is None: return
+        self._dirty_edges_timer.stop()
+        edges, self._dirty_edges = self._dirty_edges, {}
+        # 拖动中移动过，拖动的edge也在这一帧一起更新
+        if self._drag_moved:
+            self._drag_moved = False
+            edges.update(self._drag_edges)
+        for edge in edges:
+            if self.hasObject(edge): edge.updatePositions()
+
+    # grScene的selectionChanged，框选时每次鼠标移动都会发射，删除多个选中的图元时每个都发射一次
+    def onSelectionChanged(self):
+        self._selection_dirty = True
+
+    def updateSelection(self):
+        if not self._selection_dirty: return
+        self._selection_dirty = False
+        self._selected_nodes, self._selected_edges = {}, {}
+        for item in self.grScene.selectedItems():
+            if hasattr(item, 'node'): self._selected_nodes[item.node] = None
+            elif hasattr(item, 'edge'): self._selected_edges[item.edge] = None
+
+    # 开始拖动选中的node，收集它们相连的edge
+    def beginDrag(self):
+        self._drag_edges = {}
+        for node in self.selected_nodes:
+            for socket in node.sockets:
+                for edge in socket.edges: self._drag_edges[edge] = None
+        self._drag_moved = False
+
+    # 拖动中鼠标移动了，拖动的edge每帧最多更新一次，鼠标事件再多也一样
+    def dragMoved(self):
+        if self._drag_edges is None: self.beginDrag()
+        self._drag_moved = True
+        if self._batch_depth == 0 and not self._dirty_edges_timer.isActive():
+            self._dirty_edges_timer.start()
+
+    # 结束拖动，edge马上更新到最后的位置
+    def endDrag(self):
+        if self._drag_edges is None: return
+        if self._drag_moved: self.updateDirtyEdges()
+        self._drag_edges = None
+
+    def hasGraphics(self):
+        return self.grScene is not None
+
     def initUI(self):
+        self.grScene = None
+        self._dirty_edges_timer = None
+        if self.headless: return
+
+        from PyQt5.QtCore import QTimer
+        from pyHydraulic.node_graphics_scene import QDMGraphicsScene
         self.grScene = QDMGraphicsScene(self)
         self.grScene.setGrScene(self.scene_width, self.scene_height)
+        self.grScene.selectionChanged.connect(self.onSelectionChanged)
+
+        self._dirty_edges_timer = QTimer()
+        self._dirty_edges_timer.setSingleShot(True)
+        # 一帧中不管有多少次事件循环，edge只更新一次
+        self._dirty_edges_timer.setInterval(displayFrameInterval())
+        self._dirty_edges_timer.timeout.connect(self.updateDirtyEdges)
+
+    # 给headless的scene创建grScene，并给所有node和edge创建图元
+    def attachGraphics(self):
+        if self.hasGraphics(): return
+        self.headless = False
+        self.initUI()
+        tracking, self.history.tracking = self.history.tracking, False
+        try:
+            with self.batch():
+                for node in self._nodes: node.createGraphics()
+                for edge in self._edges: edge.createGraphics()
+        finally:
+            self.history.tracking = tracking
 
     def addNode(self, node):
-        self.nodes.append(node)
+        self._nodes[node] = None
+        self._registerID(self._nodes_by_id, node)
 
     def addEdge(self, edge):
-        self.edges.append(edge)
+        self._edges[edge] = None
+        self._registerID(self._edges_by_id, edge)
+
+    def addSocket(self, socket):
+        self._registerID(self._sockets_by_id, socket)
 
     def removeNode(self, node):
-        if node in self.nodes: self.nodes.remove(node)
+        if node in self._nodes:
+            del self._nodes[node]
+            self._unregisterID(self._nodes_by_id, node)
         else: print("!W:", "Scene::removeNode", "wanna remove node", node, "from self.nodes but it's not in the list!")
 
     def removeEdge(self, edge):
-        if edge in self.edges: self.edges.remove(edge)
+        if edge in self._edges:
+            del self._edges[edge]
+            self._unregisterID(self._edges_by_id, edge)
         else: print("!W:", "Scene::removeEdge", "wanna remove edge", edge, "from self.edges but it's not in the list!")
 
+    def removeSocket(self, socket):
+        self._unregisterID(self._sockets_by_id, socket)
+
+    def getNodeByID(self, id):
+        return self._nodes_by_id.get(id)
+
+    def getEdgeByID(self, id):
+        return self._edges_by_id.get(id)
+
+    def getSocketByID(self, id):
+        return self._sockets_by_id.get(id)
+
+    # 对象的id被修改后(比如反序列化还原id)，由对象的onIdChanged调用，更新登记表
+    def reindexObject(self, obj, old_id):
+        table = self._idTable(obj)
+        if table is not None and table.get(old_id) is obj:
+            del table[old_id]
+            self._registerID(table, obj)
+
+    # 判断对象是否已经在本scene中登记(创建完成且没有被删除)
+    def hasObject(self, obj):
+        table = self._idTable(obj)
+        return table is not None and table.get(obj.id) is obj
+
+    def _idTable(self, obj):
+        if isinstance(obj, Node): return self._nodes_by_id
+        if isinstance(obj, Edge): return self._edges_by_id
+        if isinstance(obj, Socket): return self._sockets_by_id
+        return None
+
+    def _registerID(self, table, obj):
+        if obj.id in table and table[obj.id] is not obj:
+            print("!W:", "Scene::_registerID", "id", obj.id, "of", obj, "is already used by", table[obj.id])
+        table[obj.id] = obj
+
+    def _unregisterID(self, table, obj):
+        if table.get(obj.id) is obj:
+            del table[obj.id]
+
+
+    def isVirtualized(self):
+        return self.virtualizer is not None
+
+    # 打开或关闭虚拟化：打开后离视图较远的node和edge不创建图元，大的scene可以只占用有限的图元
+    def setVirtualized(self, enabled=True):
+        if enabled == self.isVirtualized(): return
+        if enabled and not self.hasGraphics():
+            print("!W:", "Scene::setVirtualized", "a headless scene has no graphics to virtualize")
+            return
+        if enabled:
+            self.virtualizer = SceneVirtualizer(self)
+            for view in self.grScene.views():
+                if hasattr(view, 'updateVirtualRegion'): view.updateVirtualRegion()
+        else:
+            virtualizer, self.virtualizer = self.virtualizer, None
+            virtualizer.close()
+
+    # 确保对象有图元(比如要选中一个没有图元的对象)
+    def ensureGraphics(self, obj):
+        if self.isVirtualized() and not self.virtualizer.hasGraphics(obj): self.virtualizer.materialize(obj)
 
     def clear(self):
-        while len(self.nodes) > 0:
-            self.nodes[0].remove()
+        # 整个scene清空不需要逐个记录到历史中
+        self.history.tracking = False
+        try:
+            for node in list(self._nodes):
+                node.remove()
+        finally:
+            self.history.tracking = True
+        self.history.clear()
 
         self.has_been_modified = False
 
 
+    # 文件扩展名为.pyhb时保存为二进制格式，否则保存为json格式
     def saveToFile(self, filename):
-        with open(filename, "w") as file:
-            file.write( json.dumps( self.serialize(), indent=4 ) )
-            print("saving to", filename, "was successfull.")
+        if isBinaryFilename(filename):
+            with open(filename, "wb") as file:
+                file.write(dumpSceneData(self.serialize()))
+        else:
+            with open(filename, "w") as file:
+                file.write( json.dumps( self.serialize(), indent=4 ) )
+        print("saving to", filename, "was successfull.")
 
-            self.has_been_modified = False
+        self.has_been_modified = False
 
     def loadFromFile(self, filename):
+        data = self.readDataFromFile(filename)
+        try:
+            self.deserialize(data)
+            self.history.clear()
+            self.has_been_modified = False
+        except Exception as e:
+            dumpException(e)
+
+    # 后台线程解析文件，在GUI线程中分批创建node和edge，返回SceneLoader，通过它的信号获得进度和结果
+    def loadFromFileProgressive(self, filename, center=None):
+        loader = SceneLoader(self, filename, center)
+        loader.start()
+        return loader
+
+    # 只读取和解析文件，不修改scene，可以在后台线程中调用
+    @staticmethod
+    def readDataFromFile(filename):
+        if isBinaryFilename(filename):
+            with open(filename, "rb") as file:
+                raw_data = file.read()
+            try:
+                return loadSceneData(raw_data)
+            except (InvalidBinaryFile, struct.error, ValueError) as e:
+                raise InvalidFile("%s is not a valid binary graph file (%s)" % (os.path.basename(filename), e))
+
         with open(filename, "r", encoding='utf-8', errors='ignore') as file:
             raw_data = file.read()
-            try:
-                data = json.loads(raw_data, encoding='utf-8')
-                self.deserialize(data)
-                self.has_been_modified = False
-            except json.JSONDecodeError:
-                raise InvalidFile("%s is not a valid JSON file" % os.path.basename(filename))
-            except Exception as e:
-                dumpException(e)
+        try:
+            return json.loads(raw_data)
+        except json.JSONDecodeError:
+            raise InvalidFile("%s is not a valid JSON file" % os.path.basename(filename))
 
     def setBackgroundColor(self, color=Qt.lightGray, grid_on = True):
         self.grScene._color_background = color
-        self.grScene.setBackgroundBrush(color)
         self.grScene._grid_enble = grid_on
+        # 设置背景刷会清掉视图缓存的背景，网格开关要在这之前设置
+        self.grScene.setBackgroundBrush(color)
 
     def serialize(self):
         nodes, edges = [], []  # 存放序列化后的字符串
@@ -117,26 +392,53 @@ class Scene(Serializable):
 
         if restore_id: self.id = data['id']
 
-        # create nodes 在scene层创建node，以及还原node
-        for node_data in data['nodes']:
-            node = Node(self, node_type=node_data["node_type"])   # 1.先还原创建的node对象, 默认没有socket, socket的创建是在下一层
-            node.setPos(node_data['pos_x'], node_data['pos_y'])   # 2.再还原node的位置
-            node.setRotation(node_data["rotation"])     # 3.还原绝对位置角度（顺时针）
-            node.setAbsoluteScale(node_data["scale"])
-            node.grNode.unit = node_data["unit"]
-            node.grNode.value = node_data["value"]
-            node.grNode.maxValue = node_data["maxValue"]
-            node.grNode.minValue = node_data["minValue"]
-            node.grNode.text = node_data["text"]
-            if restore_id: node.id = node_data['id']    # 4.再还原node的id
-
-            hashmap[node_data['id']] = node  # 4.在对象字典添加单个node的对象和id
-
-            node.deserialize(node_data, hashmap, restore_id)  # 4.把单个node的数据传递到下一级，解析socket数据
-            # Node(self).deserialize(node_data, hashmap, restore_id)
-
-        # create edges
-        for edge_data in data['edges']:
-            Edge(self).deserialize(edge_data, hashmap, restore_id)
-
-        return True
\ No newline at end of file
+        with self.batch():
+            # create nodes 在scene层创建node，以及还原node
+            for node_data in data['nodes']:
+                self.deserializeNode(node_data, hashmap, restore_id)
+
+            # create edges
+            for edge_data in data['edges']:
+                self.deserializeEdge(edge_data, hashmap, restore_id)
+
+        return True
+
+    # 根据单个node的数据还原出node对象
+    def deserializeNode(self, node_data, hashmap={}, restore_id=True):
+        node = Node(self, node_type=node_data["node_type"])   # 1.先还原创建的node对象, 默认没有socket, socket的创建是在下一层
+        node.setPos(node_data['pos_x'], node_data['pos_y'])   # 2.再还原node的位置
+        node.setRotation(node_data["rotation"])     # 3.还原绝对位置角度（顺时针）
+        node.setAbsoluteScale(node_data["scale"])
+        node.unit = node_data["unit"]
+        node.restoreValues(node_data["value"], node_data["minValue"], node_data["maxValue"])
+        node.text = node_data["text"]
+        if restore_id: node.id = node_data['id']    # 4.再还原node的id
+
+        hashmap[node_data['id']] = node  # 4.在对象字典添加单个node的对象和id
+
+        node.deserialize(node_data, hashmap, restore_id)  # 4.把单个node的数据传递到下一级，解析socket数据
+        return node
+
+    # 根据单个node的数据就地更新同id的node，类型不同或者不存在时才重新创建
+    def reconcileNode(self, node_data):
+        node = self.getNodeByID(node_data['id'])
+        if node is not None and node._node_type != node_data['node_type']:
+            node.remove()
+            node = None
+        if node is None: return self.deserializeNode(node_data)
+        node.reconcile(node_data)
+        return node
+
+    # 根据单个edge的数据就地更新同id的edge，不存在时才重新创建
+    def reconcileEdge(self, edge_data):
+        edge = self.getEdgeByID(edge_data['id'])
+        if edge is None: return self.deserializeEdge(edge_data)
+        edge.reconcile(edge_data, self._sockets_by_id)
+        return edge
+
+    # 根据单个edge的数据还原出edge对象，hashmap为None时直接从登记表中查找socket
+    def deserializeEdge(self, edge_data, hashmap=None, restore_id=True):
+        if hashmap is None: hashmap = self._sockets_by_id
+        edge = Edge(self)
+        edge.deserialize(edge_data, hashmap, restore_id)
+        return edge
@@ -0,0 +1,181 @@
+"""
+    二进制的scene文件格式，和json格式(Scene.serialize()的数据)可以无损互相转换。
+    node、socket、edge的每个属性按列存成一个数组，字符串(类型名、单位、文本)放在一张字符串表中，
+    列里只存表的序号，最后整体用zlib压缩。
+
+    文件结构: MAGIC | 版本(u16) | zlib压缩的数据体
+    数据体:  scene头(id, 宽, 高) | 字符串表 | 各列数组(类型码, 个数, 小端字节)
+"""
+import sys
+import zlib
+import struct
+from array import array
+from collections import OrderedDict
+
+
+BINARY_FILE_EXTENSION = ".pyhb"
+BINARY_MAGIC = b"PYHB"
+BINARY_VERSION = 1
+
+# node中按浮点数存放的属性，原来是整数的在flags列中对应位置1，读取时还原成整数
+NODE_NUMBER_KEYS = ['pos_x', 'pos_y', 'rotation', 'scale', 'value', 'maxValue', 'minValue']
+
+
+class InvalidBinaryFile(Exception): pass
+
+
+def isBinaryFilename(filename):
+    return str(filename).lower().endswith(BINARY_FILE_EXTENSION)
+
+
+class _StringTable():
+    def __init__(self):
+        self.strings = []
+        self._index = {}
+
+    def add(self, string):
+        index = self._index.get(string)
+        if index is None:
+            index = self._index[string] = len(self.strings)
+            self.strings.append(string)
+        return index
+
+
+def _writeArray(out, values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    out.append(struct.pack('<cI', values.typecode.encode('ascii'), len(values)))
+    out.append(values.tobytes())
+
+
+def _readArray(body, offset):
+    typecode, count = struct.unpack_from('<cI', body, offset)
+    offset += struct.calcsize('<cI')
+    values = array(typecode.decode('ascii'))
+    size = values.itemsize * count
+    values.frombytes(body[offset:offset + size])
+    if sys.byteorder != 'little': values.byteswap()
+    return values, offset + size
+
+
+# 把Scene.serialize()的数据打包成二进制
+def dumpSceneData(data):
+    strings = _StringTable()
+    nodes, edges = data['nodes'], data['edges']
+
+    columns = OrderedDict()
+    columns['node_id'] = array('q', [node['id'] for node in nodes])
+    columns['node_type'] = array('I', [strings.add(node['node_type']) for node in nodes])
+    flags = array('B', [0] * len(nodes))
+    for bit, key in enumerate(NODE_NUMBER_KEYS):
+        column = array('d')
+        for index, node in enumerate(nodes):
+            number = node[key]
+            if isinstance(number, int): flags[index] |= 1 << bit
+            column.append(number)
+        columns[key] = column
+    columns['number_flags'] = flags
+    columns['unit'] = array('I', [strings.add(node['unit']) for node in nodes])
+    columns['text'] = array('I', [strings.add(node['text']) for node in nodes])
+    columns['socket_count'] = array('I', [len(node['sockets']) for node in nodes])
+
+    sockets = [socket for node in nodes for socket in node['sockets']]
+    columns['socket_id'] = array('q', [socket['id'] for socket in sockets])
+    columns['socket_index'] = array('i', [socket['index'] for socket in sockets])
+    columns['socket_multi_edges'] = array('B', [1 if socket['multi_edges'] else 0 for socket in sockets])
+    columns['socket_type'] = array('i', [socket['socket_type'] for socket in sockets])
+
+    columns['edge_id'] = array('q', [edge['id'] for edge in edges])
+    columns['edge_type'] = array('i', [edge['edge_type'] for edge in edges])
+    columns['edge_start'] = array('q', [edge['start'] for edge in edges])
+    columns['edge_end'] = array('q', [edge['end'] for edge in edges])
+
+    body = [struct.pack('<qqqI', data['id'], data['scene_width'], data['scene_height'], len(strings.strings))]
+    for string in strings.strings:
+        encoded = string.encode('utf-8')
+        body.append(struct.pack('<I', len(encoded)))
+        body.append(encoded)
+    for column in columns.values():
+        _writeArray(body, column)
+
+    return BINARY_MAGIC + struct.pack('<H', BINARY_VERSION) + zlib.compress(b"".join(body))
+
+
+# 把二进制数据还原成和Scene.serialize()相同结构的数据
+def loadSceneData(raw_data):
+    if raw_data[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise InvalidBinaryFile("wrong file header")
+    version, = struct.unpack_from('<H', raw_data, len(BINARY_MAGIC))
+    if version > BINARY_VERSION:
+        raise InvalidBinaryFile("unsupported version %d" % version)
+    try:
+        body = zlib.decompress(raw_data[len(BINARY_MAGIC) + 2:])
+    except zlib.error as e:
+        raise InvalidBinaryFile(str(e))
+
+    scene_id, scene_width, scene_height, string_count = struct.unpack_from('<qqqI', body, 0)
+    offset = struct.calcsize('<qqqI')
+    strings = []
+    for i in range(string_count):
+        length, = struct.unpack_from('<I', body, offset)
+        offset += 4
+        strings.append(body[offset:offset + length].decode('utf-8'))
+        offset += length
+
+    column_names = ['node_id', 'node_type'] + NODE_NUMBER_KEYS + [
+        'number_flags', 'unit', 'text', 'socket_count',
+        'socket_id', 'socket_index', 'socket_multi_edges', 'socket_type',
+        'edge_id', 'edge_type', 'edge_start', 'edge_end']
+    columns = {}
+    for name in column_names:
+        columns[name], offset = _readArray(body, offset)
+
+    # 每一列整体转换成python列表再组装，比逐个访问array元素快；用dict字面量，比OrderedDict快且顺序相同
+    flags = columns['number_flags'].tolist()
+    number_columns = []
+    for bit, key in enumerate(NODE_NUMBER_KEYS):
+        mask = 1 << bit
+        number_columns.append([int(number) if flag & mask else number
+                               for number, flag in zip(columns[key].tolist(), flags)])
+
+    all_sockets = [{'id': socket_id, 'index': index, 'multi_edges': bool(multi_edges), 'socket_type': socket_type}
+                   for socket_id, index, multi_edges, socket_type in zip(
+                       columns['socket_id'].tolist(), columns['socket_index'].tolist(),
+                       columns['socket_multi_edges'].tolist(), columns['socket_type'].tolist())]
+
+    nodes = []
+    socket_offset = 0
+    for node_id, type_index, pos_x, pos_y, rotation, scale, value, unit_index, max_value, min_value, \
+            text_index, socket_count in zip(
+            columns['node_id'].tolist(), columns['node_type'].tolist(), *number_columns[:5],
+            columns['unit'].tolist(), number_columns[5], number_columns[6],
+            columns['text'].tolist(), columns['socket_count'].tolist()):
+        nodes.append({
+            'id': node_id,
+            'node_type': strings[type_index],
+            'pos_x': pos_x,
+            'pos_y': pos_y,
+            'rotation': rotation,
+            'scale': scale,
+            'value': value,
+            'unit': strings[unit_index],
+            'maxValue': max_value,
+            'minValue': min_value,
+            'text': strings[text_index],
+            'sockets': all_sockets[socket_offset:socket_offset + socket_count],
+        })
+        socket_offset += socket_count
+
+    edges = [{'id': edge_id, 'edge_type': edge_type, 'start': start, 'end': end}
+             for edge_id, edge_type, start, end in zip(
+                 columns['edge_id'].tolist(), columns['edge_type'].tolist(),
+                 columns['edge_start'].tolist(), columns['edge_end'].tolist())]
+
+    return OrderedDict([
+        ('id', scene_id),
+        ('scene_width', scene_width),
+        ('scene_height', scene_height),
+        ('nodes', nodes),
+        ('edges', edges),
+    ])
@@ -1,5 +1,4 @@
 from collections import OrderedDict
-from pyHydraulic.node_graphics_edge import QDMGraphicsEdge
 from pyHydraulic.node_node import Node
 from pyHydraulic.node_edge import Edge
 
@@ -17,13 +16,11 @@ class SceneClipboard():
         sel_nodes, sel_edges, sel_sockets = [], [], {}
 
         # sort edges and nodes
-        for item in self.scene.grScene.selectedItems():
-            if hasattr(item, 'node'):
-                sel_nodes.append(item.node.serialize())  # node序列化数据放到sle_node里面
-                for socket in (item.node.sockets):
-                    sel_sockets[socket.id] = socket
-            elif isinstance(item, QDMGraphicsEdge):
-                sel_edges.append(item.edge)
+        for node in self.scene.selected_nodes:
+            sel_nodes.append(node.serialize())  # node序列化数据放到sle_node里面
+            for socket in (node.sockets):
+                sel_sockets[socket.id] = socket
+        sel_edges = self.scene.selected_edges
 
 
         # debug
@@ -92,20 +89,22 @@ class SceneClipboard():
         offset_x = mouse_scene_pos.x() - bbox_center_x
         offset_y = mouse_scene_pos.y() - bbox_center_y
 
-        # create each node
-        for node_data in data['nodes']:  # 还原各个node
-            new_node = Node(self.scene, node_data['node_type'])
-            new_node.deserialize(node_data, hashmap, restore_id=False)
-
-            # read just the new node's position
-            pos = new_node.pos
-            new_node.setPos(pos.x() + offset_x, pos.y() + offset_y)
-
-        # create each edge
-        if 'edges' in data:
-            for edge_data in data['edges']:
-                new_edge = Edge(self.scene)
-                new_edge.deserialize(edge_data, hashmap, restore_id=False)
-
-        # store history
-        self.scene.history.storeHistory("Pasted elements in scene", setModified=True)
\ No newline at end of file
+        # 粘贴的node和edge一次性加入scene，历史记录只存一步
+        with self.scene.batch():
+            # create each node
+            for node_data in data['nodes']:  # 还原各个node
+                new_node = Node(self.scene, node_data['node_type'])
+                new_node.deserialize(node_data, hashmap, restore_id=False)
+
+                # read just the new node's position
+                pos = new_node.pos
+                new_node.setPos(pos.x() + offset_x, pos.y() + offset_y)
+
+            # create each edge
+            if 'edges' in data:
+                for edge_data in data['edges']:
+                    new_edge = Edge(self.scene)
+                    new_edge.deserialize(edge_data, hashmap, restore_id=False)
+
+            # store history
+            self.scene.history.storeHistory("Pasted elements in scene", setModified=True)
\ No newline at end of file
@@ -0,0 +1,274 @@
+"""
+    不打开NodeEditorWindow，把保存的图纸渲染成PNG、SVG或PDF文件。
+    PNG按EXPORT_TILE_SIZE分块渲染，每次只需要一块的内存，多个进程时各块并行渲染；
+    整张图太大(超过EXPORT_MAX_IMAGE_PIXELS)时不拼接，每一块存成单独的文件。
+    SVG和PDF是矢量格式，整个scene渲染一次。
+"""
+import os
+import math
+import multiprocessing
+from PyQt5.QtCore import Qt, QRect, QRectF, QSize, QSizeF, QMarginsF
+from PyQt5.QtGui import QImage, QPainter, QPdfWriter, QPageSize, QPageLayout
+from pyHydraulic.utils import dumpException
+
+
+EXPORT_FORMATS = ('png', 'svg', 'pdf')
+EXPORT_SCALE = 0.25  # 输出的像素(SVG、PDF为点)/scene单位
+EXPORT_MARGIN = 100  # 图元外接矩形四周留出的scene单位
+EXPORT_TILE_SIZE = 2048  # 渲染一块的最大像素尺寸
+EXPORT_MAX_IMAGE_PIXELS = 16384 * 16384  # 超过这个像素数的PNG不拼接，分块存成单独的文件
+EXPORT_TILE_BLEED = 2  # 每一块四周多渲染的像素
+EXPORT_RENDER_HINTS = QPainter.Antialiasing | QPainter.TextAntialiasing | QPainter.SmoothPixmapTransform
+
+DEBUG = False
+
+
+class ExportError(Exception): pass
+
+
+# 导出的参数，多进程时传给子进程
+class ExportOptions():
+    def __init__(self, scale=EXPORT_SCALE, margin=EXPORT_MARGIN, tile_size=EXPORT_TILE_SIZE, grid=True,
+                 max_image_pixels=EXPORT_MAX_IMAGE_PIXELS):
+        self.scale = scale
+        self.margin = margin
+        self.tile_size = tile_size
+        self.grid = grid
+        self.max_image_pixels = max_image_pixels
+
+
+def exportFormat(filename):
+    fmt = os.path.splitext(filename)[1][1:].lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError("%s: unsupported export format, use one of %s" % (filename, ", ".join(EXPORT_FORMATS)))
+    return fmt
+
+
+# 读取图纸文件，创建带图元的scene(不需要视图)
+def loadScene(filename, options):
+    from pyHydraulic.node_scene import Scene
+    scene = Scene()
+    scene.deserialize(Scene.readDataFromFile(filename))
+    scene.history.clear()
+    scene.updateDirtyEdges()
+    # 符号贴图是给屏幕显示用的，导出时按矢量画
+    scene.grScene.symbolCacheEnabled = False
+    if not options.grid: scene.setBackgroundColor(scene.grScene._color_background, False)
+    return scene
+
+
+# 要导出的scene区域：所有图元的外接矩形加上边距
+def exportRect(scene, options):
+    rect = scene.grScene.itemsBoundingRect()
+    margin = options.margin
+    return rect.marginsAdded(QMarginsF(margin, margin, margin, margin))
+
+
+def imageSize(rect, options):
+    return QSize(max(1, int(math.ceil(rect.width() * options.scale))), max(1, int(math.ceil(rect.height() * options.scale))))
+
+
+# 按行排列的分块(像素坐标)
+def tileRects(size, tile_size):
+    tiles = []
+    for y in range(0, size.height(), tile_size):
+        for x in range(0, size.width(), tile_size):
+            tiles.append(QRect(x, y, min(tile_size, size.width() - x), min(tile_size, size.height() - y)))
+    return tiles
+
+
+# 渲染一块：每一块的缩放比例相同，只是平移不同，拼起来和整张渲染一致。
+# 四周多画EXPORT_TILE_BLEED个像素再裁掉，块的边上抗锯齿的像素才和整张渲染相同
+def renderTile(scene, rect, tile, options):
+    padded = tile.adjusted(-EXPORT_TILE_BLEED, -EXPORT_TILE_BLEED, EXPORT_TILE_BLEED, EXPORT_TILE_BLEED)
+    image = QImage(padded.size(), QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    scale = options.scale
+    source = QRectF(rect.left() + padded.x() / scale, rect.top() + padded.y() / scale,
+                    padded.width() / scale, padded.height() / scale)
+    painter = QPainter(image)
+    painter.setRenderHints(EXPORT_RENDER_HINTS)
+    scene.grScene.render(painter, QRectF(0, 0, padded.width(), padded.height()), source, Qt.IgnoreAspectRatio)
+    painter.end()
+    return image.copy(EXPORT_TILE_BLEED, EXPORT_TILE_BLEED, tile.width(), tile.height())
+
+
+# 整张图太大时每一块存成单独的文件: name_行_列.png
+def tileFilename(target, tile, options):
+    stem, ext = os.path.splitext(target)
+    return "%s_%d_%d%s" % (stem, tile.y() // options.tile_size, tile.x() // options.tile_size, ext)
+
+
+def isTiledOutput(size, options):
+    return size.width() * size.height() > options.max_image_pixels
+
+
+def saveImage(image, filename):
+    if not image.save(filename, "PNG"):
+        raise ExportError("%s: cannot write image" % filename)
+
+
+def exportVector(scene, rect, target, fmt, options):
+    size = QSizeF(rect.width() * options.scale, rect.height() * options.scale)
+    if fmt == 'svg':
+        from PyQt5.QtSvg import QSvgGenerator
+        device = QSvgGenerator()
+        device.setFileName(target)
+        device.setSize(size.toSize())
+        device.setViewBox(QRectF(0, 0, size.width(), size.height()))
+        device.setTitle(os.path.basename(target))
+        target_rect = QRectF(0, 0, size.width(), size.height())
+    else:
+        # 72dpi时1个设备单位就是1点
+        device = QPdfWriter(target)
+        device.setResolution(72)
+        device.setPageLayout(QPageLayout(QPageSize(size, QPageSize.Point), QPageLayout.Portrait, QMarginsF()))
+        target_rect = QRectF(0, 0, size.width(), size.height())
+    painter = QPainter()
+    if not painter.begin(device):
+        raise ExportError("%s: cannot write file" % target)
+    painter.setRenderHints(EXPORT_RENDER_HINTS)
+    scene.grScene.render(painter, target_rect, rect, Qt.IgnoreAspectRatio)
+    painter.end()
+
+
+# 把一个scene导出到target，返回写出的文件
+def exportScene(scene, target, options=None):
+    options = options or ExportOptions()
+    fmt = exportFormat(target)
+    rect = exportRect(scene, options)
+    if fmt != 'png':
+        exportVector(scene, rect, target, fmt, options)
+        return [target]
+
+    size = imageSize(rect, options)
+    tiles = tileRects(size, options.tile_size)
+    if isTiledOutput(size, options):
+        written = []
+        for tile in tiles:
+            filename = tileFilename(target, tile, options)
+            saveImage(renderTile(scene, rect, tile, options), filename)
+            written.append(filename)
+        return written
+
+    image = QImage(size, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    painter.setCompositionMode(QPainter.CompositionMode_Source)
+    for tile in tiles:
+        painter.drawImage(tile.topLeft(), renderTile(scene, rect, tile, options))
+    painter.end()
+    saveImage(image, target)
+    return [target]
+
+
+def exportFile(source, target, options=None):
+    options = options or ExportOptions()
+    return exportScene(loadScene(source, options), target, options)
+
+
+# 子进程：每个进程一个QApplication，最近读取的scene留着给同一个文件的其他块用
+_worker_app = None
+_worker_scene = (None, None)
+
+
+def _initWorker():
+    global _worker_app
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    from PyQt5.QtWidgets import QApplication
+    _worker_app = QApplication.instance() or QApplication([])
+
+
+def _workerScene(source, options):
+    global _worker_scene
+    if _worker_scene[0] != source:
+        _worker_scene = (None, None)  # 先释放上一个scene
+        _worker_scene = (source, loadScene(source, options))
+    return _worker_scene[1]
+
+
+# 子进程中导出一个文件。只有一块的PNG和矢量格式直接写出；多块的PNG返回分块，由主进程分给各个进程
+def _exportJob(job):
+    source, target, options = job
+    try:
+        scene = _workerScene(source, options)
+        rect = exportRect(scene, options)
+        if exportFormat(target) == 'png':
+            tiles = tileRects(imageSize(rect, options), options.tile_size)
+            if len(tiles) > 1:
+                return source, target, None, (rect, tiles)
+        return source, target, exportScene(scene, target, options), None
+    except Exception as e:
+        if DEBUG: dumpException(e)
+        return source, target, e, None
+
+
+# 子进程中渲染一块，整张图要拼接时返回像素数据，否则直接写出文件
+def _tileJob(job):
+    source, target, rect, tile, tiled_output, options = job
+    image = renderTile(_workerScene(source, options), rect, tile, options)
+    if tiled_output:
+        filename = tileFilename(target, tile, options)
+        saveImage(image, filename)
+        return tile, filename
+    return tile, image.constBits().asstring(image.sizeInBytes())
+
+
+def _collectTiles(pool, source, target, rect, tiles, options):
+    size = imageSize(rect, options)
+    tiled_output = isTiledOutput(size, options)
+    jobs = [(source, target, rect, tile, tiled_output, options) for tile in tiles]
+    if tiled_output:
+        return [filename for tile, filename in pool.imap(_tileJob, jobs)]
+
+    image = QImage(size, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    painter.setCompositionMode(QPainter.CompositionMode_Source)
+    for tile, data in pool.imap(_tileJob, jobs):
+        tile_image = QImage(data, tile.width(), tile.height(), tile.width() * 4, QImage.Format_ARGB32_Premultiplied)
+        painter.drawImage(tile.topLeft(), tile_image)
+    painter.end()
+    saveImage(image, target)
+    return [target]
+
+
+def exportTarget(source, out_dir, fmt):
+    name = os.path.splitext(os.path.basename(source))[0] + "." + fmt
+    return os.path.join(out_dir if out_dir is not None else os.path.dirname(source), name)
+
+
+# 批量导出，返回{源文件: 写出的文件列表或者异常}。processes大于1时用多个进程，
+# 各文件分给各个进程，大图的各块也分给各个进程渲染
+def exportFiles(sources, out_dir=None, fmt='png', options=None, processes=1, progress=None):
+    options = options or ExportOptions()
+    jobs = [(source, exportTarget(source, out_dir, fmt), options) for source in sources]
+    results = {}
+
+    def finished(source, result):
+        results[source] = result
+        if progress is not None: progress(source, result)
+
+    if processes <= 1:
+        for source, target, _ in jobs:
+            try:
+                finished(source, exportFile(source, target, options))
+            except Exception as e:
+                if DEBUG: dumpException(e)
+                finished(source, e)
+        return results
+
+    # Qt不能在fork出来的进程中继续使用，子进程都用spawn新建
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes, initializer=_initWorker) as pool:
+        tiled = []
+        for source, target, result, plan in pool.imap_unordered(_exportJob, jobs):
+            if plan is None:
+                finished(source, result)
+            else:
+                tiled.append((source, target, plan))
+        for source, target, (rect, tiles) in tiled:
+            try:
+                finished(source, _collectTiles(pool, source, target, rect, tiles, options))
+            except Exception as e:
+                if DEBUG: dumpException(e)
+                finished(source, e)
+    return results
@@ -1,4 +1,4 @@
-from pyHydraulic.node_graphics_edge import QDMGraphicsEdge
+from pyHydraulic.node_node import Node
 
 
 DEBUG = False
@@ -12,16 +12,33 @@ class SceneHistory():
         self.history_current_step = -1
         self.history_limit = 32
 
+        # 自上一次storeHistory以来被修改过的对象: 对象 -> 修改之前的序列化数据(新建的对象为None)
+        # 每一步历史只记录这些对象修改前后的数据，而不是整个scene的快照
+        self._pending = {}
+        # 为False时不记录对象的修改，比如清空scene或者正在撤销/重做的时候
+        self.tracking = True
+        # 批量构建(Scene.batch)中请求的历史记录，结束时合并成一步: (desc, setModified)
+        self._deferred = None
+
+    def clear(self):
+        self.history_stack = []
+        self.history_current_step = -1
+        self._pending = {}
+
     def undo(self):
         if DEBUG: print("UNDO")
 
         if self.history_current_step > 0:
+            # 先丢弃还没有存入历史的修改，和还原整个快照的效果一致
+            self.discardPendingChanges()
+            self.restoreHistoryStamp(self.history_stack[self.history_current_step], undo=True)
             self.history_current_step -= 1
-            self.restoreHistory()
+            self.restoreSelection(self.history_stack[self.history_current_step]['selection'])
 
     def redo(self):
         if DEBUG: print("REDO")
         if self.history_current_step + 1 < len(self.history_stack):
+            self.discardPendingChanges()
             self.history_current_step += 1
             self.restoreHistory()
 
@@ -30,10 +47,17 @@ class SceneHistory():
         if DEBUG: print("Restoring history",
                         ".... current_step: @%d" % self.history_current_step,
                         "(%d)" % len(self.history_stack))
-        self.restoreHistoryStamp(self.history_stack[self.history_current_step])
+        history_stamp = self.history_stack[self.history_current_step]
+        self.restoreHistoryStamp(history_stamp)
+        self.restoreSelection(history_stamp['selection'])
 
 
     def storeHistory(self, desc, setModified=False):
+        if self.scene.inBatch():
+            if self._deferred is not None: setModified = setModified or self._deferred[1]
+            self._deferred = (desc, setModified)
+            return
+
         if setModified:
             self.scene.has_been_modified = True
 
@@ -41,6 +65,27 @@ class SceneHistory():
                         ".... current_step: @%d" % self.history_current_step,
                         "(%d)" % len(self.history_stack))
 
+        self.pushHistoryStamp(self.createHistoryStamp(desc))
+
+    # 只记录选区变化的一步历史，不收集修改过的对象。有还没存入历史的修改时按普通的一步记录，
+    # 这些修改才不会被算到后面的一步中
+    def storeSelection(self, desc):
+        if self.scene.inBatch() or len(self._pending) > 0 or len(self.history_stack) == 0:
+            self.storeHistory(desc)
+            return
+
+        if DEBUG: print("Storing selection", '"%s"' % desc,
+                        ".... current_step: @%d" % self.history_current_step,
+                        "(%d)" % len(self.history_stack))
+
+        self.pushHistoryStamp({
+            'desc': desc,
+            'nodes': [],
+            'edges': [],
+            'selection': self.createSelectionStamp(),
+        })
+
+    def pushHistoryStamp(self, hs):
         # if the pointer (history_current_step) is not at the end of history_stack
         if self.history_current_step+1 < len(self.history_stack):
             self.history_stack = self.history_stack[0:self.history_current_step+1]
@@ -50,47 +95,130 @@ class SceneHistory():
             self.history_stack = self.history_stack[1:]
             self.history_current_step -= 1
 
-        hs = self.createHistoryStamp(desc)
-
         self.history_stack.append(hs)
         self.history_current_step += 1
         if DEBUG: print("  -- setting step to:", self.history_current_step)
 
 
-    def createHistoryStamp(self, desc):
-        sel_obj = {
-            'nodes': [],
-            'edges': [],
+    # 批量构建结束时，把其中请求的历史记录存为一步
+    def flushDeferred(self):
+        if self._deferred is None: return
+        desc, setModified = self._deferred
+        self._deferred = None
+        self.storeHistory(desc, setModified)
+
+    # 对象将要被修改或删除时调用，记录它修改之前的数据，两次storeHistory之间只记录第一次
+    def objectChanging(self, obj):
+        if not self.tracking or obj in self._pending: return
+        # 还没有创建完成的对象不用记录，它会通过objectAdded记录
+        if not self.scene.hasObject(obj): return
+        self._pending[obj] = self.serializeObject(obj)
+
+    # 新创建的对象，修改之前的数据为None
+    def objectAdded(self, obj):
+        if not self.tracking or obj in self._pending: return
+        self._pending[obj] = None
+
+    # 返回对象当前的序列化数据，已经被删除或者还没有连好的edge返回None
+    def serializeObject(self, obj):
+        if not self.scene.hasObject(obj): return None
+        if hasattr(obj, 'start_socket') and (obj.start_socket is None or obj.end_socket is None): return None
+        return obj.serialize()
+
+
+    # 只收集修改过的node和edge，每一项为(修改前, 修改后)的数据，新建的修改前为None，删除的修改后为None
+    def collectPendingChanges(self):
+        nodes, edges = [], []
+        for obj, before in self._pending.items():
+            after = self.serializeObject(obj)
+            if before == after: continue
+            if isinstance(obj, Node): nodes.append((before, after))
+            else: edges.append((before, after))
+        self._pending = {}
+        return nodes, edges
+
+
+    # 选中的控件的id，headless的scene没有选区
+    def createSelectionStamp(self):
+        return {
+            'nodes': [node.id for node in self.scene.selected_nodes],
+            'edges': [edge.id for edge in self.scene.selected_edges],
         }
+
+    def createHistoryStamp(self, desc):
         # 把选中的控件状态id也存储一下
-        for item in self.scene.grScene.selectedItems():
-            if hasattr(item, 'node'):
-                sel_obj['nodes'].append(item.node.id)
-            elif isinstance(item, QDMGraphicsEdge):
-                sel_obj['edges'].append(item.edge.id)
-        # 把整个界面存状态存在在stamp里面，包括选中的控件状态
+        sel_obj = self.createSelectionStamp()
+
+        # 第一步历史是撤销的终点，永远不会被撤销，不需要记录修改的内容
+        if len(self.history_stack) > 0:
+            nodes, edges = self.collectPendingChanges()
+        else:
+            nodes, edges = [], []
+            self._pending = {}
+
         history_stamp = {
             'desc': desc,
-            'snapshot': self.scene.serialize(),
+            'nodes': nodes,
+            'edges': edges,
             'selection': sel_obj,
         }
 
         return history_stamp
 
-    def restoreHistoryStamp(self, history_stamp):
-        if DEBUG: print("RHS: ", history_stamp['desc'])
-
-        self.scene.deserialize(history_stamp['snapshot'])
-
-        # restore selection
-        for edge_id in history_stamp['selection']['edges']:
-            for edge in self.scene.edges:
-                if edge.id == edge_id:
-                    edge.grEdge.setSelected(True)
-                    break
-
-        for node_id in history_stamp['selection']['nodes']:
-            for node in self.scene.nodes:
-                if node.id == node_id:
-                    node.grNode.setSelected(True)
-                    break
\ No newline at end of file
+    # 把history_stamp中的修改应用到scene中，undo为True时还原到修改前的数据
+    def restoreHistoryStamp(self, history_stamp, undo=False):
+        if DEBUG: print("RHS: ", history_stamp['desc'], "(undo)" if undo else "")
+
+        target = 0 if undo else 1
+        self.tracking = False
+        try:
+            # 图元的加入和edge的位置更新在批量构建结束时一次完成
+            with self.scene.batch():
+                # 1.先删除目标状态中不存在的edge和node
+                for change in history_stamp['edges']:
+                    if change[target] is None:
+                        edge = self.scene.getEdgeByID(change[1 - target]['id'])
+                        if edge is not None: edge.remove()
+
+                for change in history_stamp['nodes']:
+                    if change[target] is None:
+                        node = self.scene.getNodeByID(change[1 - target]['id'])
+                        if node is not None: node.remove()
+
+                # 2.已有的node和edge就地更新，没有的才创建，node要在edge之前，edge才能找到socket
+                for change in history_stamp['nodes']:
+                    if change[target] is not None:
+                        self.scene.reconcileNode(change[target])
+
+                for change in history_stamp['edges']:
+                    if change[target] is not None:
+                        self.scene.reconcileEdge(change[target])
+        finally:
+            self.tracking = True
+
+    # 丢弃还没有存入历史的修改，把这些对象还原到修改之前的数据
+    def discardPendingChanges(self):
+        if len(self._pending) == 0: return
+        nodes, edges = self.collectPendingChanges()
+        self.restoreHistoryStamp({'desc': "Discard pending changes", 'nodes': nodes, 'edges': edges}, undo=True)
+
+    # 只修改选中状态有变化的图元，不重新设置整个选区
+    def restoreSelection(self, selection):
+        if not self.scene.hasGraphics(): return
+        selected = {}
+        for node in self.scene.selected_nodes: selected[('node', node.id)] = node.grNode
+        for edge in self.scene.selected_edges: selected[('edge', edge.id)] = edge.grEdge
+
+        target = set([('node', node_id) for node_id in selection['nodes']] +
+                     [('edge', edge_id) for edge_id in selection['edges']])
+
+        for key, item in selected.items():
+            if key not in target: item.setSelected(False)
+
+        for kind, obj_id in target:
+            if (kind, obj_id) in selected: continue
+            obj = self.scene.getNodeByID(obj_id) if kind == 'node' else self.scene.getEdgeByID(obj_id)
+            if obj is None: continue
+            self.scene.ensureGraphics(obj)
+            if kind == 'node': obj.grNode.setSelected(True)
+            else: obj.grEdge.setSelected(True)
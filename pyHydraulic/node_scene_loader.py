@@ -0,0 +1,151 @@
+import math
+import time
+from PyQt5.QtCore import *
+
+
+DEBUG = False
+
+# GUI线程中每一批创建对象的时间片，单位秒
+LOADER_TIME_SLICE = 0.010
+
+
+# 在后台线程中读取并解析文件
+class SceneFileReader(QThread):
+    parsed = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    # 正在运行的线程，保证加载被取消后线程对象在运行结束前不会被回收
+    _running_readers = set()
+
+    def __init__(self, scene, filename, parent=None):
+        super().__init__(parent)
+        self.scene = scene
+        self.filename = filename
+        self.finished.connect(self.onFinished)
+
+    def start(self):
+        SceneFileReader._running_readers.add(self)
+        super().start()
+
+    def onFinished(self):
+        SceneFileReader._running_readers.discard(self)
+
+    def run(self):
+        try:
+            data = self.scene.readDataFromFile(self.filename)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.parsed.emit(data)
+
+
+# 渐进式加载：文件在后台线程解析，node和edge在GUI线程中按时间片分批创建，离视图中心近的先创建
+class SceneLoader(QObject):
+    progress = pyqtSignal(int, int)  # 已创建的对象个数, 对象总数
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+    canceled = pyqtSignal()
+
+    def __init__(self, scene, filename, center=None, parent=None):
+        super().__init__(parent)
+        self.scene = scene
+        self.filename = filename
+        # 优先加载的位置，默认为第一个视图的中心
+        self.center = center
+
+        self._queue = []
+        self._hashmap = {}
+        self._done = 0
+        self._running = False
+
+        self._reader = SceneFileReader(scene, filename)
+        self._reader.parsed.connect(self.onParsed)
+        self._reader.failed.connect(self.onFailed)
+
+        self._timer = QTimer()
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.loadBatch)
+
+    def isRunning(self):
+        return self._running
+
+    def start(self):
+        if self.center is None:
+            views = self.scene.grScene.views()
+            if len(views) > 0:
+                self.center = views[0].mapToScene(views[0].viewport().rect().center())
+            else:
+                self.center = QPointF(0, 0)
+        self._running = True
+        self._reader.start()
+
+    # 取消加载，已经创建的部分也会被清除
+    def cancel(self):
+        if not self._running: return
+        self._running = False
+        self._timer.stop()
+        self._queue = []
+        self.scene.clear()
+        if DEBUG: print("SceneLoader::cancel ~", self.filename)
+        self.canceled.emit()
+
+    def onFailed(self, message):
+        if not self._running: return
+        self._running = False
+        self.failed.emit(message)
+
+    def onParsed(self, data):
+        if not self._running: return
+        self.scene.clear()
+        self.scene.id = data['id']
+        self._queue = self.sortedByDistance(data)
+        self._queue.reverse()  # 从列表尾部弹出
+        self._done = 0
+        self._timer.start()
+
+    # 按离中心的距离排序，edge排在它两端的node之后
+    def sortedByDistance(self, data):
+        cx, cy = self.center.x(), self.center.y()
+        socket_distance = {}
+        items = []
+        for node_data in data['nodes']:
+            distance = (node_data['pos_x'] - cx) ** 2 + (node_data['pos_y'] - cy) ** 2
+            for socket_data in node_data['sockets']:
+                socket_distance[socket_data['id']] = distance
+            items.append((distance, 0, node_data))
+        for edge_data in data['edges']:
+            distance = max(socket_distance.get(edge_data['start'], math.inf),
+                           socket_distance.get(edge_data['end'], math.inf))
+            items.append((distance, 1, edge_data))
+        items.sort(key=lambda item: (item[0], item[1]))
+        return [(item[1], item[2]) for item in items]
+
+    def loadBatch(self):
+        deadline = time.perf_counter() + LOADER_TIME_SLICE
+        try:
+            # 每一批作为一次批量构建，图元在这一批结束时一起加入scene
+            with self.scene.batch():
+                # 每一批至少创建一个对象，时间片再短加载也能推进
+                while self._queue:
+                    kind, item_data = self._queue.pop()
+                    if kind == 0:
+                        self.scene.deserializeNode(item_data, self._hashmap)
+                    else:
+                        self.scene.deserializeEdge(item_data, self._hashmap)
+                    self._done += 1
+                    if time.perf_counter() >= deadline: break
+        except Exception as e:
+            self._timer.stop()
+            self._running = False
+            self.failed.emit(str(e))
+            return
+
+        self.progress.emit(self._done, self._done + len(self._queue))
+
+        if not self._queue:
+            self._timer.stop()
+            self._running = False
+            self.scene.history.clear()
+            self.scene.has_been_modified = False
+            if DEBUG: print("SceneLoader::loadBatch ~ loaded", self._done, "objects from", self.filename)
+            self.finished.emit()
@@ -0,0 +1,162 @@
+from PyQt5.QtCore import *
+from pyHydraulic.node_spatial_index import SpatialIndex
+
+
+DEBUG = False
+
+# 视图可见区域向四周扩展的比例(相对于可见区域的宽高)，和扩展后区域相交的对象要创建图元
+VIRTUAL_MATERIALIZE_MARGIN = 0.5
+# 超出这个扩展区域的对象才释放图元，比创建的区域大，来回滚动时不会反复创建和释放
+VIRTUAL_RELEASE_MARGIN = 1.5
+
+
+# 虚拟化的scene：所有node、socket和edge对象都存在，但只有视图附近的才创建QGraphicsItem，
+# 离开视图较远的释放图元，状态保存在node中。没有图元的对象按外接矩形存放在空间索引中。
+class SceneVirtualizer():
+    def __init__(self, scene):
+        self.scene = scene
+        # 没有图元的node和edge
+        self.index = SpatialIndex()
+        # 已经创建了图元的node和edge
+        self.materialized = set()
+        # 新建或者移动过的、还没有图元的对象，下一次刷新时重新计算外接矩形
+        self._dirty = {}
+        # 每个视图当前可见的scene区域
+        self._view_rects = {}
+
+        self._flush_timer = QTimer()
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self.flush)
+
+        for node in self.scene.nodes: self.objectAdded(node)
+        for edge in self.scene.edges: self.objectAdded(edge)
+
+    # 关闭虚拟化，给所有对象创建图元
+    def close(self):
+        self._flush_timer.stop()
+        for objects in (self.scene.nodes, self.scene.edges):
+            for obj in objects:
+                if not self.hasGraphics(obj): self.materialize(obj)
+        self.index.clear()
+        self.materialized = set()
+        self._dirty = {}
+
+    def hasGraphics(self, obj):
+        return (obj.grNode if hasattr(obj, 'grNode') else obj.grEdge) is not None
+
+    # 视图滚动、缩放或改变大小之后调用
+    def setViewRect(self, view, rect):
+        self._view_rects[view] = QRectF(rect)
+        self.update()
+
+    def removeView(self, view):
+        self._view_rects.pop(view, None)
+
+    def objectAdded(self, obj):
+        if self.hasGraphics(obj):
+            self.materialized.add(obj)
+        else:
+            self.markDirty(obj)
+
+    def objectRemoved(self, obj):
+        self.index.remove(obj)
+        self.materialized.discard(obj)
+        self._dirty.pop(obj, None)
+
+    # 没有图元的对象位置或者形状变化了，node连接的edge也一起更新
+    def objectMoved(self, obj):
+        if self.hasGraphics(obj): return
+        self.markDirty(obj)
+        if hasattr(obj, 'sockets'):
+            for socket in obj.sockets:
+                for edge in socket.edges:
+                    if not self.hasGraphics(edge): self.markDirty(edge)
+
+    def markDirty(self, obj):
+        self._dirty[obj] = True
+        if not self._flush_timer.isActive(): self._flush_timer.start()
+
+    def materializeRects(self):
+        return [self.expandedRect(rect, VIRTUAL_MATERIALIZE_MARGIN) for rect in self._view_rects.values()]
+
+    def releaseRects(self):
+        return [self.expandedRect(rect, VIRTUAL_RELEASE_MARGIN) for rect in self._view_rects.values()]
+
+    def expandedRect(self, rect, margin):
+        dx, dy = rect.width() * margin, rect.height() * margin
+        return rect.adjusted(-dx, -dy, dx, dy)
+
+    def intersectsAny(self, rect, rects):
+        for region in rects:
+            # 用坐标比较，宽或高为0的矩形也算相交
+            if rect.left() <= region.right() and region.left() <= rect.right() and \
+                    rect.top() <= region.bottom() and region.top() <= rect.bottom():
+                return True
+        return False
+
+    # 把新建和移动过的对象放入空间索引，在视图附近的直接创建图元
+    def flush(self):
+        self._flush_timer.stop()
+        dirty, self._dirty = self._dirty, {}
+        rects = self.materializeRects()
+        for obj in dirty:
+            if not self.scene.hasObject(obj) or self.hasGraphics(obj): continue
+            rect = obj.sceneBoundingRect()
+            if rect is None:
+                self.index.remove(obj)
+            elif self.intersectsAny(rect, rects):
+                self.materialize(obj)
+            else:
+                self.index.insert(obj, rect)
+
+    # 根据视图区域创建和释放图元
+    def update(self):
+        if len(self._view_rects) == 0: return
+        if self._dirty: self.flush()
+
+        created = 0
+        for rect in self.materializeRects():
+            for obj in self.index.query(rect):
+                self.materialize(obj)
+                created += 1
+
+        released = 0
+        release_rects = self.releaseRects()
+        for obj in list(self.materialized):
+            if not self.canRelease(obj): continue
+            rect = obj.sceneBoundingRect()
+            if rect is not None and not self.intersectsAny(rect, release_rects):
+                self.release(obj)
+                released += 1
+
+        if DEBUG: print("SceneVirtualizer::update ~ created", created, "released", released,
+                        "with graphics", len(self.materialized), "without", len(self.index))
+
+    # 选中的、正在被鼠标拖动的图元和正在拖拽的edge不释放
+    def canRelease(self, obj):
+        if hasattr(obj, 'grNode'):
+            grItem = obj.grNode
+        else:
+            if obj.start_socket is None or obj.end_socket is None: return False
+            grItem = obj.grEdge
+        if grItem is None: return False
+        return not grItem.isSelected() and self.scene.grScene.mouseGrabberItem() is not grItem
+
+    def materialize(self, obj):
+        # 创建图元只是恢复保存的状态，不需要记录到历史中
+        history = self.scene.history
+        tracking, history.tracking = history.tracking, False
+        try:
+            obj.createGraphics()
+        finally:
+            history.tracking = tracking
+        self.index.remove(obj)
+        self._dirty.pop(obj, None)
+        self.materialized.add(obj)
+
+    def release(self, obj):
+        obj.releaseGraphics()
+        self.materialized.discard(obj)
+        rect = obj.sceneBoundingRect()
+        if rect is not None: self.index.insert(obj, rect)
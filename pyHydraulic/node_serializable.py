@@ -1,6 +1,21 @@
 class Serializable():
     def __init__(self):
-        self.id = id(self)
+        self._id = id(self)
+
+    # id变化时通知子类，方便scene中按id登记的对象表同步更新
+    @property
+    def id(self):
+        return self._id
+
+    @id.setter
+    def id(self, value):
+        old_id = self._id
+        self._id = value
+        if old_id != value:
+            self.onIdChanged(old_id)
+
+    def onIdChanged(self, old_id):
+        pass
 
     def serialize(self):
         raise NotImplemented()
@@ -1,6 +1,6 @@
 from collections import OrderedDict
+from PyQt5.QtCore import QPointF
 from pyHydraulic.node_serializable import Serializable
-from pyHydraulic.node_graphics_socket import QDMGraphicsSocket
 
 
 LEFT_TOP = 1
@@ -26,15 +26,34 @@ class Socket(Serializable):
         if DEBUG: print("Socket -- creating with", self.index, "for node", self.node)
 
 
-        self.grSocket = QDMGraphicsSocket(self, self.socket_type)  # 第一个self是node的对象，也就是说，socket已经为node的子对象了
-        # 向上一级Node询问，我的位置放在哪里
-        self.grSocket.setPos(*self.node.getSocketPosition(index))
         # 一个socket上可以连接多个edge，下面是edge的统计list
         self.edges = []
+        # node没有图元时socket也没有图元
+        self.grSocket = None
+        if self.node.grNode is not None: self.createGraphics()
 
     def __str__(self):
         return "<Socket %s %s..%s>" % ("ME" if self.is_multi_edges else "SE", hex(id(self))[2:5], hex(id(self))[-3:])
 
+    def onIdChanged(self, old_id):
+        self.node.scene.reindexObject(self, old_id)
+
+
+    def createGraphics(self):
+        from pyHydraulic.node_graphics_socket import QDMGraphicsSocket
+        self.grSocket = QDMGraphicsSocket(self, self.socket_type)  # 第一个self是node的对象，也就是说，socket已经为node的子对象了
+        # 向上一级Node询问，我的位置放在哪里
+        self.grSocket.setPos(*self.node.getSocketPosition(self.index))
+        self.grSocket.linkFlag = len(self.edges) > 0
+
+    # grSocket是grNode的子项，随grNode一起从scene中移除
+    def releaseGraphics(self):
+        self.grSocket = None
+
+    # socket在scene中的坐标
+    def scenePos(self):
+        if self.grSocket is not None: return self.grSocket.scenePos()
+        return self.node.mapToScene(QPointF(*self.getSocketPosition()))
 
     def getSocketPosition(self):
         if DEBUG: print("  GSP: ", self.index, "node:", self.node)
@@ -0,0 +1,71 @@
+import math
+
+
+# 均匀网格的空间索引：对象按scene中的外接矩形放到它覆盖的格子里，
+# 查询和某个矩形相交的对象时只需要检查这个矩形覆盖的格子，而不是所有对象
+class SpatialIndex():
+    def __init__(self, cell_size=2000.0):
+        self.cell_size = cell_size
+        self._cells = {}  # (列, 行) -> set(对象)
+        self._rects = {}  # 对象 -> (left, top, right, bottom)
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __contains__(self, obj):
+        return obj in self._rects
+
+    def clear(self):
+        self._cells = {}
+        self._rects = {}
+
+    def _cellRange(self, rect):
+        left, top, right, bottom = rect
+        return (math.floor(left / self.cell_size), math.floor(right / self.cell_size),
+                math.floor(top / self.cell_size), math.floor(bottom / self.cell_size))
+
+    # 放入或更新对象的外接矩形(QRectF)
+    def insert(self, obj, rect):
+        rect = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        old = self._rects.get(obj)
+        if old is not None:
+            if old == rect: return
+            self.remove(obj)
+        self._rects[obj] = rect
+        col0, col1, row0, row1 = self._cellRange(rect)
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                self._cells.setdefault((col, row), set()).add(obj)
+
+    def remove(self, obj):
+        rect = self._rects.pop(obj, None)
+        if rect is None: return
+        col0, col1, row0, row1 = self._cellRange(rect)
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                cell = self._cells.get((col, row))
+                if cell is None: continue
+                cell.discard(obj)
+                if not cell: del self._cells[(col, row)]
+
+    # 返回外接矩形和rect(QRectF)相交的所有对象
+    def query(self, rect):
+        rect = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        col0, col1, row0, row1 = self._cellRange(rect)
+        # 查询范围覆盖的格子比已有的格子还多时(比如缩小到很小)，直接检查所有对象
+        if (col1 - col0 + 1) * (row1 - row0 + 1) > len(self._cells):
+            candidates = self._rects.keys()
+        else:
+            candidates = set()
+            for col in range(col0, col1 + 1):
+                for row in range(row0, row1 + 1):
+                    cell = self._cells.get((col, row))
+                    if cell is not None: candidates.update(cell)
+        left, top, right, bottom = rect
+        result = []
+        for obj in candidates:
+            obj_left, obj_top, obj_right, obj_bottom = self._rects[obj]
+            # 不用QRectF.intersects，宽或高为0的矩形(水平或竖直的edge)也要算相交
+            if obj_left <= right and left <= obj_right and obj_top <= bottom and top <= obj_bottom:
+                result.append(obj)
+        return result
@@ -0,0 +1,157 @@
+"""
+    控件类型的登记表：类型名 -> 创建图元的工厂和元数据(默认尺寸、socket、单位和数值范围)。
+    工厂可以直接是图元类，也可以是"模块:类名"字符串，第一次创建这种控件的图元时才导入模块，
+    启动时不用导入所有控件的绘制代码。
+
+    其他的包可以在entry point组"pyHydraulic.node_types"中登记一个函数，第一次查询类型时调用，
+    在函数中用registerNodeType登记自己的控件:
+
+        entry_points={'pyHydraulic.node_types': ['my_components = my_package.components:register']}
+"""
+import importlib
+from collections import OrderedDict
+
+
+DEBUG = False
+
+NODE_TYPES_ENTRY_POINT_GROUP = "pyHydraulic.node_types"
+
+
+class NodeTypeNotRegistered(Exception): pass
+
+
+class NodeType():
+    # sockets为[(x, y, socket_type), ...]，是socket在控件局部坐标(原点在控件中心)中的位置和颜色样式
+    def __init__(self, name, factory, width=500, height=120, sockets=(), unit=" ",
+                 value=0.0, minValue=0, maxValue=100.0, text=" "):
+        self.name = name
+        self._factory = factory
+        self.width = width
+        self.height = height
+        self.sockets = [tuple(socket) for socket in sockets]
+        self.unit = unit
+        self.value = value
+        self.minValue = minValue
+        self.maxValue = maxValue
+        self.text = text
+
+    def __str__(self):
+        return "<NodeType %s>" % self.name
+
+    # 工厂为"模块:类名"时，还没有导入的话返回类名
+    def factoryName(self):
+        if isinstance(self._factory, str): return self._factory.split(':')[-1]
+        return getattr(self._factory, '__name__', None)
+
+    def isLoaded(self):
+        return not isinstance(self._factory, str)
+
+    # 返回创建图元的工厂，需要时导入它所在的模块
+    def factory(self):
+        if isinstance(self._factory, str):
+            module_name, factory_name = self._factory.split(':')
+            if DEBUG: print("NodeType::factory ~ importing", module_name, "for", self.name)
+            self._factory = getattr(importlib.import_module(module_name), factory_name)
+        return self._factory
+
+    def createGraphics(self, node):
+        return self.factory()(node)
+
+
+_node_types = OrderedDict()
+_entry_points_loaded = False
+
+
+# 登记控件类型，同名的类型会被替换(比如用自己的控件替换内置的控件)
+def registerNodeType(name, factory, **metadata):
+    node_type = NodeType(name, factory, **metadata)
+    _node_types[name] = node_type
+    return node_type
+
+
+def unregisterNodeType(name):
+    _node_types.pop(name, None)
+
+
+def getNodeType(name):
+    node_type = _node_types.get(name)
+    if node_type is None and not _entry_points_loaded:
+        loadEntryPoints()
+        node_type = _node_types.get(name)
+    if node_type is None:
+        raise NodeTypeNotRegistered("node type %r is not registered" % name)
+    return node_type
+
+
+# 所有登记的类型名，按登记的顺序
+def nodeTypeNames():
+    if not _entry_points_loaded: loadEntryPoints()
+    return list(_node_types)
+
+
+# 按工厂的名字(比如"GraphicsNode_tank")查找图元类，找不到返回None
+def graphicsClassByName(factory_name):
+    for node_type in list(_node_types.values()):
+        if node_type.factoryName() == factory_name:
+            return node_type.factory()
+    return None
+
+
+# 图元类对应的第一个登记的类型(几个类型可以共用一个图元类)，没有登记的返回None，不会导入任何模块
+def nodeTypeOfClass(cls):
+    if not _entry_points_loaded: loadEntryPoints()
+    for node_type in list(_node_types.values()):
+        if node_type._factory is cls or node_type.factoryName() == cls.__name__:
+            return node_type
+    return None
+
+
+def loadEntryPoints():
+    global _entry_points_loaded
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return
+    found = entry_points()
+    if hasattr(found, 'select'):
+        found = found.select(group=NODE_TYPES_ENTRY_POINT_GROUP)
+    else:
+        found = found.get(NODE_TYPES_ENTRY_POINT_GROUP, [])
+    for entry_point in found:
+        try:
+            entry_point.load()()
+        except Exception as e:
+            print("!W:", "loadEntryPoints", "cannot load node types from", entry_point.name, ":", e)
+
+
+# 内置的控件
+registerNodeType("pressure sensor", "pyHydraulic.node_graphics_sensor:GraphicsNode_pressure_sensor",
+                 width=250, height=375, sockets=[(0, 187.5, 2)], unit="MPa")
+registerNodeType("flow meter", "pyHydraulic.node_graphics_sensor:GraphicsNode_flow_meter",
+                 width=200, height=400, sockets=[(0, -200, 2), (0, 200, 2)], unit="mL")
+registerNodeType("tank", "pyHydraulic.node_graphics_power:GraphicsNode_tank",
+                 width=1000, height=1000, sockets=[(0, -500, 2)], unit="cm", value=20, minValue=0, maxValue=100)
+registerNodeType("simple tank", "pyHydraulic.node_graphics_power:GraphicsNode_simple_tank",
+                 width=250, height=125, sockets=[(0, -62.5, 2)], unit="cm", value=50, minValue=0, maxValue=100)
+registerNodeType("gauge", "pyHydraulic.node_graphics_sensor:GraphicsNode_gauge",
+                 width=300, height=600, sockets=[(0, 300, 2)], unit="MPa", value=0, minValue=0, maxValue=30)
+registerNodeType("servo valve", "pyHydraulic.node_graphics_valve:GraphicsNode_servo_valve",
+                 width=2500, height=625, sockets=[(125, 312.5, 2), (-125, 312.5, 2), (-125, -312.5, 2), (125, -312.5, 2)],
+                 unit="mA", value=0, minValue=-100, maxValue=100)
+for _name in ("piston dual", "piston right", "piston left"):
+    registerNodeType(_name, "pyHydraulic.node_graphics_actuator:GraphicsNode_pistion",
+                     width=5000, height=625, sockets=[(-1125, 312.5, 2), (1125, 312.5, 2)],
+                     unit="cm", value=0, minValue=-100, maxValue=100)
+registerNodeType("pump", "pyHydraulic.node_graphics_power:GraphicsNode_pump",
+                 width=300, height=600, sockets=[(0, -300, 2), (0, 300, 2)], unit="L/min")
+registerNodeType("filter", "pyHydraulic.node_graphics_power:GraphicsNode_filter",
+                 width=200, height=320, sockets=[(0, -160, 2), (0, 160, 2)], unit="L/min")
+registerNodeType("accumulator", "pyHydraulic.node_graphics_power:GraphicsNode_accumulator",
+                 width=300, height=750, sockets=[(0, 375, 2)], unit="mL")
+registerNodeType("one-way valve", "pyHydraulic.node_graphics_valve:GraphicsNode_oneway_valve",
+                 width=150, height=300, sockets=[(0, -150, 2), (0, 150, 2)], unit="mL")
+registerNodeType("relief valve", "pyHydraulic.node_graphics_valve:GraphicsNode_relief_valve",
+                 width=500, height=500, sockets=[(62.5, -250, 2), (62.5, 250, 2)], unit="mL")
+registerNodeType("text", "pyHydraulic.node_graphics_text:GraphicsNode_text",
+                 width=500, height=100, text="Hello world!")
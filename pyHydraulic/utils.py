@@ -1,6 +1,9 @@
 import traceback
 from PyQt5.QtCore import *
-from PyQt5.QtWidgets import *
+
+
+# 拿不到显示器刷新率时的帧间隔，毫秒
+DEFAULT_FRAME_INTERVAL = 16
 
 
 def dumpException(e):
@@ -13,7 +16,7 @@ def loadStylesheet(filename):
     file = QFile(filename)
     file.open(QFile.ReadOnly | QFile.Text)
     stylesheet = file.readAll()
-    QApplication.instance().setStyleSheet(str(stylesheet, encoding='utf-8'))
+    QCoreApplication.instance().setStyleSheet(str(stylesheet, encoding='utf-8'))
 
 def loadStylesheets(*args):
     res = ''
@@ -22,4 +25,39 @@ def loadStylesheets(*args):
         file.open(QFile.ReadOnly | QFile.Text)
         stylesheet = file.readAll()
         res += "\n" + str(stylesheet, encoding='utf-8')
-    QApplication.instance().setStyleSheet(res)
+    QCoreApplication.instance().setStyleSheet(res)
+
+
+# 显示器一帧的时间，毫秒。headless的scene也导入本模块，用到时才导入QtGui
+def displayFrameInterval():
+    from PyQt5.QtGui import QGuiApplication
+    screen = QGuiApplication.primaryScreen() if QGuiApplication.instance() is not None else None
+    rate = screen.refreshRate() if screen is not None else 0
+    return max(1, int(1000 / rate)) if rate > 0 else DEFAULT_FRAME_INTERVAL
+
+
+# 合并频繁发射的信号：post记下最新的参数，空闲时马上发射，之后每帧最多发射一次最新的参数，
+# 和上一次发射的参数相同时不发射。鼠标位置这类比屏幕刷新快得多的通知用它发射
+class CoalescedSignal(QObject):
+    def __init__(self, signal, interval=None, parent=None):
+        super().__init__(parent)
+        self.signal = signal
+        self._pending = None
+        self._emitted = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(displayFrameInterval() if interval is None else interval)
+        self._timer.timeout.connect(self.flush)
+
+    def post(self, *args):
+        self._pending = args
+        if not self._timer.isActive(): self.flush()
+
+    # 马上发射还没有发射的参数
+    def flush(self):
+        args, self._pending = self._pending, None
+        if args is None or args == self._emitted: return
+        self._emitted = args
+        self._timer.start()
+        self.signal.emit(*args)
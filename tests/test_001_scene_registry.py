@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the id registry of `Scene`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge
+
+
+class TestSceneRegistry(unittest.TestCase):
+    """Tests for looking up nodes, edges and sockets by id."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.node1 = Node(self.scene, "flow meter")
+        self.node2 = Node(self.scene, "pump")
+        self.edge1 = Edge(self.scene, self.node1.sockets[0], self.node2.sockets[0])
+        self.edge2 = Edge(self.scene, self.node1.sockets[0], self.node2.sockets[1])
+
+    def test_001_lookup(self):
+        """Test if nodes, edges and sockets can be found by id."""
+        assert(self.scene.getNodeByID(self.node1.id) is self.node1)
+        assert(self.scene.getEdgeByID(self.edge2.id) is self.edge2)
+        assert(self.scene.getSocketByID(self.node2.sockets[1].id) is self.node2.sockets[1])
+        assert(self.scene.getNodeByID(self.edge1.id) is None)
+
+    def test_002_id_changed(self):
+        """Test if the registry follows a changed id."""
+        old_id = self.node1.id
+        self.node1.id = 12345
+        assert(self.scene.getNodeByID(12345) is self.node1)
+        assert(self.scene.getNodeByID(old_id) is None)
+
+    def test_003_remove_node(self):
+        """Test if removing a node removes all of its edges and sockets."""
+        socket_id = self.node1.sockets[0].id
+        self.node1.remove()
+        assert(list(self.scene.nodes) == [self.node2])
+        assert(list(self.scene.edges) == [])
+        assert(self.scene.getSocketByID(socket_id) is None)
+
+    def test_004_deserialize(self):
+        """Test if ids restored by deserialize are registered."""
+        data = self.scene.serialize()
+        self.scene.deserialize(data)
+        for node_data in data['nodes']:
+            assert(self.scene.getNodeByID(node_data['id']).id == node_data['id'])
+        for edge_data in data['edges']:
+            edge = self.scene.getEdgeByID(edge_data['id'])
+            assert(edge.start_socket is self.scene.getSocketByID(edge_data['start']))
+        assert(self.scene.serialize() == data)
+
+    def test_005_read_only_views(self):
+        """Test if nodes and edges are live views that cannot be changed like lists."""
+        nodes = self.scene.nodes
+        node3 = Node(self.scene, "pump")
+        assert(node3 in nodes and len(nodes) == 3)
+        with self.assertRaises(AttributeError):
+            self.scene.nodes.append(self.node1)
+        with self.assertRaises(AttributeError):
+            self.scene.edges.remove(self.edge1)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the undo/redo history of `Scene`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtCore import QRectF
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge
+
+
+def sceneState(scene):
+    data = scene.serialize()
+    return sorted(map(repr, data['nodes'])), sorted(map(repr, data['edges']))
+
+
+class TestSceneHistory(unittest.TestCase):
+    """Tests for `SceneHistory`."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.node1 = Node(self.scene, "flow meter")
+        self.node2 = Node(self.scene, "pump")
+        self.node3 = Node(self.scene, "servo valve")
+        Edge(self.scene, self.node1.sockets[0], self.node2.sockets[0])
+        Edge(self.scene, self.node1.sockets[1], self.node3.sockets[0])
+        self.scene.history.storeHistory("Initial")
+        self.states = [sceneState(self.scene)]
+
+    def store(self, desc):
+        self.scene.history.storeHistory(desc, setModified=True)
+        self.states.append(sceneState(self.scene))
+
+    def test_001_undo_redo(self):
+        """Test if undo and redo restore every stored state."""
+        self.node1.setPos(100, 200)
+        self.store("Node moved")
+        self.node3.rotate(90)
+        self.node3.grNode.value = 50
+        self.store("Node changed")
+        self.node1.remove()
+        self.store("Node removed")
+        Edge(self.scene, self.node2.sockets[1], self.node3.sockets[1])
+        self.store("Edge added")
+
+        for step in range(len(self.states) - 2, -1, -1):
+            self.scene.history.undo()
+            assert(sceneState(self.scene) == self.states[step])
+        for step in range(1, len(self.states)):
+            self.scene.history.redo()
+            assert(sceneState(self.scene) == self.states[step])
+
+    def test_002_only_changes_stored(self):
+        """Test if a history stamp only contains the changed objects."""
+        self.node2.setPos(10, 10)
+        self.store("Node moved")
+        history_stamp = self.scene.history.history_stack[-1]
+        assert(len(history_stamp['nodes']) == 1)
+        assert(len(history_stamp['edges']) == 0)
+        assert(history_stamp['nodes'][0][1]['id'] == self.node2.id)
+
+    def test_003_discard_pending(self):
+        """Test if undo drops changes which were not stored."""
+        self.node2.setPos(10, 10)
+        self.store("Node moved")
+        self.node3.setPos(-50, -50)
+        self.scene.history.undo()
+        assert(sceneState(self.scene) == self.states[0])
+
+    def test_004_undo_in_place(self):
+        """Test if undo updates existing objects instead of recreating them."""
+        edge = self.node1.sockets[0].edges[0]
+        grNode, grEdge = self.node1.grNode, edge.grEdge
+        self.node1.setPos(300, 400)
+        self.node1.updateConnectedEdges()
+        self.store("Node moved")
+        self.scene.history.undo()
+        assert(self.scene.getNodeByID(self.node1.id) is self.node1)
+        assert(self.node1.grNode is grNode and edge.grEdge is grEdge)
+        socket_pos = self.node1.sockets[0].grSocket.scenePos()
+        assert(grEdge.posSource == [socket_pos.x(), socket_pos.y()])
+
+    def test_005_paint_not_recorded(self):
+        """Test if painting the nodes does not record changes in the history."""
+        tank = Node(self.scene, "tank")
+        tank.setPos(2000, 0)
+        self.scene.history.storeHistory("Tank added")
+        image = QImage(400, 400, QImage.Format_ARGB32)
+        painter = QPainter(image)
+        self.scene.grScene.render(painter, QRectF(0, 0, 400, 400), QRectF(-1000, -1000, 4000, 4000))
+        painter.end()
+        assert(self.scene.history._pending == {})
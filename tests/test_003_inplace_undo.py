@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for undo/redo updating the existing nodes and edges in place."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge, EDGE_TYPE_DIRECT, EDGE_TYPE_BEZIER
+
+
+class TestInPlaceUndo(unittest.TestCase):
+    """Tests for `Node.reconcile`, `Edge.reconcile`, `Scene.reconcileNode` and `Scene.reconcileEdge`."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.node1 = Node(self.scene, "flow meter")
+        self.node2 = Node(self.scene, "pump")
+        self.node3 = Node(self.scene, "servo valve")
+        self.node2.setPos(1000, 0)
+        self.node3.setPos(0, 1000)
+        self.edge = Edge(self.scene, self.node1.sockets[1], self.node2.sockets[0])
+        self.scene.updateDirtyEdges()
+        self.scene.history.storeHistory("Initial")
+
+    def store(self, desc):
+        self.scene.history.storeHistory(desc, setModified=True)
+
+    def sourcePos(self, edge):
+        pos = edge.start_socket.grSocket.scenePos()
+        return [pos.x(), pos.y()]
+
+    def test_001_move_and_value(self):
+        """Test if undo and redo of a move and a value edit keep the same objects and graphics items."""
+        grNode, grEdge = self.node1.grNode, self.edge.grEdge
+        self.node1.setPos(300, 400)
+        self.store("Node moved")
+        self.node1.grNode.value = 50
+        self.store("Node changed")
+
+        self.scene.history.undo()
+        assert(self.node1.grNode.value != 50)
+        self.scene.history.undo()
+        self.scene.updateDirtyEdges()
+        assert((self.node1.pos.x(), self.node1.pos.y()) == (0, 0))
+        for i in range(2): self.scene.history.redo()
+        self.scene.updateDirtyEdges()
+        assert((self.node1.pos.x(), self.node1.pos.y()) == (300, 400))
+        assert(self.node1.grNode.value == 50)
+
+        assert(self.scene.getNodeByID(self.node1.id) is self.node1)
+        assert(self.scene.getEdgeByID(self.edge.id) is self.edge)
+        assert(self.node1.grNode is grNode and self.edge.grEdge is grEdge)
+        assert(grEdge.posSource == self.sourcePos(self.edge))
+
+    def test_002_undo_delete(self):
+        """Test if undoing a delete rebuilds the node and its edge with their original ids."""
+        node_id, edge_id = self.node1.id, self.edge.id
+        socket_ids = [socket.id for socket in self.node1.sockets]
+        self.node1.remove()
+        self.store("Node removed")
+        assert(self.scene.getNodeByID(node_id) is None and self.scene.getEdgeByID(edge_id) is None)
+
+        self.scene.history.undo()
+        node, edge = self.scene.getNodeByID(node_id), self.scene.getEdgeByID(edge_id)
+        assert(node is not None and edge is not None)
+        assert([socket.id for socket in node.sockets] == socket_ids)
+        assert(edge.start_socket is node.sockets[1] and edge.end_socket is self.node2.sockets[0])
+        # 重做删除的是还原出来的对象
+        self.scene.history.redo()
+        assert(self.scene.getNodeByID(node_id) is None and self.scene.getEdgeByID(edge_id) is None)
+
+    def test_003_reattach(self):
+        """Test if undo and redo of moving an edge to another socket re-attach the same edge."""
+        grEdge = self.edge.grEdge
+        self.edge.end_socket = self.node3.sockets[0]
+        self.edge.updatePositions()
+        self.store("Edge re-attached")
+
+        self.scene.history.undo()
+        assert(self.scene.getEdgeByID(self.edge.id) is self.edge and self.edge.grEdge is grEdge)
+        assert(self.edge.end_socket is self.node2.sockets[0])
+        assert(self.edge in self.node2.sockets[0].edges and self.edge not in self.node3.sockets[0].edges)
+        self.scene.history.redo()
+        assert(self.edge.end_socket is self.node3.sockets[0])
+        assert(self.edge in self.node3.sockets[0].edges and self.edge not in self.node2.sockets[0].edges)
+        pos = self.node3.sockets[0].grSocket.scenePos()
+        assert(grEdge.posDestination == [pos.x(), pos.y()])
+
+    def test_004_edge_type(self):
+        """Test if undo and redo of an edge type change keep the edge and replace only its graphics item."""
+        self.edge.edge_type = EDGE_TYPE_BEZIER
+        self.store("Edge type changed")
+        bezier = self.edge.grEdge
+
+        self.scene.history.undo()
+        assert(self.scene.getEdgeByID(self.edge.id) is self.edge)
+        assert(self.edge.edge_type == EDGE_TYPE_DIRECT and self.edge.grEdge is not bezier)
+        assert(bezier.scene() is None and self.edge.grEdge.scene() is self.scene.grScene)
+        assert(self.edge.start_socket is self.node1.sockets[1] and self.edge.end_socket is self.node2.sockets[0])
+        assert(self.edge.grEdge.posSource == self.sourcePos(self.edge))
+        self.scene.history.redo()
+        assert(self.edge.edge_type == EDGE_TYPE_BEZIER)
+
+
+if __name__ == '__main__':
+    unittest.main()
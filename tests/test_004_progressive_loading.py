@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for loading a file in a background thread and building the scene in time slices."""
+
+import os
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QFileDialog
+from PyQt5.QtCore import QPointF
+
+import pyHydraulic.node_scene_loader as node_scene_loader
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_editor_window import NodeEditorWindow
+
+DIAGRAM = os.path.join(os.path.dirname(__file__), "..", "pyHydraulic", "hydraulicSketcher", "test.json")
+
+
+class TestProgressiveLoading(unittest.TestCase):
+    """Tests for `SceneLoader` started by `Scene.loadFromFileProgressive`."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+        cls.expected = Scene()
+        cls.expected.loadFromFile(DIAGRAM)
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.scene = Scene()
+        self.events = []
+        self.time_slice = node_scene_loader.LOADER_TIME_SLICE
+
+    def tearDown(self):
+        node_scene_loader.LOADER_TIME_SLICE = self.time_slice
+        shutil.rmtree(self.dir)
+
+    def load(self, filename):
+        loader = self.scene.loadFromFileProgressive(filename, QPointF(0, 0))
+        loader.progress.connect(lambda done, total: self.events.append(('progress', done, total)))
+        loader.finished.connect(lambda: self.events.append(('finished',)))
+        loader.failed.connect(lambda message: self.events.append(('failed', message)))
+        loader.canceled.connect(lambda: self.events.append(('canceled',)))
+        return loader
+
+    # 处理事件直到加载结束，读文件的线程发出的信号也在事件循环中送达
+    def wait(self, loader, until=None, timeout=10):
+        until = until or (lambda: not loader.isRunning())
+        deadline = time.monotonic() + timeout
+        while not until() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.001)
+        assert(until())
+
+    def progress(self):
+        return [event[1:] for event in self.events if event[0] == 'progress']
+
+    def test_001_time_sliced(self):
+        """Test if each time slice creates at least one object and progress counts up to every node and edge."""
+        node_scene_loader.LOADER_TIME_SLICE = 0
+        loader = self.load(DIAGRAM)
+        assert(loader.isRunning())
+        self.wait(loader)
+        total = len(self.expected.nodes) + len(self.expected.edges)
+        assert(self.progress() == [(done, total) for done in range(1, total + 1)])
+        assert(self.events[-1] == ('finished',))
+
+    def test_002_finished(self):
+        """Test if the loaded scene has the same objects as a scene loaded in one go and starts with an empty history."""
+        loader = self.load(DIAGRAM)
+        self.wait(loader)
+        assert(self.events[-1] == ('finished',))
+        # 创建的顺序按离中心的距离，和文件中的顺序不同
+        loaded, expected = self.scene.serialize(), self.expected.serialize()
+        for key in ('nodes', 'edges'):
+            assert(sorted(loaded[key], key=lambda item: item['id']) == sorted(expected[key], key=lambda item: item['id']))
+        assert(self.scene.history.history_stack == [])
+        assert(not self.scene.has_been_modified)
+
+    def test_003_cancel(self):
+        """Test if canceling in the middle of the build leaves an empty, unmodified scene."""
+        node_scene_loader.LOADER_TIME_SLICE = 0
+        loader = self.load(DIAGRAM)
+        self.wait(loader, lambda: len(self.progress()) >= 3)
+        assert(len(self.scene.nodes) > 0)
+        loader.cancel()
+        assert(self.events[-1] == ('canceled',))
+        assert(not loader.isRunning())
+        assert(len(self.scene.nodes) == 0 and len(self.scene.edges) == 0)
+        assert(self.scene.history.history_stack == [])
+        assert(not self.scene.has_been_modified)
+        # 取消后定时器不再创建对象
+        count = len(self.events)
+        for i in range(10): self.app.processEvents()
+        assert(len(self.events) == count and len(self.scene.nodes) == 0)
+
+    def test_004_read_failed(self):
+        """Test if a missing file and an invalid file reach `failed` without changing the scene."""
+        invalid = os.path.join(self.dir, "invalid.json")
+        with open(invalid, "w") as file:
+            file.write("{")
+        for filename in (os.path.join(self.dir, "missing.json"), invalid):
+            self.events = []
+            loader = self.load(filename)
+            self.wait(loader)
+            assert(len(self.events) == 1 and self.events[0][0] == 'failed' and self.events[0][1] != '')
+            assert(len(self.scene.nodes) == 0)
+
+    def test_005_build_failed(self):
+        """Test if an error while creating the objects reaches `failed` and stops the build."""
+        data = self.expected.serialize()
+        data['edges'][0]['start'] = -1
+        filename = os.path.join(self.dir, "broken.json")
+        with open(filename, "w") as file:
+            file.write(json.dumps(data))
+        loader = self.load(filename)
+        self.wait(loader)
+        assert(self.events[-1][0] == 'failed')
+        assert(('finished',) not in self.events)
+
+
+class TestCancelLoadAction(unittest.TestCase):
+    """Tests for the window-wide Esc shortcut that cancels loading."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.window = NodeEditorWindow()
+
+    def tearDown(self):
+        self.window.nodeeditor.scene.has_been_modified = False
+        self.window.close()
+
+    def test_001_enabled_while_loading(self):
+        """Test if the cancel action, and with it the Esc shortcut, is enabled only while a file is loading."""
+        assert(not self.window.actCancelLoad.isEnabled())
+        with mock.patch.object(QFileDialog, 'getOpenFileName', return_value=(DIAGRAM, '')):
+            self.window.onFileOpen()
+        nodeeditor = self.window.nodeeditor
+        assert(nodeeditor.isLoading() and self.window.actCancelLoad.isEnabled())
+        deadline = time.monotonic() + 10
+        while nodeeditor.isLoading() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.001)
+        assert(not nodeeditor.isLoading())
+        assert(not self.window.actCancelLoad.isEnabled())
+
+        with mock.patch.object(QFileDialog, 'getOpenFileName', return_value=(DIAGRAM, '')):
+            self.window.onFileOpen()
+        self.window.actCancelLoad.trigger()
+        assert(not nodeeditor.isLoading())
+        assert(not self.window.actCancelLoad.isEnabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
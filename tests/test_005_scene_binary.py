@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the binary graph file format."""
+
+import os
+import json
+import unittest
+
+from pyHydraulic.node_scene_binary import dumpSceneData, loadSceneData, isBinaryFilename, InvalidBinaryFile
+
+
+TEST_JSON = os.path.join(os.path.dirname(__file__), '..', 'pyHydraulic', 'hydraulicSketcher', 'test.json')
+
+
+class TestSceneBinary(unittest.TestCase):
+    """Tests for `dumpSceneData` and `loadSceneData`."""
+
+    def setUp(self):
+        with open(TEST_JSON, encoding='utf-8') as file:
+            self.data = json.load(file)
+
+    def test_001_round_trip(self):
+        """Test if the binary format restores exactly the same json data."""
+        restored = loadSceneData(dumpSceneData(self.data))
+        assert(restored == self.data)
+        assert(json.dumps(restored, indent=4) == json.dumps(self.data, indent=4))
+
+    def test_002_smaller(self):
+        """Test if the binary file is smaller than the json file."""
+        assert(len(dumpSceneData(self.data)) * 4 < len(json.dumps(self.data, indent=4)))
+
+    def test_003_invalid(self):
+        """Test if a wrong file raises InvalidBinaryFile."""
+        with self.assertRaises(InvalidBinaryFile):
+            loadSceneData(b"not a graph")
+
+    def test_004_extension(self):
+        """Test if the binary format is selected by the file extension."""
+        assert(isBinaryFilename("plant.PYHB"))
+        assert(not isBinaryFilename("plant.json"))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the virtualized `Scene`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QRectF
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge
+from pyHydraulic.node_spatial_index import SpatialIndex
+from pyHydraulic.node_graphics_view import QDMGraphicsView
+
+
+def buildScene(scene, count=60):
+    nodes = []
+    for i in range(count):
+        node = Node(scene, "flow meter")
+        node.setPos((i % 10) * 5000, (i // 10) * 5000)
+        node.setRotation(i * 15)
+        nodes.append(node)
+    for i in range(count - 1):
+        Edge(scene, nodes[i].sockets[1], nodes[i + 1].sockets[0])
+    return nodes
+
+
+def withoutIds(data):
+    nodes = []
+    for node_data in data['nodes']:
+        node_data = dict(node_data)
+        node_data.pop('id')
+        node_data['sockets'] = [socket_data['index'] for socket_data in node_data['sockets']]
+        nodes.append(node_data)
+    return nodes
+
+
+class TestSceneVirtualizer(unittest.TestCase):
+    """Tests for creating graphics items only near the view."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.view = QDMGraphicsView(self.scene.grScene)
+        self.view.resize(800, 600)
+        self.view.centerOn(0, 0)
+        self.scene.setVirtualized(True)
+
+    def test_001_spatial_index(self):
+        """Test if the spatial index finds objects by rectangle."""
+        index = SpatialIndex(cell_size=100)
+        index.insert('a', QRectF(0, 0, 50, 50))
+        index.insert('b', QRectF(1000, 1000, 0, 500))
+        assert(index.query(QRectF(-10, -10, 20, 20)) == ['a'])
+        assert(index.query(QRectF(990, 1200, 20, 20)) == ['b'])
+        index.insert('a', QRectF(5000, 5000, 10, 10))
+        assert(index.query(QRectF(-10, -10, 20, 20)) == [])
+        index.remove('b')
+        assert(len(index) == 1)
+
+    def test_002_graphics_near_view(self):
+        """Test if only the nodes near the view get graphics items."""
+        nodes = buildScene(self.scene)
+        self.view.updateVirtualRegion()
+        assert(nodes[0].grNode is not None)
+        assert(nodes[-1].grNode is None)
+        assert(nodes[-1].sockets[0].grSocket is None)
+        assert(list(self.scene.edges)[-1].grEdge is None)
+
+        self.view.centerOn(nodes[-1].pos)
+        self.view.updateVirtualRegion()
+        assert(nodes[0].grNode is None)
+        assert(nodes[-1].grNode is not None)
+
+    def test_003_same_data(self):
+        """Test if a virtualized scene serializes like a normal one."""
+        buildScene(self.scene)
+        self.view.updateVirtualRegion()
+        normal = Scene()
+        buildScene(normal)
+        assert(withoutIds(self.scene.serialize()) == withoutIds(normal.serialize()))
+
+        self.scene.setVirtualized(False)
+        assert(all(node.grNode is not None for node in self.scene.nodes))
+        assert(all(edge.grEdge is not None for edge in self.scene.edges))
+        assert(withoutIds(self.scene.serialize()) == withoutIds(normal.serialize()))
+
+
+if __name__ == '__main__':
+    unittest.main()
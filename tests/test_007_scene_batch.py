@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the bulk construction block of `Scene`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge
+
+
+class TestSceneBatch(unittest.TestCase):
+    """Tests for deferring work until `Scene.batch` exits."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.scene.history.storeHistory("Initial")
+
+    def test_001_deferred_items(self):
+        """Test if items and edge positions are applied when the block exits."""
+        with self.scene.batch():
+            node1 = Node(self.scene, "flow meter")
+            node2 = Node(self.scene, "pump")
+            edge = Edge(self.scene, node1.sockets[1], node2.sockets[0])
+            node2.setPos(500, 300)
+            assert(node1.grNode.scene() is None)
+            assert(edge.grEdge.scene() is None)
+        assert(node1.grNode.scene() is self.scene.grScene)
+        assert(edge.grEdge.scene() is self.scene.grScene)
+        end_pos = node2.sockets[0].scenePos()
+        assert(edge.grEdge.posDestination == [end_pos.x(), end_pos.y()])
+
+    def test_002_deferred_history(self):
+        """Test if the block stores one history step and notifies once."""
+        calls = []
+        self.scene.addHasBeenModifiedListener(lambda: calls.append(1))
+        with self.scene.batch():
+            node = Node(self.scene, "flow meter")
+            self.scene.history.storeHistory("Add node", setModified=True)
+            node.setPos(100, 100)
+            self.scene.history.storeHistory("Move node", setModified=True)
+            assert(calls == [])
+        assert(calls == [1])
+        assert(len(self.scene.history.history_stack) == 2)
+        self.scene.history.undo()
+        assert(len(self.scene.nodes) == 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
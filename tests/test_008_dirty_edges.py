@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for updating only the edges of changed nodes."""
+
+import os
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge
+
+
+class TestDirtyEdges(unittest.TestCase):
+    """Tests for marking edges dirty and updating them once."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.node1 = Node(self.scene, "flow meter")
+        self.node2 = Node(self.scene, "flow meter")
+        self.node3 = Node(self.scene, "flow meter")
+        self.node2.setPos(1000, 0)
+        self.node3.setPos(0, 1000)
+        self.edge = Edge(self.scene, self.node1.sockets[1], self.node2.sockets[0])
+        self.other = Edge(self.scene, self.node3.sockets[1], self.node3.sockets[0])
+        self.scene.updateDirtyEdges()
+
+        self.updates = []
+        for edge in (self.edge, self.other):
+            original = edge.updatePositions
+            def updatePositions(edge=edge, original=original):
+                self.updates.append(edge)
+                original()
+            edge.updatePositions = updatePositions
+
+    def test_001_only_connected_edges(self):
+        """Test if rotating nodes updates only their edges, once per edge."""
+        self.node1.setRotation(90)
+        self.node2.setAbsoluteScale(2)
+        assert(self.updates == [])
+        self.scene.updateDirtyEdges()
+        assert(self.updates == [self.edge])
+        end_pos = self.node2.sockets[0].scenePos()
+        assert(self.edge.grEdge.posDestination == [end_pos.x(), end_pos.y()])
+
+    def wait(self, ms):
+        deadline = time.monotonic() + ms / 1000
+        while time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.001)
+
+    def test_002_next_frame(self):
+        """Test if changes in separate event loop turns within a frame update the dirty edges once, in the next frame."""
+        # 帧间隔放长，慢的机器上几次事件循环也在同一帧之内
+        self.scene._dirty_edges_timer.setInterval(200)
+        for angle in (15, 30, 45):
+            self.node1.setRotation(angle)
+            self.app.processEvents()
+        assert(self.updates == [])
+        self.wait(300)
+        assert(self.updates == [self.edge])
+        end_pos = self.node1.sockets[1].scenePos()
+        assert(self.edge.grEdge.posSource == [end_pos.x(), end_pos.y()])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the node type registry."""
+
+import os
+import sys
+import subprocess
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_graphics_node import QAbstractGraphicsNode
+from pyHydraulic.node_types import registerNodeType, unregisterNodeType, getNodeType, nodeTypeNames, \
+    NodeTypeNotRegistered
+
+
+class GraphicsNode_test_block(QAbstractGraphicsNode):
+    def __init__(self, node=None):
+        super().__init__(node)
+        self.width = 100
+        self.height = 100
+
+
+class TestNodeTypes(unittest.TestCase):
+    """Tests for registering node types and their metadata."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_001_builtin_metadata(self):
+        """Test if the metadata of built-in types matches their graphics classes."""
+        for name in nodeTypeNames():
+            type_info = getNodeType(name)
+            grNode = type_info.createGraphics(None)
+            if hasattr(grNode, 'timer'): grNode.timer.stop()
+            # 尺寸和socket只在登记表中
+            assert(not hasattr(grNode, 'socketInfo')), name
+            assert((type_info.width, type_info.height) == (grNode.width, grNode.height)), name
+            assert((type_info.unit, type_info.text) == (grNode.unit, grNode.text)), name
+            assert((type_info.value, type_info.minValue, type_info.maxValue) ==
+                   (grNode.value, grNode.minValue, grNode.maxValue)), name
+
+    def test_002_lazy_import(self):
+        """Test if component modules are imported on first use only."""
+        code = ("import sys; from pyHydraulic.node_scene import Scene; "
+                "print('pyHydraulic.node_graphics_valve' in sys.modules)")
+        output = subprocess.check_output([sys.executable, "-c", code], env=dict(os.environ))
+        assert(output.strip() == b"False")
+
+    def test_003_custom_type(self):
+        """Test if a registered type can be used by nodes."""
+        registerNodeType("test block", GraphicsNode_test_block, width=100, height=100,
+                         sockets=[(-50, 0, 1), (50, 0, 1)])
+        try:
+            node = Node(Scene(), "test block")
+            assert(isinstance(node.grNode, GraphicsNode_test_block))
+            assert(len(node.sockets) == 2)
+            assert(node.getSocketPosition(1) == [50, 0])
+        finally:
+            unregisterNodeType("test block")
+        self.assertRaises(NodeTypeNotRegistered, getNodeType, "test block")
+
+    def test_004_size_from_registry(self):
+        """Test if a built-in graphics class takes its size from the registered type."""
+        registerNodeType("big flow meter", "pyHydraulic.node_graphics_sensor:GraphicsNode_flow_meter",
+                         width=400, height=800, sockets=[(0, -400, 2), (0, 400, 2)], unit="mL")
+        try:
+            node = Node(Scene(), "big flow meter")
+            assert((node.grNode.width, node.grNode.height) == (400, 800))
+            assert(node.grNode.boundingRect().height() == 800)
+        finally:
+            unregisterNodeType("big flow meter")
+
+
+if __name__ == '__main__':
+    unittest.main()
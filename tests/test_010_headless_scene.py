@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the headless `Scene` model."""
+
+import os
+import sys
+import subprocess
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from pyHydraulic.node_scene import Scene
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), "..", "pyHydraulic", "hydraulicSketcher", "test.json")
+
+
+class TestHeadlessScene(unittest.TestCase):
+    """Tests for using scenes without graphics items."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_001_no_application(self):
+        """Test if a headless scene loads and saves without a QApplication or QtWidgets."""
+        code = ("import sys; from pyHydraulic.node_scene import Scene; from PyQt5.QtCore import QCoreApplication; "
+                "scene = Scene(headless=True); scene.loadFromFile(%r); "
+                "next(iter(scene.nodes)).setRotation(30); scene.serialize(); "
+                "print(len(scene.nodes), QCoreApplication.instance() is None, "
+                "'PyQt5.QtWidgets' in sys.modules, 'PyQt5.QtGui' in sys.modules)" % TEST_FILE)
+        output = subprocess.check_output([sys.executable, "-c", code], env=dict(os.environ))
+        assert(output.split()[-3:] == [b"True", b"False", b"False"])
+        assert(int(output.split()[-4]) > 0)
+
+    def test_002_same_data(self):
+        """Test if a headless scene serializes like a scene with graphics."""
+        headless = Scene(headless=True)
+        headless.loadFromFile(TEST_FILE)
+        normal = Scene()
+        normal.loadFromFile(TEST_FILE)
+        assert(not headless.hasGraphics())
+        assert(headless.serialize() == normal.serialize())
+
+    def test_003_attach_graphics(self):
+        """Test if graphics items can be created for a headless scene later."""
+        scene = Scene(headless=True)
+        scene.loadFromFile(TEST_FILE)
+        data = scene.serialize()
+        scene.attachGraphics()
+        assert(all(node.grNode.scene() is scene.grScene for node in scene.nodes))
+        assert(all(edge.grEdge.scene() is scene.grScene for edge in scene.edges))
+        assert(scene.serialize() == data)
+        assert(len(scene.history.history_stack) == 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the cached grid background of `QDMGraphicsScene`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtCore import QRectF
+
+from pyHydraulic.node_scene import Scene
+
+
+def render(grScene, source, size=200):
+    image = QImage(size, size, QImage.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    grScene.render(painter, QRectF(0, 0, size, size), source)
+    painter.end()
+    return image
+
+
+class TestGridBackground(unittest.TestCase):
+    """Tests for grid tiles cached per zoom band."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.grScene = Scene().grScene
+
+    def test_001_spacing(self):
+        """Test if grids too dense for the zoom are dropped or made coarser."""
+        assert(self.grScene.gridSpacing(1.0) == (50, 250))
+        assert(self.grScene.gridSpacing(0.05) == (None, 250))
+        assert(self.grScene.gridSpacing(0.001) == (None, 6250))
+
+    def test_002_tile_per_band(self):
+        """Test if a tile is rendered once per zoom band."""
+        render(self.grScene, QRectF(1000, 1000, 2000, 2000))
+        render(self.grScene, QRectF(5000, 3000, 1900, 1900))
+        assert(list(self.grScene._grid_cache) == [-3])
+        render(self.grScene, QRectF(1000, 1000, 200, 200))
+        assert(len(self.grScene._grid_cache) == 2)
+
+    def test_003_tiles_on_grid(self):
+        """Test if the tiles draw the grid lines at their scene positions."""
+        image = render(self.grScene, QRectF(1000, 1000, 1000, 1000), size=1000)
+        background = self.grScene._color_background
+        assert(image.pixelColor(500, 500) != background)
+        assert(image.pixelColor(525, 525) == background)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the zoom dependent painting of nodes."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtCore import QRectF
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_types import nodeTypeNames
+from pyHydraulic.node_graphics_node import NODE_LOD_BOX, NODE_LOD_OUTLINE, NODE_LOD_FULL
+
+
+def render(grScene, source, size=400):
+    image = QImage(size, size, QImage.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    grScene.render(painter, QRectF(0, 0, size, size), source)
+    painter.end()
+    return image
+
+
+class TestLevelOfDetail(unittest.TestCase):
+    """Tests for simplified node symbols at low zoom."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.nodes = []
+        for i, name in enumerate(nodeTypeNames()):
+            node = Node(self.scene, name)
+            node.setPos(i * 6000, 0)
+            self.nodes.append(node)
+        self.details = []
+        for node in self.nodes:
+            node.grNode.paintDetail = lambda *args, node=node: self.details.append(node)
+
+    def tearDown(self):
+        for node in self.nodes:
+            if hasattr(node.grNode, 'timer'): node.grNode.timer.stop()
+
+    def test_001_detail_level(self):
+        """Test if the detail level follows the size of the node on screen."""
+        grNode = self.nodes[0].grNode
+        size = max(grNode.width, grNode.height)
+        assert(grNode.detailLevel(1.0 / size) == NODE_LOD_BOX)
+        assert(grNode.detailLevel(10.0 / size) == NODE_LOD_OUTLINE)
+        assert(grNode.detailLevel(100.0 / size) == NODE_LOD_FULL)
+
+    def test_002_overview(self):
+        """Test if a zoomed out overview paints no node details."""
+        source = QRectF(-3000, -3000, 6000 * len(self.nodes), 6000 * len(self.nodes))
+        image = render(self.scene.grScene, source)
+        assert(self.details == [])
+        center = self.nodes[0].grNode.mapToScene(0, 0)
+        x = int((center.x() - source.left()) * image.width() / source.width())
+        y = int((center.y() - source.top()) * image.height() / source.height())
+        assert(image.pixelColor(x, y) == self.nodes[0].grNode._pen_default.color())
+
+        render(self.scene.grScene, QRectF(-3000, -3000, 60000, 60000))
+        assert(self.details == [])
+
+    def test_003_text_legible(self):
+        """Test if text is only legible when large enough on screen."""
+        grNode = self.nodes[0].grNode
+        render(self.scene.grScene, QRectF(-3000, -3000, 60000, 60000))
+        assert(not grNode.isTextLegible(50))
+        assert(grNode.isTextLegible(5000))
+
+
+if __name__ == '__main__':
+    unittest.main()
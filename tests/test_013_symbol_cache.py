@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the shared symbol cache of static nodes."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPainter, QColor
+from PyQt5.QtCore import Qt, QRectF
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_graphics_node import QAbstractGraphicsNode
+
+
+def render(grScene, source, size=400):
+    image = QImage(size, size, QImage.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    grScene.render(painter, QRectF(0, 0, size, size), source)
+    painter.end()
+    return image
+
+
+class TestSymbolCache(unittest.TestCase):
+    """Tests for painting static symbols from shared pixmaps."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        QAbstractGraphicsNode.clearSymbolCache()
+        self.scene = Scene()
+        self.pumps = []
+        for i in range(20):
+            node = Node(self.scene, "pump")
+            node.setPos((i % 5) * 400, (i // 5) * 700)
+            self.pumps.append(node)
+        # 记录真正的绘制次数
+        self.details = []
+        def paintDetail(grNode, painter, option, widget=None):
+            self.details.append(grNode)
+            painter.fillRect(QRectF(-100, -100, 200, 200), Qt.white)
+        self.paintDetail = type(self.pumps[0].grNode).paintDetail
+        type(self.pumps[0].grNode).paintDetail = paintDetail
+
+    def tearDown(self):
+        type(self.pumps[0].grNode).paintDetail = self.paintDetail
+        QAbstractGraphicsNode.clearSymbolCache()
+
+    def test_001_shared_pixmap(self):
+        """Test if identical nodes are rendered once per selection state and zoom band."""
+        source = QRectF(-300, -400, 2800, 2800)
+        render(self.scene.grScene, source)
+        render(self.scene.grScene, source)
+        assert(len(self.details) == 1)
+
+        self.pumps[0].grNode.setSelected(True)
+        render(self.scene.grScene, source)
+        assert(len(self.details) == 2)
+
+        render(self.scene.grScene, QRectF(-300, -400, 1400, 1400))
+        assert(len(self.details) == 4)
+
+    def test_002_replayed(self):
+        """Test if the cached symbol is drawn at the position of each node."""
+        image = render(self.scene.grScene, QRectF(-300, -400, 2800, 2800))
+        for node in self.pumps:
+            x = int((node.pos.x() + 300) * 400 / 2800)
+            y = int((node.pos.y() + 400) * 400 / 2800)
+            assert(image.pixelColor(x, y) == QColor(Qt.white))
+
+    def test_003_text_not_cached(self):
+        """Test if nodes showing their value are painted directly."""
+        self.pumps[0].grNode.textEnable = True
+        render(self.scene.grScene, QRectF(-300, -400, 2800, 2800))
+        assert(self.details.count(self.pumps[0].grNode) == 1)
+        assert(len(self.details) == 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
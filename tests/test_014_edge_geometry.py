@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the cached geometry of `QDMGraphicsEdge`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtCore import QPointF, QRectF
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge, EDGE_TYPE_DIRECT
+
+
+class TestEdgeGeometry(unittest.TestCase):
+    """Tests for computing edge paths only when their ends move."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.node1 = Node(self.scene, "flow meter")
+        self.node2 = Node(self.scene, "flow meter")
+        self.node2.setPos(2000, 0)
+        self.edge = Edge(self.scene, self.node1.sockets[1], self.node2.sockets[0], EDGE_TYPE_DIRECT)
+        self.scene.updateDirtyEdges()
+
+        self.calls = []
+        grEdge = self.edge.grEdge
+        grEdge.boundingRect()
+        calcPath = grEdge.calcPath
+        def countedCalcPath():
+            self.calls.append(1)
+            return calcPath()
+        grEdge.calcPath = countedCalcPath
+
+    def test_001_computed_once(self):
+        """Test if painting and hit tests reuse the path until an end moves."""
+        grEdge = self.edge.grEdge
+        image = QImage(200, 200, QImage.Format_ARGB32)
+        painter = QPainter(image)
+        self.scene.grScene.render(painter, QRectF(0, 0, 200, 200), QRectF(-100, -100, 2200, 2200))
+        painter.end()
+        grEdge.boundingRect()
+        grEdge.shape()
+        grEdge.intersectsWith(QPointF(1000, -500), QPointF(1000, 1000))
+        assert(self.calls == [])
+
+        grEdge.setSource(0, 100)
+        grEdge.setDestination(1000, 100)
+        grEdge.boundingRect()
+        grEdge.shape()
+        assert(self.calls == [1])
+
+    def test_002_index_follows_moves(self):
+        """Test if the scene finds the edge at its new position after a move."""
+        assert(self.edge.grEdge in self.scene.grScene.items(QPointF(1000, 5)))
+        self.node1.setPos(0, 5000)
+        self.node2.setPos(2000, 5000)
+        self.node1.updateConnectedEdges()
+        self.node2.updateConnectedEdges()
+        start = self.node1.sockets[1].scenePos()
+        end = self.node2.sockets[0].scenePos()
+        middle = (start + end) / 2
+        assert(self.edge.grEdge in self.scene.grScene.items(middle + QPointF(0, 5)))
+        assert(self.edge.grEdge not in self.scene.grScene.items(QPointF(1000, 200)))
+
+    def test_003_intersects(self):
+        """Test if cut lines only intersect edges they cross."""
+        start = self.node1.sockets[1].scenePos()
+        end = self.node2.sockets[0].scenePos()
+        middle = (start + end) / 2
+        assert(self.edge.grEdge.intersectsWith(middle + QPointF(-300, -300), middle + QPointF(300, 300)))
+        assert(not self.edge.grEdge.intersectsWith(middle + QPointF(0, 300), middle + QPointF(300, 600)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the rendering profiles of `QDMGraphicsView`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QGraphicsView
+from PyQt5.QtGui import QPainter
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_graphics_view import QDMGraphicsView, RENDER_PROFILES, RENDER_PROFILE_QUALITY, \
+    RENDER_PROFILE_BALANCED, RENDER_PROFILE_PERFORMANCE
+
+
+class TestRenderProfiles(unittest.TestCase):
+    """Tests for choosing and switching rendering quality."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.view = QDMGraphicsView(self.scene.grScene)
+
+    def test_001_profiles(self):
+        """Test if profiles set the update mode, cache mode and render hints."""
+        assert(self.view.render_profile == RENDER_PROFILE_QUALITY)
+        assert(self.view.viewportUpdateMode() == QGraphicsView.FullViewportUpdate)
+        assert(self.view.renderHints() & QPainter.Antialiasing)
+
+        self.view.setRenderProfile(RENDER_PROFILE_PERFORMANCE)
+        assert(self.view.viewportUpdateMode() == RENDER_PROFILES[RENDER_PROFILE_PERFORMANCE]['update_mode'])
+        assert(self.view.cacheMode() == QGraphicsView.CacheBackground)
+        assert(not self.view.renderHints() & QPainter.Antialiasing)
+
+        self.view.setRenderProfile("unknown")
+        assert(self.view.render_profile == RENDER_PROFILE_PERFORMANCE)
+
+    def test_002_interaction(self):
+        """Test if antialiasing is dropped while panning and restored afterwards."""
+        self.view.setRenderProfile(RENDER_PROFILE_BALANCED)
+        self.view.horizontalScrollBar().setValue(self.view.horizontalScrollBar().value() + 100)
+        assert(self.view.isInteracting())
+        assert(not self.view.renderHints() & QPainter.Antialiasing)
+
+        self.view.interactionFinished()
+        assert(not self.view.isInteracting())
+        assert(self.view.renderHints() & QPainter.Antialiasing)
+
+    def test_003_quality_keeps_hints(self):
+        """Test if the quality profile keeps antialiasing while panning."""
+        self.view.interactionStarted()
+        assert(self.view.renderHints() & QPainter.Antialiasing)
+        self.view.interactionFinished()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the smooth zoom of `QDMGraphicsView`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QWheelEvent
+from PyQt5.QtCore import Qt, QPoint, QPointF
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_graphics_view import QDMGraphicsView
+
+
+def wheel(view, pos, delta=120):
+    event = QWheelEvent(QPointF(pos), QPointF(view.viewport().mapToGlobal(pos)), QPoint(0, 0), QPoint(0, delta),
+                        Qt.NoButton, Qt.NoModifier, Qt.NoScrollPhase, False)
+    view.wheelEvent(event)
+
+
+class TestSmoothZoom(unittest.TestCase):
+    """Tests for animating a snapshot while the wheel turns."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.view = QDMGraphicsView(self.scene.grScene)
+        self.view.resize(400, 400)
+        self.view.zoom = 3
+        self.view.show()
+        self.renders = []
+        drawBackground = self.scene.grScene.drawBackground
+        def countedDrawBackground(painter, rect):
+            self.renders.append(rect)
+            drawBackground(painter, rect)
+        self.scene.grScene.drawBackground = countedDrawBackground
+
+    def tearDown(self):
+        self.view.close()
+
+    def test_001_snapshot_during_gesture(self):
+        """Test if the view is only scaled once when the gesture settles."""
+        self.view.repaint()
+        del self.renders[:]
+        anchor = QPoint(100, 150)
+        wheel(self.view, anchor)
+        # 截图是当前画面的唯一一次绘制
+        assert(len(self.renders) <= 1)
+        del self.renders[:]
+        wheel(self.view, anchor)
+        wheel(self.view, anchor)
+        assert(self.view.isSmoothZooming())
+        assert(self.view.transform().m11() == 1.0)
+        self.view.repaint()
+        assert(self.renders == [])
+
+        self.view.finishSmoothZoom()
+        assert(not self.view.isSmoothZooming())
+        self.assertAlmostEqual(self.view.transform().m11(), 1.25 ** 3)
+
+    def test_002_anchor(self):
+        """Test if the scene point under the mouse stays under the mouse."""
+        anchor = QPoint(100, 150)
+        scene_anchor = self.view.mapToScene(anchor)
+        wheel(self.view, anchor, -120)
+        wheel(self.view, anchor, -120)
+        self.view.finishSmoothZoom()
+        self.assertAlmostEqual(self.view.transform().m11(), 1.25 ** -2)
+        offset = self.view.mapFromScene(scene_anchor) - anchor
+        assert(offset.manhattanLength() <= 2)
+
+    def test_003_immediate(self):
+        """Test if zooming without smooth zoom scales at once."""
+        self.view.smoothZoom = False
+        wheel(self.view, QPoint(100, 150))
+        assert(not self.view.isSmoothZooming())
+        self.assertAlmostEqual(self.view.transform().m11(), 1.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the shared animation clock of `QDMGraphicsScene`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_graphics_view import QDMGraphicsView
+
+
+class TestAnimationClock(unittest.TestCase):
+    """Tests for ticking only visible animated nodes."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.grScene = self.scene.grScene
+        self.near = Node(self.scene, "tank")
+        self.far = Node(self.scene, "tank")
+        self.far.setPos(100000, 100000)
+        self.pump = Node(self.scene, "pump")
+        self.view = QDMGraphicsView(self.grScene)
+        self.view.resize(400, 400)
+        self.view.centerOn(0, 0)
+
+    def tearDown(self):
+        self.view.close()
+
+    def test_001_subscriptions(self):
+        """Test if only animated nodes subscribe and removed nodes unsubscribe."""
+        assert(self.grScene._animated_items == {self.near.grNode, self.far.grNode})
+        self.far.remove()
+        assert(self.grScene._animated_items == {self.near.grNode})
+        self.scene.clear()
+        assert(self.grScene._animated_items == set())
+
+    def test_002_visible_only(self):
+        """Test if the clock runs while shown and ticks only visible nodes."""
+        assert(not self.grScene._animation_timer.isActive())
+        self.view.show()
+        assert(self.grScene._animation_timer.isActive())
+
+        self.grScene.animationTick()
+        assert(self.near.grNode.t > 0)
+        assert(self.far.grNode.t == 0)
+
+        self.near.grNode.setVisible(False)
+        t = self.near.grNode.t
+        self.grScene.animationTick()
+        assert(self.near.grNode.t == t)
+
+    def test_003_paused(self):
+        """Test if the clock stops when the view is hidden or minimized."""
+        self.view.show()
+        self.view.showMinimized()
+        assert(not self.grScene._animation_timer.isActive())
+        self.view.showNormal()
+        assert(self.grScene._animation_timer.isActive())
+        self.view.hide()
+        assert(not self.grScene._animation_timer.isActive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the shared wave geometry of `GraphicsNode_tank`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtCore import QRectF
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+
+
+def render(grScene, source, size=400):
+    image = QImage(size, size, QImage.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    grScene.render(painter, QRectF(0, 0, size, size), source)
+    painter.end()
+    return image
+
+
+class TestTankWaves(unittest.TestCase):
+    """Tests for drawing tank waves from one precomputed polygon."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.tank1 = Node(self.scene, "tank").grNode
+        self.tank2 = Node(self.scene, "tank").grNode
+        self.tank2.setPos(2000, 0)
+
+    def test_001_shared(self):
+        """Test if tanks of equal size share one polygon across ticks."""
+        polygon = self.tank1.wavePolygon()
+        self.tank1.animationStep(0.1)
+        self.tank2.value = 80
+        assert(self.tank1.wavePolygon() is polygon)
+        assert(self.tank2.wavePolygon() is polygon)
+
+    def test_002_level(self):
+        """Test if the water is drawn below the level and clipped to the tank."""
+        self.tank1.textEnable = False
+        self.tank1.value = 50
+        self.tank1.animationStep(1.3)
+        background = self.scene.grScene._color_background
+        # 1个像素对应2.5个scene单位，油箱中心在(0, 0)
+        image = render(self.scene.grScene, QRectF(-500, -500, 1000, 1000))
+        y_deep = self.tank1.height / 2 - self.tank1._percent * self.tank1.height * 3 / 4 - self.tank1._amplitude
+        margin = 2 * self.tank1._amplitude
+        # 避开网格线
+        x = int((120 + 500) / 2.5)
+        assert(image.pixelColor(x, int((y_deep + margin + 500) / 2.5)) != background)
+        assert(image.pixelColor(x, int((y_deep - margin + 500) / 2.5)) == background)
+
+
+if __name__ == '__main__':
+    unittest.main()
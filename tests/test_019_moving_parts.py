@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the moving parts of animated nodes."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPainter, QTransform
+from PyQt5.QtCore import QRectF
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_graphics_node import QAbstractGraphicsNode
+
+
+def render(grScene, source, size=400):
+    image = QImage(size, size, QImage.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    grScene.render(painter, QRectF(0, 0, size, size), source)
+    painter.end()
+    return image
+
+
+class TestMovingParts(unittest.TestCase):
+    """Tests for moving sub-items instead of repainting whole nodes."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        QAbstractGraphicsNode.clearSymbolCache()
+        self.scene = Scene()
+        self.valve = Node(self.scene, "servo valve").grNode
+        self.gauge = Node(self.scene, "gauge").grNode
+        self.gauge.setPos(5000, 0)
+        self.app.processEvents()
+
+    def tearDown(self):
+        QAbstractGraphicsNode.clearSymbolCache()
+
+    def test_001_parts_follow_value(self):
+        """Test if value changes move the spool and turn the needle."""
+        self.valve.value = 100
+        assert(self.valve._spool.pos().x() == self.valve.width / 5)
+        assert(self.valve._arrow_left.parentItem() is self.valve._spool)
+        self.gauge.value = self.gauge.maxValue
+        assert(self.gauge._needle.rotation() == 300)
+
+    def test_002_dirty_region(self):
+        """Test if a gauge value change only invalidates the needle and the text."""
+        rects = []
+        self.scene.grScene.changed.connect(rects.extend)
+        # 新加入的控件第一次变化时整个控件都要画
+        self.gauge.value = 5
+        self.app.processEvents()
+        del rects[:]
+        self.gauge.value = 10
+        self.app.processEvents()
+        area = sum(rect.width() * rect.height() for rect in rects)
+        bounds = self.gauge.sceneBoundingRect()
+        assert(rects and area < bounds.width() * bounds.height() / 2)
+
+    def test_003_body_cached(self):
+        """Test if the static body is not repainted when only the value changes."""
+        calls = []
+        paintDetail = type(self.gauge).paintDetail
+        paintNeedle = type(self.gauge).paintNeedle
+        self.gauge.paintDetail = lambda *args: calls.append('body') or paintDetail(self.gauge, *args)
+        self.gauge._needle._paint_function = lambda painter: calls.append('needle') or paintNeedle(self.gauge, painter)
+        source = QRectF(4700, -350, 700, 700)
+        render(self.scene.grScene, source)
+        self.gauge.value = 20
+        render(self.scene.grScene, source)
+        assert(calls == ['body', 'needle', 'needle'])
+
+    def test_004_click_selects_node(self):
+        """Test if clicking on a moving part finds the node."""
+        item = self.scene.grScene.itemAt(self.valve._spool.sceneBoundingRect().center(), QTransform())
+        assert(item is self.valve)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the headless batch export in `node_scene_export`."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage
+
+from pyHydraulic.node_scene_export import ExportOptions, ExportError, loadScene, exportScene, exportFiles
+from pyHydraulic.hydraulicSketcher.hydraulicExport import run
+
+DIAGRAM = os.path.join(os.path.dirname(__file__), "..", "pyHydraulic", "hydraulicSketcher", "test.json")
+
+
+class TestBatchExport(unittest.TestCase):
+    """Tests for rendering saved diagrams to files without a window."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+        cls.scene = loadScene(DIAGRAM, ExportOptions(grid=False))
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def test_001_tiles_match_whole(self):
+        """Test if an image composed of tiles matches the image rendered in one tile."""
+        options = ExportOptions(scale=0.1, tile_size=100000)
+        exportScene(self.scene, self.path("whole.png"), options)
+        options.tile_size = 64
+        exportScene(self.scene, self.path("tiled.png"), options)
+        whole = QImage(self.path("whole.png"))
+        tiled = QImage(self.path("tiled.png"))
+        assert(whole.size() == tiled.size() and whole.width() > 64 and whole.height() > 64)
+        # 抗锯齿的斜线在不同的平移下个别像素略有差别
+        different = sum(whole.pixel(x, y) != tiled.pixel(x, y) for y in range(whole.height()) for x in range(whole.width()))
+        assert(different < whole.width() * whole.height() / 200)
+
+    def test_002_tile_files(self):
+        """Test if an oversized image is written as separate tile files."""
+        options = ExportOptions(scale=0.1, tile_size=64, max_image_pixels=64 * 64)
+        written = exportScene(self.scene, self.path("big.png"), options)
+        assert(len(written) > 1 and self.path("big_0_0.png") in written)
+        assert(all(QImage(filename).width() <= 64 for filename in written))
+        assert(not os.path.exists(self.path("big.png")))
+
+    def test_003_vector(self):
+        """Test if SVG and PDF files are written and unknown formats are rejected."""
+        for name in ("scene.svg", "scene.pdf"):
+            assert(exportScene(self.scene, self.path(name)) == [self.path(name)])
+            assert(os.path.getsize(self.path(name)) > 0)
+        with self.assertRaises(ExportError):
+            exportScene(self.scene, self.path("scene.bmp"))
+
+    def test_004_processes(self):
+        """Test if several processes give the same image and report broken files."""
+        bad = self.path("bad.json")
+        with open(bad, "w") as file: file.write("{")
+        options = ExportOptions(scale=0.1, tile_size=64, grid=False)
+        exportScene(self.scene, self.path("single.png"), options)
+        results = exportFiles([DIAGRAM, bad], self.dir, 'png', options, processes=2)
+        assert(results[DIAGRAM] == [self.path("test.png")])
+        assert(isinstance(results[bad], Exception))
+        assert(QImage(self.path("test.png")) == QImage(self.path("single.png")))
+
+    def test_005_command_line(self):
+        """Test if the command line entry point writes the files and reports failures."""
+        assert(run(["-f", "svg", "-o", self.dir, DIAGRAM]) == 0)
+        assert(os.path.exists(self.path("test.svg")))
+        assert(run(["-o", self.dir, self.path("missing.json")]) == 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
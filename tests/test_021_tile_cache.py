@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the static content tile cache of `QDMGraphicsView`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QThreadPool
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge
+from pyHydraulic.node_graphics_view import QDMGraphicsView
+
+
+class TestTileCache(unittest.TestCase):
+    """Tests for blitting static items from tiles and drawing dynamic items on top."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.scene.setBackgroundColor(self.scene.grScene._color_background, False)
+        # 每次绘制都调用paintDetail，方便计数
+        self.scene.grScene.symbolCacheEnabled = False
+        self.valve = Node(self.scene, "servo valve")
+        self.gauge = Node(self.scene, "gauge")
+        self.gauge.setPos(0, 1000)
+        self.tank = Node(self.scene, "tank")
+        self.tank.setPos(3000, 0)
+        self.view = QDMGraphicsView(self.scene.grScene)
+        self.view.resize(400, 400)
+        self.view.scale(0.2, 0.2)
+        self.view.centerOn(0, 500)
+        self.view.show()
+        self.settle()
+
+    def tearDown(self):
+        self.view.setTileCacheEnabled(False)
+        self.view.close()
+        self.settle()
+
+    def settle(self):
+        for i in range(3):
+            self.app.processEvents()
+            QThreadPool.globalInstance().waitForDone()
+        self.app.processEvents()
+
+    def grab(self):
+        return self.view.viewport().grab().toImage()
+
+    def countPaints(self, grNode):
+        calls = []
+        paintDetail = type(grNode).paintDetail
+        grNode.paintDetail = lambda *args: calls.append(1) or paintDetail(grNode, *args)
+        return calls
+
+    def test_001_same_image(self):
+        """Test if the view looks the same with and without tiles."""
+        direct = self.grab()
+        self.view.setTileCacheEnabled(True)
+        tiled = self.grab()
+        different = sum(direct.pixel(x, y) != tiled.pixel(x, y) for y in range(direct.height()) for x in range(direct.width()))
+        assert(different < direct.width() * direct.height() / 100)
+
+    def test_002_pan_blits(self):
+        """Test if panning onto prefetched tiles does not repaint static items."""
+        self.view.setTileCacheEnabled(True)
+        self.grab()
+        self.settle()
+        assert(len(self.view.tileCache._tiles) > 4)
+        calls = self.countPaints(self.valve.grNode)
+        self.view.horizontalScrollBar().setValue(self.view.horizontalScrollBar().value() + 100)
+        self.grab()
+        assert(calls == [])
+
+    def test_003_invalidate(self):
+        """Test if changing a static node redraws only its tiles and animations redraw none."""
+        self.view.setTileCacheEnabled(True)
+        # 新加入的控件第一次变化时整个控件都要画
+        self.tank.grNode.animationStep(0.5)
+        self.settle()
+        self.grab()
+        self.settle()
+        cache = self.view.tileCache
+        recorded = []
+        recordTile = cache.recordTile
+        cache.recordTile = lambda key: recorded.append(key) or recordTile(key)
+
+        self.tank.grNode.animationStep(0.5)
+        self.settle()
+        self.grab()
+        assert(recorded == [])
+
+        self.gauge.grNode.value = 20
+        self.settle()
+        self.grab()
+        rect = self.gauge.grNode.sceneBoundingRect()
+        assert(recorded and all(cache.tileSceneRect(key, 2).intersects(rect) for key in recorded))
+
+    def test_004_selected_drawn_live(self):
+        """Test if a selected node is painted by the view and back in the tiles after deselecting."""
+        self.view.setTileCacheEnabled(True)
+        self.grab()
+        calls = self.countPaints(self.valve.grNode)
+        self.valve.grNode.setSelected(True)
+        self.grab()
+        assert(not self.view.tileCache.isCacheable(self.valve.grNode))
+        self.grab()
+        live = len(calls)
+        assert(live >= 2)
+        # 取消选中后重新画进所在的分块，以后不再画
+        self.valve.grNode.setSelected(False)
+        self.grab()
+        assert(self.view.tileCache.isCacheable(self.valve.grNode))
+        recorded = len(calls)
+        assert(recorded > live)
+        self.grab()
+        assert(len(calls) == recorded)
+
+    def test_005_selection_sets(self):
+        """Test if the dynamic items come from the scene's selection sets and painting does not query the selected items."""
+        edge = Edge(self.scene, self.valve.sockets[0], self.tank.sockets[0])
+        other = Edge(self.scene, self.valve.sockets[1], self.gauge.sockets[0])
+        self.scene.updateDirtyEdges()
+        self.view.setTileCacheEnabled(True)
+        self.valve.grNode.setSelected(True)
+        self.grab()
+        cache = self.view.tileCache
+        animated = set(self.scene.grScene._animated_items)
+        assert(cache.dynamicItems() == animated | {self.valve.grNode, edge.grEdge, other.grEdge})
+        self.valve.grNode.setSelected(False)
+        edge.grEdge.setSelected(True)
+        assert(cache.dynamicItems() == animated | {edge.grEdge})
+        self.grab()
+
+        queries = []
+        selectedItems = self.scene.grScene.selectedItems
+        self.scene.grScene.selectedItems = lambda: queries.append(1) or selectedItems()
+        self.grab()
+        self.grab()
+        assert(queries == [])
+
+
+if __name__ == '__main__':
+    unittest.main()
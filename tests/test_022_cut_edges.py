@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for cutting edges with the cut line of `QDMGraphicsView`."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QPointF
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge
+from pyHydraulic.node_graphics_edge import QDMGraphicsEdge
+from pyHydraulic.node_graphics_view import QDMGraphicsView
+from pyHydraulic.node_graphics_cutline import simplifyPolyline
+
+
+class TestCutEdges(unittest.TestCase):
+    """Tests for simplifying the cut line and cutting only the crossed edges."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.edges = []
+        for row in range(5):
+            for col in range(4):
+                start = Node(self.scene, "flow meter")
+                end = Node(self.scene, "flow meter")
+                start.setPos(col * 2000, row * 1000)
+                end.setPos(col * 2000 + 1000, row * 1000)
+                self.edges.append(Edge(self.scene, start.sockets[1], end.sockets[0]))
+        self.scene.updateDirtyEdges()
+        self.view = QDMGraphicsView(self.scene.grScene)
+
+    def tearDown(self):
+        self.view.close()
+
+    # 在x=500附近画一条抖动的竖线，穿过前三行第一列的edge
+    def drawCutLine(self, top=-300, bottom=2300):
+        for i in range(201):
+            y = top + (bottom - top) * i / 200
+            self.view.cutline.addPoint(QPointF(500 + (i % 2) * 0.2, y))
+
+    def test_001_simplify(self):
+        """Test if simplifying keeps the corners and drops the points in between."""
+        points = [QPointF(x, 0) for x in range(10)] + [QPointF(9, y) for y in range(1, 10)]
+        simplified = simplifyPolyline(points, 1)
+        assert(simplified == [QPointF(0, 0), QPointF(9, 0), QPointF(9, 9)])
+        self.drawCutLine()
+        assert(len(self.view.cutline.simplifiedPoints()) < 5)
+
+    def test_002_cut_crossed_edges(self):
+        """Test if only the crossed edges are cut and only candidates are tested exactly."""
+        tested = []
+        intersectsWith = QDMGraphicsEdge.intersectsWith
+        QDMGraphicsEdge.intersectsWith = lambda grEdge, p1, p2: tested.append(grEdge) or intersectsWith(grEdge, p1, p2)
+        try:
+            self.drawCutLine()
+            self.view.cutIntersectingEdges()
+        finally:
+            QDMGraphicsEdge.intersectsWith = intersectsWith
+        cut = [self.edges[row * 4] for row in range(3)]
+        assert(all(edge not in self.scene.edges for edge in cut))
+        assert(len(self.scene.edges) == len(self.edges) - 3)
+        assert(len(tested) < len(self.edges))
+
+    def test_003_history(self):
+        """Test if a cut stores one history entry and a miss stores none."""
+        history = self.scene.history
+        history.storeHistory("Initial")
+        self.drawCutLine(3300, 3600)
+        self.view.cutIntersectingEdges()
+        assert(len(history.history_stack) == 1)
+        self.view.cutline.clear()
+        self.drawCutLine()
+        self.view.cutIntersectingEdges()
+        assert(len(history.history_stack) == 2)
+        history.undo()
+        assert(len(self.scene.edges) == len(self.edges))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for updating only the edges of dragged nodes, once per frame."""
+
+import os
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt, QEvent, QPoint, QPointF
+from PyQt5.QtGui import QMouseEvent
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge
+from pyHydraulic.node_graphics_view import QDMGraphicsView
+
+
+class TestDragSession(unittest.TestCase):
+    """Tests for collecting the edges of the selection when a drag starts."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.dragged = Node(self.scene, "flow meter")
+        self.neighbour = Node(self.scene, "flow meter")
+        self.neighbour.setPos(1000, 0)
+        self.edge = Edge(self.scene, self.dragged.sockets[1], self.neighbour.sockets[0])
+        self.others = []
+        for i in range(10):
+            start = Node(self.scene, "flow meter")
+            end = Node(self.scene, "flow meter")
+            start.setPos(i * 2000, 3000)
+            end.setPos(i * 2000 + 1000, 3000)
+            self.others.append(Edge(self.scene, start.sockets[1], end.sockets[0]))
+        self.scene.updateDirtyEdges()
+
+        self.updates = []
+        for edge in [self.edge] + self.others:
+            original = edge.updatePositions
+            def updatePositions(edge=edge, original=original):
+                self.updates.append(edge)
+                original()
+            edge.updatePositions = updatePositions
+
+        self.view = QDMGraphicsView(self.scene.grScene)
+        self.view.resize(400, 400)
+        self.view.scale(0.2, 0.2)
+        self.view.centerOn(0, 0)
+        self.view.show()
+        self.app.processEvents()
+
+    def tearDown(self):
+        self.view.close()
+
+    def event(self, type, pos, button, buttons):
+        viewport = self.view.viewport()
+        return QMouseEvent(type, QPointF(pos), QPointF(viewport.mapToGlobal(pos)), button, buttons, Qt.NoModifier)
+
+    # 像真的鼠标一样，每个事件在事件循环中单独处理
+    def post(self, type, pos, button, buttons):
+        QApplication.postEvent(self.view.viewport(), self.event(type, pos, button, buttons))
+        self.app.processEvents()
+
+    def wait(self, ms):
+        deadline = time.monotonic() + ms / 1000
+        while time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.001)
+
+    def test_001_once_per_frame(self):
+        """Test if moves in separate event loop turns within a frame update the dragged edges once and other edges never."""
+        # 帧间隔放长，慢的机器上几次鼠标事件也在同一帧之内
+        self.scene._dirty_edges_timer.setInterval(200)
+        pos = self.view.mapFromScene(QPointF(0, 0))
+        self.post(QEvent.MouseButtonPress, pos, Qt.LeftButton, Qt.LeftButton)
+        for i in range(1, 6):
+            self.post(QEvent.MouseMove, pos + QPoint(10 * i, 0), Qt.NoButton, Qt.LeftButton)
+        assert(self.dragged.grNode.pos().x() > 0)
+        assert(self.updates == [])
+        self.wait(300)
+        assert(self.updates == [self.edge])
+
+        self.post(QEvent.MouseMove, pos + QPoint(60, 0), Qt.NoButton, Qt.LeftButton)
+        self.post(QEvent.MouseButtonRelease, pos + QPoint(60, 0), Qt.LeftButton, Qt.NoButton)
+        # 松开鼠标时马上更新到最后的位置，存入历史记录
+        assert(self.updates == [self.edge, self.edge])
+        assert(len(self.scene.history.history_stack) == 1)
+        self.wait(300)
+        assert(self.updates == [self.edge, self.edge])
+
+    def test_002_selection(self):
+        """Test if the edges of every selected node are collected once when the drag starts."""
+        for edge in self.others[:3]: edge.start_socket.node.grNode.setSelected(True)
+        self.dragged.grNode.setSelected(True)
+        self.scene.dragMoved()
+        self.scene.dragMoved()
+        assert(set(self.scene._drag_edges) == {self.edge} | set(self.others[:3]))
+        self.scene.endDrag()
+        assert(sorted(map(id, self.updates)) == sorted(map(id, [self.edge] + self.others[:3])))
+        assert(self.scene._drag_edges is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for coalescing the mouse position and selection signals of `QDMGraphicsView`."""
+
+import os
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt, QObject, QEvent, QPoint, QPointF, pyqtSignal
+from PyQt5.QtGui import QMouseEvent
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_graphics_view import QDMGraphicsView
+from pyHydraulic.utils import CoalescedSignal
+
+
+class Sender(QObject):
+    changed = pyqtSignal(int, int)
+
+
+class TestCoalescedSignals(unittest.TestCase):
+    """Tests for emitting at most once per frame and skipping repeated values."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def wait(self, ms):
+        deadline = time.monotonic() + ms / 1000
+        while time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.001)
+
+    def send(self, view, type, pos, button, buttons):
+        viewport = view.viewport()
+        event = QMouseEvent(type, QPointF(pos), QPointF(viewport.mapToGlobal(pos)), button, buttons, Qt.NoModifier)
+        QApplication.sendEvent(viewport, event)
+
+    def test_001_coalesce(self):
+        """Test if the first value is emitted at once and the rest once per frame, skipping repeats."""
+        sender = Sender()
+        received = []
+        sender.changed.connect(lambda x, y: received.append((x, y)))
+        coalesced = CoalescedSignal(sender.changed, 20)
+        for i in range(100): coalesced.post(i, 0)
+        assert(received == [(0, 0)])
+        self.wait(60)
+        assert(received == [(0, 0), (99, 0)])
+        coalesced.post(99, 0)
+        self.wait(60)
+        assert(received == [(0, 0), (99, 0)])
+        coalesced.post(1, 1)
+        assert(received == [(0, 0), (99, 0), (1, 1)])
+
+    def test_002_view(self):
+        """Test if many mouse moves and repeated clicks give few notifications."""
+        scene = Scene()
+        node = Node(scene, "flow meter")
+        view = QDMGraphicsView(scene.grScene)
+        view.resize(400, 400)
+        view.scale(0.2, 0.2)
+        view.centerOn(0, 0)
+        view.show()
+        self.app.processEvents()
+        positions, selections = [], []
+        view.scenePosChanged.connect(lambda x, y: positions.append((x, y)))
+        view.sceneItemSelected.connect(lambda name, id: selections.append((name, id)))
+
+        pos = view.mapFromScene(QPointF(0, 0))
+        for i in range(100): self.send(view, QEvent.MouseMove, pos + QPoint(i % 50, 0), Qt.NoButton, Qt.NoButton)
+        assert(len(positions) == 1)
+        self.wait(60)
+        assert(len(positions) == 2 and positions[-1] == (int(view.mapToScene(pos + QPoint(49, 0)).x()), 0))
+
+        for i in range(3):
+            self.send(view, QEvent.MouseButtonPress, pos, Qt.LeftButton, Qt.LeftButton)
+            self.send(view, QEvent.MouseButtonRelease, pos, Qt.LeftButton, Qt.NoButton)
+        self.wait(60)
+        assert(len(selections) == 1 and selections[0][0] == node._node_type)
+        QApplication.restoreOverrideCursor()
+        view.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
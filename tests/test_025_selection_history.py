@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the selection set of `Scene` and selection-only history entries."""
+
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from pyHydraulic.node_scene import Scene
+from pyHydraulic.node_node import Node
+from pyHydraulic.node_edge import Edge
+from pyHydraulic.node_graphics_view import QDMGraphicsView
+
+
+class TestSelectionHistory(unittest.TestCase):
+    """Tests for collecting the selection once and storing it without serializing objects."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scene = Scene()
+        self.nodes = []
+        for i in range(20):
+            node = Node(self.scene, "flow meter")
+            node.setPos(i * 1000, 0)
+            self.nodes.append(node)
+        self.edge = Edge(self.scene, self.nodes[0].sockets[1], self.nodes[1].sockets[0])
+        self.scene.updateDirtyEdges()
+        self.view = QDMGraphicsView(self.scene.grScene)
+        self.scene.history.storeHistory("Initial")
+
+        self.collected = []
+        selectedItems = self.scene.grScene.selectedItems
+        self.scene.grScene.selectedItems = lambda: self.collected.append(1) or selectedItems()
+
+    def tearDown(self):
+        self.view.close()
+
+    def test_001_selection_set(self):
+        """Test if the selection is collected once after many changes and follows removals."""
+        for node in self.nodes[:10]: node.grNode.setSelected(True)
+        self.edge.grEdge.setSelected(True)
+        assert(self.collected == [])
+        assert(set(self.scene.selected_nodes) == set(self.nodes[:10]))
+        assert(self.scene.selected_edges == [self.edge])
+        assert(set(self.scene.selected_nodes) == set(self.nodes[:10]))
+        assert(len(self.collected) == 1)
+
+        self.nodes[0].remove()
+        assert(set(self.scene.selected_nodes) == set(self.nodes[1:10]))
+        assert(self.scene.selected_edges == [])
+
+    def test_002_selection_entry(self):
+        """Test if a selection entry stores only ids and undo restores the selection."""
+        serialized = []
+        for node in self.nodes:
+            serialize = node.serialize
+            node.serialize = lambda serialize=serialize: serialized.append(1) or serialize()
+        history = self.scene.history
+        self.nodes[3].grNode.setSelected(True)
+        history.storeSelection("Selection changed")
+        self.nodes[4].grNode.setSelected(True)
+        history.storeSelection("Selection changed")
+        assert(serialized == [])
+        stamp = history.history_stack[-1]
+        assert(stamp['nodes'] == [] and stamp['edges'] == [])
+        assert(sorted(stamp['selection']['nodes']) == sorted([self.nodes[3].id, self.nodes[4].id]) and stamp['selection']['edges'] == [])
+
+        history.undo()
+        assert(self.scene.selected_nodes == [self.nodes[3]])
+        history.redo()
+        assert(set(self.scene.selected_nodes) == {self.nodes[3], self.nodes[4]})
+
+    def test_003_pending_changes(self):
+        """Test if a selection entry keeps unstored changes in its own step."""
+        history = self.scene.history
+        self.nodes[5].setPos(100, 5000)
+        self.nodes[5].grNode.setSelected(True)
+        history.storeSelection("Selection changed")
+        assert(len(history.history_stack[-1]['nodes']) == 1)
+        history.undo()
+        assert(self.nodes[5].grNode.pos().y() == 0)
+
+    def test_004_delete_and_copy(self):
+        """Test if copying and deleting use the selection set."""
+        for node in self.nodes[:2]: node.grNode.setSelected(True)
+        self.edge.grEdge.setSelected(True)
+        data = self.scene.clipboard.serializeSelected()
+        assert(len(data['nodes']) == 2 and len(data['edges']) == 1)
+        self.view.deleteSelected()
+        assert(len(self.scene.nodes) == 18 and len(self.scene.edges) == 0)
+        assert(self.scene.selected_nodes == [])
+
+
+if __name__ == '__main__':
+    unittest.main()